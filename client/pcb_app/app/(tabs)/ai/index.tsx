@@ -11,6 +11,7 @@ export default function AIScreen() {
   const router = useRouter();
   const [image, setImage] = useState<string | null>(null);
   const [resultImage, setResultImage] = useState<string | null>(null);
+  const [jobId, setJobId] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
   const [analysisData, setAnalysisData] = useState<any[]>([]);
 
@@ -18,6 +19,7 @@ export default function AIScreen() {
     useCallback(() => {
       setImage(null);
       setResultImage(null);
+      setJobId(null);
       setAnalysisData([]);
       setLoading(false);
     }, [])
@@ -32,6 +34,7 @@ export default function AIScreen() {
     if (!result.canceled) {
       setImage(result.assets[0].uri);
       setResultImage(null);
+      setJobId(null);
       setAnalysisData([]);
     }
   };
@@ -49,6 +52,8 @@ export default function AIScreen() {
       });
       if (response.data.status === 'success') {
         setResultImage(response.data.result_image);
+        // 서버에 보관된 탐지 결과 ID - 등록 시 이미지를 다시 보내지 않고 이 ID 만 전송
+        setJobId(response.data.job_id ?? null);
         setAnalysisData(response.data.detections);
       }
     } catch (error) {
@@ -68,6 +73,7 @@ export default function AIScreen() {
       pathname: '/(tabs)/ai/upload',
       params: { 
         resultImage: resultImage, 
+        jobId: jobId ?? '',
         projectId: 1
       }
     });
@@ -14,7 +14,7 @@ import { Ionicons } from '@expo/vector-icons';
 export default function AnalysisUploadScreen() {
   const router = useRouter();
   const params = useLocalSearchParams();
-  const { resultImage } = params; 
+  const { resultImage, jobId } = params; 
 
   const [description, setDescription] = useState('');
   const [loading, setLoading] = useState(false);
@@ -36,7 +36,7 @@ export default function AnalysisUploadScreen() {
 
   const fetchProjects = async () => {
     try {
-      const response = await axios.get(`${API_URL}/projects/`, { withCredentials: true });
+      const response = await axios.get(`${API_URL}/projects/`, { params: { limit: 100 }, withCredentials: true });
       if (response.data.status === 'success') {
         setProjects(response.data.data);
       }
@@ -78,22 +78,35 @@ export default function AnalysisUploadScreen() {
     try {
       setLoading(true);
       
-      // EncodingType 대신 base64로 -> 이거 안하니까 에러남
-      const excelBase64 = await FileSystem.readAsStringAsync(excelFile.uri, { 
-        encoding: 'base64' 
-      });
+      // 파일을 base64 문자열로 읽지 않고 multipart 로 그대로 전송 (서버가 청크 단위로 디스크에 기록)
+      const formData = new FormData();
+      formData.append('project_id', String(selectedProject.id));
+      formData.append('description', description);
+
+      // 탐지 결과 이미지는 서버에 job_id 로 보관돼 있으므로 ID 만 전송
+      // (job_id 가 없는 예전 서버 응답이면 data URI 를 캐시 파일로 써서 첨부)
+      let imageUri: string | null = null;
+      if (jobId) {
+        formData.append('detect_job_id', String(jobId));
+      } else {
+        const imageBase64 = String(resultImage).includes(',') ? String(resultImage).split(',')[1] : String(resultImage);
+        imageUri = `${FileSystem.cacheDirectory}upload_result_${Date.now()}.jpg`;
+        await FileSystem.writeAsStringAsync(imageUri, imageBase64, { encoding: 'base64' });
+        const imageInfo = await FileSystem.getInfoAsync(imageUri, { md5: true });
+        formData.append('image', { uri: imageUri, name: 'result.jpg', type: 'image/jpeg' } as any);
+        if (imageInfo.exists && imageInfo.md5) formData.append('image_checksum', `md5:${imageInfo.md5}`);
+      }
 
-      const payload = {
-        project_id: selectedProject.id,
-        image_data: resultImage,
-        excel_data: excelBase64,
-        excel_name: excelFile.name,
-        description: description,
-      };
+      // 전송 중 손상 확인용 체크섬
+      const excelInfo = await FileSystem.getInfoAsync(excelFile.uri, { md5: true });
+      formData.append('excel', { uri: excelFile.uri, name: excelFile.name, type: 'application/octet-stream' } as any);
+      if (excelInfo.exists && excelInfo.md5) formData.append('excel_checksum', `md5:${excelInfo.md5}`);
 
-      const response = await axios.post(`${API_URL}/upload-result/`, payload, {
+      const response = await axios.post(`${API_URL}/upload-result/`, formData, {
         withCredentials: true,
+        headers: { 'Content-Type': 'multipart/form-data' },
       });
+      if (imageUri) FileSystem.deleteAsync(imageUri, { idempotent: true });
 
       if (response.data.status === 'success') {
         Alert.alert('성공', '분석 결과가 저장되었습니다.', [
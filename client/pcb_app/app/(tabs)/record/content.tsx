@@ -15,12 +15,14 @@ const CommentArea = ({ materialId, currentUser }: { materialId: number, currentU
   const [replyTo, setReplyTo] = useState<{id: number, name: string} | null>(null);
   const [loading, setLoading] = useState(false);
   const [fetching, setFetching] = useState(false);
+  const [lastSync, setLastSync] = useState<string | null>(null);
 
   const fetchComments = async () => {
     try {
       setFetching(true);
       const res = await axios.get(`${API_URL}/comments/?material_id=${materialId}`);
       setComments(res.data);
+      setLastSync(res.headers['x-server-time'] || null);
     } catch (e) {
       console.error("댓글 로드 실패:", e);
     } finally {
@@ -28,6 +30,31 @@ const CommentArea = ({ materialId, currentUser }: { materialId: number, currentU
     }
   };
 
+  // 마지막 조회 이후 새 댓글만 받아서 트리에 끼워 넣음 (id 로 중복 제거)
+  const fetchNewComments = async () => {
+    if (!lastSync) return fetchComments();
+    try {
+      const res = await axios.get(`${API_URL}/comments/`, { params: { material_id: materialId, since: lastSync } });
+      setComments(prev => {
+        const known = new Set<number>();
+        prev.forEach(c => { known.add(c.id); (c.replies || []).forEach((r: any) => known.add(r.id)); });
+        let next = prev.map(c => ({ ...c, replies: [...(c.replies || [])] }));
+        res.data.filter((c: any) => !known.has(c.id)).forEach((c: any) => {
+          if (c.parent === null) {
+            next.push(c);
+          } else {
+            const parent = next.find(p => p.id === c.parent);
+            if (parent) parent.replies.push(c);
+          }
+        });
+        return next;
+      });
+      setLastSync(res.headers['x-server-time'] || lastSync);
+    } catch (e) {
+      console.error("댓글 로드 실패:", e);
+    }
+  };
+
   useEffect(() => {
     fetchComments();
   }, [materialId]);
@@ -83,7 +110,7 @@ const CommentArea = ({ materialId, currentUser }: { materialId: number, currentU
       });
       setText('');
       setReplyTo(null);
-      fetchComments();
+      fetchNewComments();
     } catch (e) {
       Alert.alert("실패", "댓글 저장 중 오류가 발생했습니다.");
     } finally {
@@ -178,7 +205,9 @@ export default function ProjectContent() {
   const router = useRouter();
 
   const [materials, setMaterials] = useState<any[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [downloadingId, setDownloadingId] = useState<number | null>(null);
   const [currentUser, setCurrentUser] = useState<any>(null);
   const [userRole, setUserRole] = useState<string | null>(null);
@@ -220,20 +249,22 @@ export default function ProjectContent() {
     }, [params.id])
   );
 
-  const fetchAnalysisMaterials = async () => {
+  // 첫 페이지만 불러오고 나머지는 '더 보기'로 next_cursor 페이지를 이어 붙임
+  const fetchAnalysisMaterials = async (cursor: string | null = null) => {
     try {
-      setLoading(true);
+      cursor ? setLoadingMore(true) : setLoading(true);
       const response = await axios.get(`${API_URL}/analysis-materials/`, {
-        params: { project_id: params.id },
+        params: cursor ? { project_id: params.id, cursor } : { project_id: params.id },
         withCredentials: true
       });
       if (response.data.status === 'success') {
-        setMaterials(response.data.data);
+        setMaterials(prev => cursor ? [...prev, ...response.data.data] : response.data.data);
+        setNextCursor(response.data.next_cursor || null);
       }
     } catch (error) {
       console.error("데이터 로드 실패:", error);
     } finally {
-      setLoading(false);
+      cursor ? setLoadingMore(false) : setLoading(false);
     }
   };
 
@@ -333,7 +364,7 @@ export default function ProjectContent() {
               </View>
               
               <View style={styles.materialImageWrapper}>
-                <Image source={{ uri: item.defect_image_url }} style={styles.materialImage} resizeMode="contain" />
+                <Image source={{ uri: item.thumbnail_urls?.md || item.defect_image_url }} style={styles.materialImage} resizeMode="contain" />
               </View>
               
               <View style={styles.materialBody}>
@@ -360,6 +391,20 @@ export default function ProjectContent() {
         ) : (
           <Text style={styles.emptyText}>등록된 분석 결과가 없습니다.</Text>
         )}
+
+        {!loading && nextCursor && (
+          <TouchableOpacity
+            style={styles.loadMoreButton}
+            onPress={() => fetchAnalysisMaterials(nextCursor)}
+            disabled={loadingMore}
+          >
+            {loadingMore ? (
+              <ActivityIndicator size="small" color="#007AFF" />
+            ) : (
+              <Text style={styles.loadMoreText}>더 보기</Text>
+            )}
+          </TouchableOpacity>
+        )}
       </ScrollView>
     </KeyboardAvoidingView>
   );
@@ -405,6 +450,8 @@ const styles = StyleSheet.create({
   downloadButtonText: { color: '#fff', fontWeight: 'bold', marginLeft: 8 },
   disabledButton: { backgroundColor: '#ccc' },
   emptyText: { textAlign: 'center', marginTop: 50, color: '#999' },
+  loadMoreButton: { alignItems: 'center', paddingVertical: 14, marginBottom: 20 },
+  loadMoreText: { color: '#007AFF', fontSize: 15, fontWeight: '600' },
   commentSectionContainer: { borderTopWidth: 1, borderTopColor: '#eee', paddingTop: 15 },
   commentCountText: { fontSize: 13, fontWeight: 'bold', color: '#666' },
   commentWrapper: { marginBottom: 15 },
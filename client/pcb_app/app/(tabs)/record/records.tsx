@@ -22,6 +22,8 @@ interface RecordsProps {
 
 const Records: React.FC<RecordsProps> = ({ onPressItem }) => {
   const [projects, setProjects] = useState<Project[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [userRole, setUserRole] = useState<string | null>(null);
 
@@ -59,6 +61,7 @@ const Records: React.FC<RecordsProps> = ({ onPressItem }) => {
 
       if (response.data.status === 'success') {
         setProjects(response.data.data);
+        setNextCursor(response.data.next_cursor || null);
       }
     } catch (error: any) {
       console.error("데이터 조회 에러:", error.response || error);
@@ -67,6 +70,27 @@ const Records: React.FC<RecordsProps> = ({ onPressItem }) => {
     }
   };
 
+  // 목록 끝에 도달하면 다음 페이지를 이어 붙임
+  const fetchMoreProjects = async () => {
+    if (!nextCursor || loadingMore || loading) return;
+    try {
+      setLoadingMore(true);
+      const response = await axios.get(`${API_URL}/projects/`, {
+        params: { cursor: nextCursor },
+        withCredentials: true,
+      });
+
+      if (response.data.status === 'success') {
+        setProjects(prev => [...prev, ...response.data.data]);
+        setNextCursor(response.data.next_cursor || null);
+      }
+    } catch (error: any) {
+      console.error("데이터 조회 에러:", error.response || error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const formatKSTDate = (dateString: string) => {
     if (!dateString) return '-';
     const date = new Date(dateString);
@@ -159,6 +183,9 @@ const Records: React.FC<RecordsProps> = ({ onPressItem }) => {
       ListEmptyComponent={<Text style={styles.emptyText}>등록된 프로젝트가 없습니다.</Text>}
       onRefresh={fetchProjects}
       refreshing={loading}
+      onEndReached={fetchMoreProjects}
+      onEndReachedThreshold={0.5}
+      ListFooterComponent={loadingMore ? <ActivityIndicator size="small" color="#007AFF" style={{ marginVertical: 15 }} /> : null}
       contentContainerStyle={{ paddingBottom: 20 }}
     />
   );
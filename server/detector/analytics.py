@@ -0,0 +1,181 @@
+import json
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import Detections
+
+BULK_BATCH_SIZE = 1000
+
+
+# /detect/ 결과 형식(to_records) 또는 앱이 보낸 JSON 문자열을 그대로 받음
+def parse_detections(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = json.loads(value)
+    if not isinstance(value, list):
+        raise ValueError("detections 는 목록이어야 합니다.")
+    return value
+
+
+# 분석 결과의 탐지 박스를 한 번의 bulk insert 로 저장
+def save_detections(material, detections):
+    rows = []
+    for det in detections:
+        xmin, ymin, xmax, ymax = (float(det[k]) for k in ('xmin', 'ymin', 'xmax', 'ymax'))
+        rows.append(Detections(
+            material_id=material.id,
+            project_id=material.project_id,
+            class_id=int(det['class']),
+            class_name=str(det.get('name', det['class']))[:50],
+            confidence=float(det['confidence']),
+            xmin=xmin,
+            ymin=ymin,
+            xmax=xmax,
+            ymax=ymax,
+            area=max(0.0, xmax - xmin) * max(0.0, ymax - ymin),
+            created_at=material.created_at,
+        ))
+    Detections.objects.bulk_create(rows, batch_size=BULK_BATCH_SIZE)
+    return rows
+
+
+ROLLUP_GRANULARITIES = ('hour', 'day')
+ROLLUP_COLUMNS = (
+    'company_id', 'project_id', 'granularity', 'bucket_start', 'class_name',
+    'detection_count', 'confidence_sum', 'material_count', 'defective_count',
+)
+# 같은 버킷 행이 있으면 값을 더함 (project_id NULL 도 같은 키로 취급 - NULLS NOT DISTINCT 제약)
+ROLLUP_UPSERT_SQL = """
+    INSERT INTO defect_rollups ({columns}, updated_at)
+    VALUES {values}
+    ON CONFLICT (company_id, project_id, granularity, bucket_start, class_name) DO UPDATE SET
+        detection_count = defect_rollups.detection_count + EXCLUDED.detection_count,
+        confidence_sum = defect_rollups.confidence_sum + EXCLUDED.confidence_sum,
+        material_count = defect_rollups.material_count + EXCLUDED.material_count,
+        defective_count = defect_rollups.defective_count + EXCLUDED.defective_count,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+# 버킷 시작 시각 (서버 시간대 기준 정시/자정)
+def bucket_start(dt, granularity):
+    local = timezone.localtime(dt)
+    if granularity == 'hour':
+        return local.replace(minute=0, second=0, microsecond=0)
+    return local.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+# 분석 결과 1건을 집계 테이블에 누적 (프로젝트별 + 회사 전체, 시간/일 단위, 클래스별 + 전체)
+# 업로드 트랜잭션 안에서 한 번의 INSERT ... ON CONFLICT 로 처리
+def update_rollups(material, detections, company_id):
+    per_class = {}
+    for det in detections:
+        name = str(det.get('name', det['class']))[:50]
+        count, conf_sum = per_class.get(name, (0, 0.0))
+        per_class[name] = (count + 1, conf_sum + float(det['confidence']))
+    total_conf = sum(conf_sum for _, conf_sum in per_class.values())
+    defective = 1 if detections else 0
+
+    rows = []
+    for granularity in ROLLUP_GRANULARITIES:
+        start = bucket_start(material.created_at, granularity)
+        for project_id in (material.project_id, None):
+            rows.append((company_id, project_id, granularity, start, '', len(detections), total_conf, 1, defective))
+            for name, (count, conf_sum) in per_class.items():
+                rows.append((company_id, project_id, granularity, start, name, count, conf_sum, 1, 1))
+    # 동시에 업로드된 분석끼리 회사 전체 행을 서로 다른 순서로 잠그면 교착 상태가 생기므로
+    # 충돌 키 순서(project_id NULL 먼저, granularity, bucket_start, class_name)로 정렬해서 항상 같은 순서로 잠금
+    rows.sort(key=lambda row: (row[1] is not None, row[1] or 0, row[2], row[3], row[4]))
+
+    placeholders = "(" + ", ".join(["%s"] * (len(ROLLUP_COLUMNS) + 1)) + ")"
+    sql = ROLLUP_UPSERT_SQL.format(columns=", ".join(ROLLUP_COLUMNS), values=", ".join([placeholders] * len(rows)))
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [value for row in rows for value in (*row, now)])
+
+
+# 프로젝트 삭제 시 회사 전체 집계에서 해당 프로젝트 분을 빼고 프로젝트 집계 행 삭제
+# 여러 프로젝트를 한 번에 지울 때는 프로젝트별 값을 합쳐서 회사 행마다 한 번만 UPDATE
+def remove_project_rollups(project_ids):
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE defect_rollups c SET
+                detection_count = c.detection_count - p.detection_count,
+                confidence_sum = c.confidence_sum - p.confidence_sum,
+                material_count = c.material_count - p.material_count,
+                defective_count = c.defective_count - p.defective_count,
+                updated_at = now()
+            FROM (
+                SELECT company_id, granularity, bucket_start, class_name,
+                       SUM(detection_count) AS detection_count, SUM(confidence_sum) AS confidence_sum,
+                       SUM(material_count) AS material_count, SUM(defective_count) AS defective_count
+                FROM defect_rollups
+                WHERE project_id = ANY(%s)
+                GROUP BY company_id, granularity, bucket_start, class_name
+            ) p
+            WHERE c.project_id IS NULL
+              AND c.company_id = p.company_id
+              AND c.granularity = p.granularity
+              AND c.bucket_start = p.bucket_start
+              AND c.class_name = p.class_name
+        """, [list(project_ids)])
+        cursor.execute("DELETE FROM defect_rollups WHERE project_id = ANY(%s)", [list(project_ids)])
+        cursor.execute("DELETE FROM defect_rollups WHERE project_id IS NULL AND material_count <= 0")
+
+
+# 집계 테이블 전체 재계산 (detections / analysis_materials 기준)
+# 관리 명령 rebuild_rollups 에서 사용 - 평소에는 update_rollups 로 누적
+REBUILD_SQL = """
+    WITH boards AS (
+        SELECT m.id, m.project_id, p.company_id,
+               date_trunc(%(granularity)s, m.created_at AT TIME ZONE %(tz)s) AT TIME ZONE %(tz)s AS bucket_start
+        FROM analysis_materials m
+        JOIN pcb_projects p ON p.id = m.project_id
+    ),
+    per_class AS (
+        SELECT b.company_id, b.project_id, b.bucket_start, d.class_name,
+               COUNT(*) AS detection_count, SUM(d.confidence) AS confidence_sum,
+               COUNT(DISTINCT b.id) AS material_count
+        FROM boards b JOIN detections d ON d.material_id = b.id
+        GROUP BY GROUPING SETS (
+            (b.company_id, b.project_id, b.bucket_start, d.class_name),
+            (b.company_id, b.bucket_start, d.class_name)
+        )
+    ),
+    per_board AS (
+        SELECT b.id, b.company_id, b.project_id, b.bucket_start,
+               COUNT(d.id) AS detection_count, COALESCE(SUM(d.confidence), 0) AS confidence_sum
+        FROM boards b LEFT JOIN detections d ON d.material_id = b.id
+        GROUP BY b.id, b.company_id, b.project_id, b.bucket_start
+    ),
+    totals AS (
+        SELECT company_id, project_id, bucket_start,
+               SUM(detection_count) AS detection_count, SUM(confidence_sum) AS confidence_sum,
+               COUNT(*) AS material_count, COUNT(*) FILTER (WHERE detection_count > 0) AS defective_count
+        FROM per_board
+        GROUP BY GROUPING SETS ((company_id, project_id, bucket_start), (company_id, bucket_start))
+    )
+    INSERT INTO defect_rollups ({columns}, updated_at)
+    SELECT company_id, project_id, %(granularity)s, bucket_start, class_name,
+           detection_count, confidence_sum, material_count, defective_count, now()
+    FROM (
+        SELECT company_id, project_id, bucket_start, class_name,
+               detection_count, confidence_sum, material_count, material_count AS defective_count
+        FROM per_class
+        UNION ALL
+        SELECT company_id, project_id, bucket_start, '' AS class_name,
+               detection_count, confidence_sum, material_count, defective_count
+        FROM totals
+    ) r
+"""
+
+
+def rebuild_rollups():
+    sql = REBUILD_SQL.format(columns=", ".join(ROLLUP_COLUMNS))
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM defect_rollups")
+        for granularity in ROLLUP_GRANULARITIES:
+            cursor.execute(sql, {"granularity": granularity, "tz": settings.TIME_ZONE})
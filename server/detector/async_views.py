@@ -0,0 +1,148 @@
+import asyncio
+import base64
+import traceback
+
+import cv2
+import numpy as np
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from . import metrics
+from .engine import detect_engine
+from .views import (
+    RESPONSE_FORMATS, detect_cache, detect_result_store, detection_cache_key, draw_detections, keep_result,
+    multipart_response,
+)
+
+
+# 비동기(ASGI) AI 결함 탐지 api
+# uvicorn/daphne 등 ASGI 서버(pcb_backend.asgi:application)에서 실행하면 업로드 본문은 이벤트 루프가 조금씩 받아서
+# 임시 파일로 흘려 쓰고(느린 모바일 업로드가 스레드를 붙잡지 않음), 디코딩/렌더링은 스레드 풀에서,
+# 추론은 배치 스케줄러/워커 풀의 Future 를 await 하므로 한 프로세스가 많은 요청을 동시에 들고 있을 수 있음
+# 요청/응답 형식은 /detect/ 와 같고, multipart 의 image 필드 대신 이미지 바이트를 본문 그대로 보내도 됨
+def _read_upload(request):
+    if request.content_type.startswith('image/'):
+        return request.body
+    image_file = request.FILES.get('image')
+    return image_file.read() if image_file is not None else None
+
+
+def _lookup_cache(raw_bytes, tiled):
+    if detect_cache is None:
+        return None, None
+    cache_key = detection_cache_key(raw_bytes, tiled)
+    cached = detect_cache.get(cache_key) if cache_key else None
+    if cache_key:
+        metrics.CACHE_LOOKUPS.labels(result='hit' if cached is not None else 'miss').inc()
+    return cache_key, cached
+
+
+def _decode(raw_bytes):
+    with metrics.stage('detect_async', 'imdecode'):
+        return cv2.imdecode(np.frombuffer(raw_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+
+def _render(img_cv, detections, cache_key):
+    with metrics.stage('detect_async', 'draw'):
+        draw_detections(img_cv, detections)
+    with metrics.stage('detect_async', 'jpeg_encode'):
+        _, buffer = cv2.imencode('.jpg', img_cv)
+        jpeg = buffer.tobytes()
+    if cache_key:
+        detect_cache.put(cache_key, detections, jpeg, (img_cv.shape[1], img_cv.shape[0]))
+    return jpeg
+
+
+def _encode_base64(jpeg):
+    with metrics.stage('detect_async', 'base64'):
+        return base64.b64encode(jpeg).decode('utf-8')
+
+
+async def _detect_response(request, response_format, payload, jpeg):
+    # 렌더링 이미지 + 좌표를 job_id 로 보관 (/upload-result/ 의 detect_job_id) - 보관이 필요한 요청만
+    result_id = None
+    if keep_result(response_format, request.GET.get('keep')):
+        result_id = await asyncio.to_thread(detect_result_store.save, jpeg, payload["detections"])
+        payload["job_id"] = result_id
+    if response_format == 'base64':
+        payload["result_image"] = f"data:image/jpeg;base64,{await asyncio.to_thread(_encode_base64, jpeg)}"
+    elif response_format == 'json':
+        payload["result_id"] = result_id
+        payload["result_url"] = request.build_absolute_uri(reverse('pcb_detect_result', args=[result_id]))
+    elif response_format == 'multipart':
+        return multipart_response(payload, jpeg)
+    return JsonResponse(payload, json_dumps_params={"ensure_ascii": False})
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncDetectView(View):
+
+    async def post(self, request):
+        response_format = request.GET.get('response_format') or 'base64'
+        if response_format not in RESPONSE_FORMATS:
+            return JsonResponse(
+                {"status": "fail", "message": f"지원하지 않는 응답 형식입니다. ({', '.join(RESPONSE_FORMATS)})"},
+                status=400,
+            )
+        tiled_param = request.GET.get('tiled')
+        tiled = settings.DETECT_TILED if tiled_param is None else tiled_param.lower() in ('1', 'true', 'yes')
+
+        try:
+            with metrics.stage('detect_async', 'upload_read'):
+                raw_bytes = await asyncio.to_thread(_read_upload, request)
+            if not raw_bytes:
+                return JsonResponse({"status": "fail", "message": "이미지가 없습니다."}, status=400)
+
+            # 캐시 히트면 디코딩/추론/렌더링 모두 생략
+            cache_key, cached = await asyncio.to_thread(_lookup_cache, raw_bytes, tiled)
+            # 히트/미스 모두 같은 응답 형태 (이미지 크기 포함, none 이면 렌더링 이미지/job_id 없음)
+            if cached is not None:
+                detections, jpeg, (width, height) = cached
+                payload = {"status": "success", "detections": detections, "cached": True,
+                           "image_width": width, "image_height": height}
+                metrics.count_request('detect_async', 'cache_hit')
+                if response_format == 'none':
+                    return JsonResponse(payload, json_dumps_params={"ensure_ascii": False})
+                return await _detect_response(request, response_format, payload, jpeg)
+
+            img_cv = await asyncio.to_thread(_decode, raw_bytes)
+            if img_cv is None:
+                return JsonResponse({"status": "fail", "message": "이미지를 읽을 수 없습니다."}, status=400)
+
+            # 추론 중에는 스레드를 점유하지 않고 배치 스케줄러/워커 풀의 결과만 기다림
+            result = await detect_engine.detect_async(img_cv, tiled)
+            metrics.observe_detection('detect_async', result)
+            detections = result['detections']
+            for i, det in enumerate(detections):
+                det['display_id'] = i + 1
+
+            payload = {
+                "status": "success",
+                "detections": detections,
+                "cached": False,
+                "image_width": img_cv.shape[1],
+                "image_height": img_cv.shape[0],
+                "batch": {
+                    "queue_ms": result['queue_ms'],
+                    "inference_ms": result['inference_ms'],
+                    "batch_size": result['batch_size']
+                }
+            }
+            if response_format == 'none':
+                metrics.count_request('detect_async', 'success')
+                return JsonResponse(payload, json_dumps_params={"ensure_ascii": False})
+
+            jpeg = await asyncio.to_thread(_render, img_cv, detections, cache_key)
+            metrics.count_request('detect_async', 'success')
+            return await _detect_response(request, response_format, payload, jpeg)
+        except TimeoutError:
+            metrics.count_request('detect_async', 'timeout')
+            return JsonResponse({"status": "error", "message": "추론 시간이 초과되었습니다. 잠시 후 다시 시도하세요."}, status=503)
+        except Exception as e:
+            traceback.print_exc()
+            metrics.count_request('detect_async', 'error')
+            return JsonResponse({"status": "error", "message": str(e)}, status=500)
@@ -0,0 +1,119 @@
+import json
+import time
+import asyncio
+import traceback
+
+import cv2
+import numpy as np
+from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+from . import metrics
+from .engine import detect_engine
+
+
+def _decode_frame(raw_bytes):
+    with metrics.stage('detect_stream', 'imdecode'):
+        return cv2.imdecode(np.frombuffer(raw_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+
+# 프레임 응답용 박스 좌표 (소수점 1자리로 줄여서 전송량 감소)
+def _boxes(detections):
+    return [{
+        "xmin": round(det['xmin'], 1),
+        "ymin": round(det['ymin'], 1),
+        "xmax": round(det['xmax'], 1),
+        "ymax": round(det['ymax'], 1),
+        "confidence": round(det['confidence'], 3),
+        "class": det['class'],
+        "name": det['name'],
+    } for det in detections]
+
+
+# 실시간 카메라 스트림 탐지 (WebSocket ws/detect/stream/, ASGI 서버에서만 동작)
+# 앱은 카메라 프레임을 JPEG 바이너리 메시지로 계속 보내고, 서버는 프레임마다 박스 좌표만 JSON 으로 돌려줌
+#   -> 렌더링/JPEG 재인코딩/base64 없음, 앱이 미리보기 위에 직접 그림
+# 추론이 프레임 속도를 못 따라가면 밀린 프레임은 버리고 가장 최근 프레임만 처리 (yolov5 LoadStreams.update 방식)
+# 응답의 frame 은 연결 후 받은 바이너리 메시지 순번(1부터), dropped 는 지금까지 건너뛴 프레임 수
+# 텍스트 메시지 {"tiled": true} 로 타일 추론 전환 (JSON 객체가 아닌 메시지는 error 응답)
+# 연결 시 Origin 헤더가 ALLOWED_HOSTS 의 호스트여야 함 (asgi.py 의 AllowedHostsOriginValidator) - 앱도 Origin 을 붙여서 연결
+class DetectStreamConsumer(AsyncWebsocketConsumer):
+
+    async def connect(self):
+        self._latest = None  # 처리 대기 중인 최신 프레임 (frame, raw_bytes, received_at)
+        self._received = 0
+        self._dropped = 0
+        self._tiled = settings.DETECT_TILED
+        self._wakeup = asyncio.Event()
+        await self.accept()
+        self._worker = asyncio.create_task(self._process_frames())
+        await self._send_json({"type": "ready", "max_frame_bytes": settings.DETECT_STREAM_MAX_FRAME_KB * 1024})
+
+    async def disconnect(self, code):
+        worker = getattr(self, '_worker', None)
+        if worker is not None:
+            worker.cancel()
+
+    async def receive(self, text_data=None, bytes_data=None):
+        if bytes_data is not None:
+            self._received += 1
+            if len(bytes_data) > settings.DETECT_STREAM_MAX_FRAME_KB * 1024:
+                await self._send_json({"type": "error", "frame": self._received, "message": "프레임이 너무 큽니다."})
+                return
+            if self._latest is not None:
+                self._dropped += 1
+            self._latest = (self._received, bytes_data, time.perf_counter())
+            self._wakeup.set()
+            return
+
+        try:
+            message = json.loads(text_data or '{}')
+        except ValueError:
+            message = None
+        if not isinstance(message, dict):
+            await self._send_json({"type": "error", "message": "메시지 형식이 올바르지 않습니다."})
+            return
+        if 'tiled' in message:
+            self._tiled = bool(message['tiled'])
+
+    async def _send_json(self, payload):
+        await self.send(text_data=json.dumps(payload, ensure_ascii=False))
+
+    # 연결마다 프레임 처리 루프 하나 - 한 번에 한 프레임만 추론하고, 끝나면 그 사이 들어온 최신 프레임으로
+    # 추론은 배치 스케줄러/워커 풀을 거치므로 여러 연결의 프레임이 한 forward 로 묶임
+    async def _process_frames(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            frame = self._latest
+            self._latest = None
+            if frame is None:
+                continue
+            frame_id, raw_bytes, received_at = frame
+
+            try:
+                img_cv = await asyncio.to_thread(_decode_frame, raw_bytes)
+                if img_cv is None:
+                    await self._send_json({"type": "error", "frame": frame_id, "message": "프레임을 읽을 수 없습니다."})
+                    continue
+                result = await detect_engine.detect_async(img_cv, self._tiled)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                traceback.print_exc()
+                metrics.count_request('detect_stream', 'error')
+                await self._send_json({"type": "error", "frame": frame_id, "message": str(e)})
+                continue
+
+            metrics.observe_detection('detect_stream', result)
+            metrics.count_request('detect_stream', 'success')
+            await self._send_json({
+                "type": "detections",
+                "frame": frame_id,
+                "width": img_cv.shape[1],
+                "height": img_cv.shape[0],
+                "detections": _boxes(result['detections']),
+                "latency_ms": round((time.perf_counter() - received_at) * 1000, 2),
+                "inference_ms": result['inference_ms'],
+                "dropped": self._dropped,
+            })
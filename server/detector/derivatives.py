@@ -0,0 +1,189 @@
+import os
+import json
+import math
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+
+import cv2
+from django.conf import settings
+from .jobs import PRIORITY_HIGH, enqueue, register
+from .storage import detected_results_store, is_blob_name
+
+# 탐지 결과 이미지 파생 파일 (썸네일 + 타일 피라미드)
+# <MEDIA_ROOT>/derived/detected_results/<key>/ 아래에 원본 내용 해시 기준으로 한 번만 만들어 둠
+#   thumb_sm.jpg / thumb_md.jpg / thumb_lg.jpg : 긴 변 기준 축소본 (목록 화면용)
+#   tiles/info.json, tiles/<level>/<x>_<y>.jpg  : 확대 화면용 타일 (level 0 = 타일 1장에 들어가는 크기, 마지막 level = 원본)
+# 업로드 직후 썸네일은 작업 큐(jobs)에서 미리 만들고, 타일은 처음 요청될 때 생성
+DERIVED_ROOT = os.path.join(settings.MEDIA_ROOT, 'derived', 'detected_results')
+THUMBNAIL_SIZES = {'sm': 160, 'md': 480, 'lg': 1024}
+THUMBNAIL_QUALITY = 80
+TILE_SIZE = 256
+TILE_QUALITY = 85
+
+# 같은 이미지의 파생 파일을 동시에 만들지 않도록 키 해시로 나눈 잠금 (프로세스 안에서만)
+_locks = [threading.Lock() for _ in range(64)]
+
+
+def derived_key(name):
+    # 내용 해시 저장소 이름이면 sha256, 예전 파일명이면 이름의 해시
+    if is_blob_name(name):
+        return os.path.splitext(os.path.basename(name))[0]
+    return 'legacy-' + hashlib.sha256(name.encode('utf-8')).hexdigest()
+
+
+def derived_dir(name):
+    return os.path.join(DERIVED_ROOT, derived_key(name))
+
+
+def _lock_for(key):
+    return _locks[int(hashlib.md5(key.encode('utf-8')).hexdigest()[:8], 16) % len(_locks)]
+
+
+def _read_source(name):
+    path = detected_results_store.path(name)
+    if not path or not os.path.exists(path):
+        raise FileNotFoundError(f"탐지 결과 이미지가 없습니다: {name}")
+    img = cv2.imread(path, cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError(f"이미지를 읽을 수 없습니다: {name}")
+    return img
+
+
+def _write_jpeg(path, img, quality):
+    ok, buffer = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("JPEG 인코딩 실패")
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(buffer.tobytes())
+    os.replace(tmp_path, path)
+
+
+def _shrink(img, long_side):
+    h, w = img.shape[:2]
+    scale = long_side / max(h, w)
+    if scale >= 1:
+        return img
+    return cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+# 썸네일 경로 (없으면 생성) - 원본이 더 작으면 원본 크기 그대로 재인코딩
+def thumbnail(name, size):
+    if size not in THUMBNAIL_SIZES:
+        raise ValueError(f"지원하지 않는 썸네일 크기입니다: {size} ({', '.join(THUMBNAIL_SIZES)})")
+    directory = derived_dir(name)
+    path = os.path.join(directory, f"thumb_{size}.jpg")
+    if os.path.exists(path):
+        return path
+    with _lock_for(derived_key(name)):
+        if not os.path.exists(path):
+            generate_thumbnails(name)
+    return path
+
+
+def generate_thumbnails(name):
+    directory = derived_dir(name)
+    os.makedirs(directory, exist_ok=True)
+    img = _read_source(name)
+    # 큰 크기부터 차례로 줄여서 매번 원본을 다시 축소하지 않음
+    for size, long_side in sorted(THUMBNAIL_SIZES.items(), key=lambda item: -item[1]):
+        img = _shrink(img, long_side)
+        path = os.path.join(directory, f"thumb_{size}.jpg")
+        if not os.path.exists(path):
+            _write_jpeg(path, img, THUMBNAIL_QUALITY)
+
+
+def _pyramid_info(width, height):
+    max_level = max(0, math.ceil(math.log2(max(width, height) / TILE_SIZE)))
+    levels = []
+    for level in range(max_level + 1):
+        scale = 2 ** (max_level - level)
+        w, h = max(1, math.ceil(width / scale)), max(1, math.ceil(height / scale))
+        levels.append({"level": level, "width": w, "height": h,
+                       "cols": math.ceil(w / TILE_SIZE), "rows": math.ceil(h / TILE_SIZE)})
+    return {"width": width, "height": height, "tile_size": TILE_SIZE, "levels": levels}
+
+
+# 타일 피라미드 정보 (없으면 전체 피라미드 생성)
+# 임시 폴더에 모두 만든 뒤 폴더 이름을 바꿔서, 만들다 만 피라미드가 보이지 않게 함
+def pyramid(name):
+    tiles_dir = os.path.join(derived_dir(name), 'tiles')
+    info_path = os.path.join(tiles_dir, 'info.json')
+    if not os.path.exists(info_path):
+        with _lock_for(derived_key(name)):
+            if not os.path.exists(info_path):
+                _generate_pyramid(name, tiles_dir)
+    with open(info_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _generate_pyramid(name, tiles_dir):
+    img = _read_source(name)
+    info = _pyramid_info(img.shape[1], img.shape[0])
+    tmp_dir = f"{tiles_dir}.{uuid.uuid4().hex}.tmp"
+    try:
+        # 원본(마지막 level)부터 절반씩 줄여 가며 잘라냄
+        for entry in reversed(info["levels"]):
+            if (img.shape[1], img.shape[0]) != (entry["width"], entry["height"]):
+                img = cv2.resize(img, (entry["width"], entry["height"]), interpolation=cv2.INTER_AREA)
+            level_dir = os.path.join(tmp_dir, str(entry["level"]))
+            os.makedirs(level_dir, exist_ok=True)
+            for y in range(entry["rows"]):
+                for x in range(entry["cols"]):
+                    tile = img[y * TILE_SIZE:(y + 1) * TILE_SIZE, x * TILE_SIZE:(x + 1) * TILE_SIZE]
+                    _write_jpeg(os.path.join(level_dir, f"{x}_{y}.jpg"), tile, TILE_QUALITY)
+        with open(os.path.join(tmp_dir, 'info.json'), 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+        try:
+            os.rename(tmp_dir, tiles_dir)
+        except OSError:
+            # 다른 프로세스가 먼저 만든 경우 그쪽 결과 사용
+            if not os.path.exists(os.path.join(tiles_dir, 'info.json')):
+                raise
+    finally:
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def tile(name, level, x, y):
+    info = pyramid(name)
+    if not 0 <= level < len(info["levels"]):
+        return None
+    entry = info["levels"][level]
+    if not (0 <= x < entry["cols"] and 0 <= y < entry["rows"]):
+        return None
+    return os.path.join(derived_dir(name), 'tiles', str(level), f"{x}_{y}.jpg")
+
+
+@register('thumbnails.generate')
+def generate_thumbnails_job(name):
+    with _lock_for(derived_key(name)):
+        generate_thumbnails(name)
+
+
+# 업로드 트랜잭션 안에서 호출 - 커밋되면 작업 큐 워커가 썸네일 생성 (목록 화면에 바로 쓰이므로 우선 처리)
+def schedule_thumbnails(name):
+    enqueue('thumbnails.generate', {"name": name}, priority=PRIORITY_HIGH)
+
+
+# 원본이 삭제된(참조 없는) 이미지의 파생 파일 정리 (gc_media 에서 호출)
+# 지워도 다음 요청 때 다시 만들어지므로 최근에 만든 폴더만 grace_seconds 동안 남겨 둠
+def remove_orphan_derivatives(live_names, dry_run=False, grace_seconds=3600):
+    if not os.path.isdir(DERIVED_ROOT):
+        return 0
+    live = {derived_key(name) for name in live_names}
+    now, removed = time.time(), 0
+    for key in os.listdir(DERIVED_ROOT):
+        path = os.path.join(DERIVED_ROOT, key)
+        try:
+            if key in live or now - os.path.getmtime(path) < grace_seconds:
+                continue
+        except OSError:
+            continue
+        if not dry_run:
+            shutil.rmtree(path, ignore_errors=True)
+        removed += 1
+    return removed
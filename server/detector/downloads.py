@@ -0,0 +1,109 @@
+import os
+import re
+import mimetypes
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+from .uploads import CHUNK_SIZE
+
+# 파일 다운로드 응답 (Range 이어받기, ETag/Last-Modified 조건부 GET, X-Accel-Redirect/X-Sendfile)
+# DOWNLOAD_SENDFILE 이 'x-accel'(nginx) 또는 'x-sendfile'(apache/lighttpd) 이면 Django 는 권한 확인과 헤더만 만들고
+# 실제 파일 전송(Range 포함)은 앞단 웹 서버가 처리 -> 큰 파일을 내려받는 동안 파이썬 워커를 붙잡지 않음
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def file_etag(name, stat):
+    # 내용 해시 저장소 파일은 이름의 sha256 이 곧 내용, 예전 파일은 크기 + 수정 시각
+    digest = os.path.splitext(os.path.basename(name))[0]
+    if len(digest) == 64:
+        return quote_etag(digest)
+    return quote_etag(f"{stat.st_size:x}-{stat.st_mtime_ns:x}")
+
+
+# "bytes=a-b" 단일 구간만 지원 (여러 구간 요청은 전체 파일로 응답 - RFC 9110 허용)
+# 반환: (start, end) / None(전체) / False(범위 밖 -> 416)
+def parse_range(header, size):
+    match = RANGE_RE.match((header or '').strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+# 헤더 값은 ASCII 만 안전하므로 경로는 퍼센트 인코딩 (nginx/mod_xsendfile 모두 디코딩해서 파일을 찾음)
+# Content-Length 는 파일 전체 크기 - 앞단 서버가 실제 전송 길이(Range 포함)로 다시 씀
+def _sendfile_response(kind, name, path, size):
+    response = HttpResponse()
+    if settings.DOWNLOAD_SENDFILE == 'x-accel':
+        # nginx: location <DOWNLOAD_ACCEL_PREFIX> { internal; alias <MEDIA_ROOT>/; }
+        response['X-Accel-Redirect'] = quote(f"{settings.DOWNLOAD_ACCEL_PREFIX.rstrip('/')}/{kind}/{name}")
+    else:
+        response['X-Sendfile'] = quote(path)
+    response['Content-Length'] = str(size)
+    return response
+
+
+def file_download_response(request, kind, name, path, filename, content_type=None):
+    stat = os.stat(path)
+    etag = file_etag(name, stat)
+    last_modified = int(stat.st_mtime)
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return not_modified
+
+    if settings.DOWNLOAD_SENDFILE in ('x-accel', 'x-sendfile'):
+        response = _sendfile_response(kind, name, path, stat.st_size)
+        response['Content-Type'] = content_type
+    else:
+        size = stat.st_size
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+        # If-Range 가 현재 ETag/수정 시각과 다르면 이어받기 대신 전체 파일
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if byte_range and if_range and if_range != etag and parse_http_date_safe(if_range) != last_modified:
+            byte_range = None
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f"bytes */{size}"
+            return response
+        if byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(_read_range(path, start, end - start + 1), status=206,
+                                             content_type=content_type)
+            response['Content-Range'] = f"bytes {start}-{end}/{size}"
+            response['Content-Length'] = str(end - start + 1)
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return response
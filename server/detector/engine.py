@@ -0,0 +1,179 @@
+import time
+import asyncio
+import threading
+
+import cv2
+from django.conf import settings
+
+from .inference import WEIGHTS_PATH, prepare_model, BatchScheduler
+
+# 로드에 실패하면 이 시간(초) 동안은 바로 실패 응답, 지나면 다음 요청/준비 호출에서 다시 로드
+# (복사 중인 가중치 파일, 잠긴 산출물 등 일시적인 오류로 프로세스를 재시작해야 하는 일이 없게)
+LOAD_RETRY_SECONDS = 30
+
+# AI 추론 엔진 (지연 로드)
+# import 시점에는 모델을 올리지 않고 첫 탐지 요청이나 준비(warm_up) 호출 때 한 번만 로드
+# -> migrate 같은 manage.py 명령은 torch/YOLOv5 를 import 하지 않음
+# DETECT_WORKERS > 0 이면 웹 프로세스에는 모델을 올리지 않고 워커 프로세스 풀에서 추론
+class DetectionEngine:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = 'idle'  # idle / loading / ready / failed
+        self._error = None
+        self._failed_at = 0.0
+        self._scheduler = None
+        self._pool = None
+        self._backend_report = None
+        self._cold_start_ms = None
+
+    @property
+    def ready(self):
+        return self._state == 'ready'
+
+    # 실제로 로드된 백엔드 (패리티 검사에서 pt 로 폴백했으면 pt), 로드 전에는 None
+    @property
+    def backend(self):
+        return self._backend_report["backend"] if self._backend_report else None
+
+    def _load(self):
+        started = time.perf_counter()
+        if settings.DETECT_WORKERS > 0:
+            from .workers import InferenceWorkerPool
+
+            pool = InferenceWorkerPool(
+                settings.DETECT_WORKERS,
+                threads_per_worker=settings.DETECT_WORKER_THREADS,
+                backend=settings.DETECT_BACKEND,
+                validate=settings.DETECT_VALIDATE_BACKEND,
+                timeout=settings.DETECT_TIMEOUT_S,
+                max_batch_size=settings.DETECT_MAX_BATCH_SIZE,
+                max_wait_ms=settings.DETECT_MAX_WAIT_MS,
+                tile_size=settings.DETECT_TILE_SIZE,
+                tile_overlap=settings.DETECT_TILE_OVERLAP,
+            )
+            pool.start()
+            self._pool, self._backend_report = pool, pool.backend_report
+            print(f"✅ AI 추론 워커 풀 사용: {settings.DETECT_WORKERS}개 프로세스 ({WEIGHTS_PATH})")
+        else:
+            model, self._backend_report = prepare_model(
+                settings.DETECT_BACKEND, validate=settings.DETECT_VALIDATE_BACKEND
+            )
+            self._scheduler = BatchScheduler(
+                model,
+                max_batch_size=settings.DETECT_MAX_BATCH_SIZE,
+                max_wait_ms=settings.DETECT_MAX_WAIT_MS,
+                tile_size=settings.DETECT_TILE_SIZE,
+                tile_overlap=settings.DETECT_TILE_OVERLAP,
+            )
+        self._cold_start_ms = round((time.perf_counter() - started) * 1000, 2)
+        print(f"✅ AI 모델 준비 완료: {WEIGHTS_PATH} (콜드 스타트 {self._cold_start_ms}ms)")
+
+    # 처음 호출한 스레드가 로드하고, 동시에 들어온 요청은 로드가 끝날 때까지 대기
+    def ensure_loaded(self):
+        if self._state == 'ready':
+            return
+        with self._lock:
+            if self._state == 'ready':
+                return
+            if self._state == 'failed' and not self._can_retry():
+                raise RuntimeError(f"AI 모델이 로드되지 않았습니다: {self._error}")
+            self._state = 'loading'
+            try:
+                self._load()
+            except Exception as e:
+                self._state, self._error, self._failed_at = 'failed', str(e), time.monotonic()
+                print(f"❌ 모델 로드 실패 ({LOAD_RETRY_SECONDS}초 후 다시 시도): {e}")
+                raise RuntimeError(f"AI 모델이 로드되지 않았습니다: {e}") from e
+            self._state, self._error = 'ready', None
+
+    def _can_retry(self):
+        return time.monotonic() - self._failed_at >= LOAD_RETRY_SECONDS
+
+    # 준비 훅 (wsgi/asgi 시작 시 DETECT_PRELOAD, /detect/ready/)
+    # 백그라운드 스레드에서 로드해서 첫 탐지 요청이 콜드 스타트를 기다리지 않게 함
+    def warm_up(self):
+        if self._state not in ('idle', 'failed') or (self._state == 'failed' and not self._can_retry()):
+            return
+        threading.Thread(target=self._warm_up, name='detect-warm-up', daemon=True).start()
+
+    def _warm_up(self):
+        try:
+            self.ensure_loaded()
+        except RuntimeError:
+            pass
+
+    # 워커 풀이 있으면 BGR 이미지를 공유 메모리로 넘기고, 없으면 프로세스 내 배치 스케줄러 사용
+    def _submit(self, img_cv, tiled):
+        if self._pool is not None:
+            return self._pool.submit(img_cv, tiled), None
+        started = time.perf_counter()
+        img_rgb = cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB)
+        color_ms = round((time.perf_counter() - started) * 1000, 3)
+        return self._scheduler.submit(img_rgb, tiled), color_ms
+
+    # 결과는 DETECT_TIMEOUT_S 까지만 기다림 (넘으면 TimeoutError -> 뷰에서 503)
+    def detect(self, img_cv, tiled=False):
+        self.ensure_loaded()
+        future, color_ms = self._submit(img_cv, tiled)
+        result = future.result(timeout=settings.DETECT_TIMEOUT_S)
+        if color_ms is not None:
+            result['color_ms'] = color_ms
+        return result
+
+    # 여러 장 한 번에 추론 (/detect/batch/) - 결과는 images 순서대로
+    # 프로세스 내 스케줄러면 한 번의 forward, 워커 풀이면 장마다 제출해서 워커들이 나눠서 배치 처리
+    def detect_many(self, images_cv, tiled=False):
+        self.ensure_loaded()
+        deadline = time.monotonic() + settings.DETECT_TIMEOUT_S
+        if self._pool is not None:
+            futures = [self._pool.submit(img, tiled) for img in images_cv]
+            return [future.result(timeout=max(0.0, deadline - time.monotonic())) for future in futures]
+        images_rgb, color_times = [], []
+        for img in images_cv:
+            started = time.perf_counter()
+            images_rgb.append(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+            color_times.append(round((time.perf_counter() - started) * 1000, 3))
+        results = [future.result(timeout=max(0.0, deadline - time.monotonic()))
+                   for future in self._scheduler.submit_many(images_rgb, tiled)]
+        for result, color_ms in zip(results, color_times):
+            result['color_ms'] = color_ms
+        return results
+
+    # 비동기 뷰용 - 추론이 끝날 때까지 스레드를 붙잡지 않고 Future 를 await
+    # 색 변환/공유 메모리 복사(_submit)도 큰 패널이면 수 ms 걸리므로 이벤트 루프가 아닌 스레드에서 실행
+    async def detect_async(self, img_cv, tiled=False):
+        if not self.ready:
+            await asyncio.to_thread(self.ensure_loaded)
+        future, color_ms = await asyncio.to_thread(self._submit, img_cv, tiled)
+        result = await asyncio.wait_for(asyncio.wrap_future(future), settings.DETECT_TIMEOUT_S)
+        if color_ms is not None:
+            result['color_ms'] = color_ms
+        return result
+
+    def status(self):
+        status = {
+            "state": self._state,
+            "backend": self.backend or settings.DETECT_BACKEND,
+            "cold_start_ms": self._cold_start_ms,
+        }
+        if self._error:
+            status["error"] = self._error
+        if self._pool is not None:
+            stats = self._pool.stats()
+            status["ready_workers"] = stats["ready_workers"]
+            status["failed_workers"] = stats["failed_workers"]
+        return status
+
+    def stats(self):
+        runner = self._pool or self._scheduler
+        if runner is None:
+            return None
+        return {
+            "inference": runner.stats(),
+            "backend": self._backend_report,
+            "cold_start": self.status(),
+        }
+
+
+detect_engine = DetectionEngine()
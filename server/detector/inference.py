@@ -0,0 +1,460 @@
+import os
+import sys
+import time
+import hashlib
+import functools
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+
+# 상대 경로 기준점 설정
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# YOLOv5 설정 경로
+YOLOV5_PATH = os.path.join(BASE_DIR, "yolov5")
+WEIGHTS_PATH = os.path.join(YOLOV5_PATH, "runs", "train", "pcb_final_run", "weights", "best.pt")
+
+# NMS 임계값 (결과 캐시 키에도 포함됨)
+CONF_THRES = 0.25
+IOU_THRES = 0.45
+
+
+# 추론 백엔드별 산출물 경로 (export.py 가 best.pt 옆에 만드는 이름 그대로)
+WEIGHTS_STEM = os.path.splitext(WEIGHTS_PATH)[0]
+BACKEND_ARTIFACTS = {
+    'pt': WEIGHTS_PATH,
+    'torchscript': f"{WEIGHTS_STEM}.torchscript",
+    'onnx': f"{WEIGHTS_STEM}.onnx",
+    'openvino': f"{WEIGHTS_STEM}_openvino_model",
+    # yolov5/quantize.py 가 정확도 검증(mAP 하락 한도)을 통과했을 때만 만드는 INT8 모델
+    'onnx_int8': f"{WEIGHTS_STEM}_int8.onnx",
+    'openvino_int8': f"{WEIGHTS_STEM}_int8_openvino_model",
+}
+# INT8 백엔드 - 자동 export 하지 않고, 양자화 오차를 감안해서 pt 비교 기준을 완화
+QUANTIZED_BACKENDS = ('onnx_int8', 'openvino_int8')
+QUANTIZED_PARITY = {"iou_thres": 0.7, "conf_tol": 0.1}
+# 입력 크기가 고정(640x640)으로 export 되는 백엔드 - 정사각 letterbox 필요
+# 배치 차원은 로드한 모델에서 직접 확인 (has_dynamic_batch) - 고정이면 마이크로 배치/타일 배치 없이 한 장씩 추론
+FIXED_SHAPE_BACKENDS = ('torchscript', 'onnx_int8', 'openvino_int8')
+
+# 백엔드 검증/속도 측정용 샘플 보드 이미지
+SAMPLE_IMAGE = os.path.join(BASE_DIR, "qa", "test_pcb.jpg")
+
+
+def export_backend(backend):
+    if YOLOV5_PATH not in sys.path:
+        sys.path.insert(0, YOLOV5_PATH)
+    import export
+
+    # onnx/openvino 는 배치/해상도 가변 입력으로 export (마이크로 배칭, 직사각 letterbox 대응)
+    export.run(
+        weights=WEIGHTS_PATH,
+        include=[backend],
+        imgsz=(640, 640),
+        device='cpu',
+        dynamic=backend in ('onnx', 'openvino'),
+    )
+
+
+# 산출물이 없거나 best.pt 보다 오래됐으면 다시 export
+def backend_artifact(backend):
+    if backend not in BACKEND_ARTIFACTS:
+        raise ValueError(f"지원하지 않는 추론 백엔드입니다: {backend} ({', '.join(BACKEND_ARTIFACTS)})")
+    path = BACKEND_ARTIFACTS[backend]
+    if backend in QUANTIZED_BACKENDS:
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"INT8 모델이 없습니다: {path} (yolov5/quantize.py 로 먼저 생성하세요)"
+            )
+        return path
+    if backend != 'pt' and (not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(WEIGHTS_PATH)):
+        print(f"🔧 {backend} 모델 export 중: {path}")
+        export_backend(backend)
+    return path
+
+
+# torch.hub 를 거치지 않고 DetectMultiBackend + AutoShape 를 직접 구성 (hubconf 의 requirements 검사/pip 호출은 건너뜀)
+# models.common 이 utils.general(pandas)/utils.plots(ultralytics) 를 import 하므로 yolov5 모듈 import 비용은 그대로
+# 기본 pt 백엔드는 시작할 때 best.pt 를 읽어서 fuse 까지 함
+# torchscript/onnx/openvino 산출물은 export 시 이미 fuse 된 상태로 저장돼서 로드만 하면 됨 (콜드 스타트 단축)
+def load_model(backend='pt'):
+    path = backend_artifact(backend)
+    if YOLOV5_PATH not in sys.path:
+        sys.path.insert(0, YOLOV5_PATH)
+    import torch
+    from models.common import AutoShape, DetectMultiBackend
+
+    backend_model = DetectMultiBackend(path, device=torch.device('cpu'), fuse=True)
+    model = AutoShape(backend_model)
+    model.conf = CONF_THRES
+    model.iou = IOU_THRES
+    model.square = backend in FIXED_SHAPE_BACKENDS
+    model.fixed_batch = backend != 'pt' and not has_dynamic_batch(backend_model)
+    return model
+
+
+# 로드한 모델 입력의 배치 차원이 가변인지
+# onnx 는 입력 shape 첫 차원이 심볼릭('batch' 등)인지, openvino 는 partial shape 첫 차원이 동적인지 확인
+# torchscript 나 확인할 수 없는 모델은 고정으로 봄 (예전에 배치 1 로 export/양자화한 모델)
+def has_dynamic_batch(backend_model):
+    session = getattr(backend_model, 'session', None)
+    if session is not None:
+        return not isinstance(session.get_inputs()[0].shape[0], int)
+    compiled = getattr(backend_model, 'ov_compiled_model', None)
+    if compiled is not None:
+        return compiled.inputs[0].get_partial_shape()[0].is_dynamic
+    return False
+
+
+def sample_image():
+    img = cv2.imread(SAMPLE_IMAGE)
+    if img is None:
+        raise FileNotFoundError(SAMPLE_IMAGE)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+# 워밍업 후 샘플 이미지 1장 추론 시간의 중앙값 (ms)
+def benchmark(model, img, runs=10):
+    model([img])
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        model([img])
+        times.append((time.perf_counter() - started) * 1000)
+    return round(float(np.median(times)), 2)
+
+
+def _box_iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+# 결과 비교용 배치 - 샘플 보드와 좌우 반전본 2장
+def parity_images(img):
+    return [img, np.ascontiguousarray(img[:, ::-1])]
+
+
+# 기준(pt) 모델과 후보 백엔드의 탐지 결과 비교
+# 같은 클래스 + IoU >= iou_thres 로 짝이 맞아야 하고 confidence 차이는 conf_tol 이내
+# 여러 장을 한 배치로 넣어서 배치 입력도 함께 검증 (배치가 고정된 백엔드는 서비스할 때처럼 한 장씩)
+def check_parity(reference, candidate, images, iou_thres=0.9, conf_tol=0.02):
+    ref_preds = [pred.tolist() for pred in reference(images).pred]
+    if getattr(candidate, 'fixed_batch', False):
+        cand_preds = [candidate([img]).pred[0].tolist() for img in images]
+    else:
+        cand_preds = [pred.tolist() for pred in candidate(images).pred]
+
+    n_ref = n_cand = matched = 0
+    max_conf_diff = 0.0
+    for ref, cand in zip(ref_preds, cand_preds):
+        n_ref, n_cand = n_ref + len(ref), n_cand + len(cand)
+        unmatched = list(range(len(cand)))
+        for r in ref:
+            best, best_iou = None, iou_thres
+            for j in unmatched:
+                iou = _box_iou(r, cand[j])
+                if int(cand[j][5]) == int(r[5]) and iou >= best_iou:
+                    best, best_iou = j, iou
+            if best is not None:
+                unmatched.remove(best)
+                matched += 1
+                max_conf_diff = max(max_conf_diff, abs(r[4] - cand[best][4]))
+    ok = len(ref_preds) == len(cand_preds) and matched == n_ref == n_cand and max_conf_diff <= conf_tol
+    return {
+        "ok": ok,
+        "images": len(images),
+        "reference": n_ref,
+        "candidate": n_cand,
+        "matched": matched,
+        "max_conf_diff": round(max_conf_diff, 4),
+    }
+
+
+# 후보 백엔드 모델을 pt 모델과 비교 - 어긋나면 pt 모델로 대체
+# 반환: (사용할 모델, 백엔드 이름, 비교 결과)
+def _check_backend(model, backend, img):
+    reference = load_model('pt')
+    tolerance = QUANTIZED_PARITY if backend in QUANTIZED_BACKENDS else {}
+    try:
+        parity = check_parity(reference, model, parity_images(img), **tolerance)
+    except Exception as e:
+        parity = {"ok": False, "error": str(e)}
+    if not parity["ok"]:
+        print(f"❌ {backend} 결과가 pt 와 다릅니다 {parity} -> pt 백엔드로 대체")
+        return reference, 'pt', parity
+    return model, backend, parity
+
+
+# 설정된 백엔드로 모델 준비
+# validate=True 면 pt 모델과 결과를 비교해서 어긋나면 pt 로 되돌림
+def prepare_model(backend='pt', validate=True, runs=10):
+    started = time.perf_counter()
+    model = load_model(backend)
+    report = {"backend": backend, "load_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+    try:
+        img = sample_image()
+    except FileNotFoundError:
+        print(f"⚠️ 샘플 이미지가 없어 백엔드 검증/속도 측정을 건너뜁니다: {SAMPLE_IMAGE}")
+        return model, report
+
+    if backend != 'pt' and validate:
+        model, report["backend"], report["parity"] = _check_backend(model, backend, img)
+
+    report["latency_ms"] = benchmark(model, img, runs)
+    print(f"⏱️ 추론 백엔드 {report['backend']}: 샘플 1장 {report['latency_ms']}ms (로드 {report['load_ms']}ms)")
+    return model, report
+
+
+# 사용할 백엔드만 결정 (산출물 export + pt 결과 비교, 모델은 돌려주지 않음)
+# 워커 풀이 워커를 띄우기 전에 한 번만 실행하고, 결정된 백엔드를 모든 워커에 validate=False 로 넘김
+#   -> 워커마다 export 를 동시에 돌리거나 워커끼리 다른 백엔드로 서비스하는 일이 없음
+def resolve_backend(backend='pt', validate=True):
+    report = {"backend": backend}
+    if backend == 'pt':
+        return report
+    model = load_model(backend)
+    if not validate:
+        return report
+    try:
+        img = sample_image()
+    except FileNotFoundError:
+        print(f"⚠️ 샘플 이미지가 없어 백엔드 검증을 건너뜁니다: {SAMPLE_IMAGE}")
+        return report
+    _, report["backend"], report["parity"] = _check_backend(model, backend, img)
+    return report
+
+
+# 가중치 파일 내용 해시 (가중치가 바뀌면 캐시 키도 바뀌도록)
+@functools.lru_cache(maxsize=None)
+def weights_fingerprint(path=WEIGHTS_PATH):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+# results.pandas().xyxy[i].to_dict(orient="records") 와 같은 형태로 변환 (pandas 거치지 않음)
+def to_records(pred, names):
+    records = []
+    for x1, y1, x2, y2, conf, cls in pred.tolist():
+        records.append({
+            "xmin": x1,
+            "ymin": y1,
+            "xmax": x2,
+            "ymax": y2,
+            "confidence": conf,
+            "class": int(cls),
+            "name": names[int(cls)],
+        })
+    return records
+
+
+# AutoShape.forward 가 Detections.t 에 남기는 이미지당 구간 시간 (ms)
+def stage_times(results):
+    preprocess, forward, nms = results.t
+    return {"letterbox": round(preprocess, 3), "forward": round(forward, 3), "nms": round(nms, 3)}
+
+
+class _PendingRequest:
+    __slots__ = ('image', 'tiled', 'future', 'enqueued_at')
+
+    def __init__(self, image, tiled=False):
+        self.image = image
+        self.tiled = tiled
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+# 마이크로 배칭 스케줄러
+# 여러 요청을 max_wait_ms 동안 모아서 AutoShape 에 리스트로 한 번에 넣음
+# (letterbox -> 하나의 텐서 -> forward 1회 -> 배치 NMS) 후 결과를 각 요청에 돌려줌
+# 타일 모드 요청은 이미지 한 장의 타일들이 이미 하나의 배치라서 요청별로 forward_tiled 실행
+# submit_many 로 들어온 여러 장(/detect/batch/)은 다른 요청과 섞지 않고 그대로 한 번의 forward 로 처리
+class BatchScheduler:
+    STATS_WINDOW = 1000
+
+    def __init__(self, model, max_batch_size=8, max_wait_ms=10.0, size=640, tile_size=640, tile_overlap=0.2,
+                 tile_batch=16):
+        self.model = model
+        # 입력 배치가 1 로 고정된 백엔드는 요청/타일을 한 장씩 추론
+        self.fixed_batch = getattr(model, 'fixed_batch', False)
+        self.max_batch_size = 1 if self.fixed_batch else max(1, int(max_batch_size))
+        self.tile_batch = 1 if self.fixed_batch else max(1, int(tile_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self.size = size
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+
+        self._queue = queue.Queue()
+        self._carry = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # 튜닝용 통계
+        self._total_requests = 0
+        self._total_batches = 0
+        self._tiled_requests = 0
+        self._batch_sizes = {}
+        self._queue_ms = deque(maxlen=self.STATS_WINDOW)
+        self._inference_ms = deque(maxlen=self.STATS_WINDOW)
+
+    def submit(self, img_rgb, tiled=False):
+        self._ensure_worker()
+        request = _PendingRequest(img_rgb, tiled)
+        self._queue.put(request)
+        return request.future
+
+    # 여러 장을 묶음으로 제출 (큐에는 max_batch_size 장씩 나눈 목록으로 들어가서 묶음마다 한 번에 추론)
+    # 배치가 고정된 백엔드는 max_batch_size 가 1 이라 한 장씩 제출
+    def submit_many(self, images_rgb, tiled=False):
+        self._ensure_worker()
+        requests = [_PendingRequest(img, tiled) for img in images_rgb]
+        group = self.max_batch_size
+        for i in range(0, len(requests), group):
+            self._queue.put(requests[i:i + group])
+        return [r.future for r in requests]
+
+    def detect(self, img_rgb, tiled=False, timeout=None):
+        return self.submit(img_rgb, tiled).result(timeout=timeout)
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name='detect-batcher', daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        first, self._carry = self._carry or self._queue.get(), None
+        if isinstance(first, list):
+            return first
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                # 대기 시간이 지났어도 이미 큐에 쌓인 요청은 같이 처리
+                if remaining <= 0:
+                    item = self._queue.get_nowait()
+                else:
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            # 여러 장 묶음은 다음 차례에 따로 처리
+            if isinstance(item, list):
+                self._carry = item
+                break
+            batch.append(item)
+        return batch
+
+    # 배치 하나에서 예외가 나도 스레드는 계속 돌고, 아직 결과가 없는 요청만 실패 처리
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            try:
+                for r in batch:
+                    if r.tiled:
+                        self._run_tiled(r)
+                batch = [r for r in batch if not r.tiled]
+                if batch:
+                    self._run(batch)
+            except Exception as e:
+                for r in batch:
+                    if not r.future.done():
+                        r.future.set_exception(e)
+
+    def _run_tiled(self, r):
+        started = time.perf_counter()
+        try:
+            results = self.model.forward_tiled(
+                r.image, tile=self.tile_size, overlap=self.tile_overlap, batch=self.tile_batch
+            )
+            inference_ms = (time.perf_counter() - started) * 1000
+            queue_ms = (started - r.enqueued_at) * 1000
+            result = {
+                "detections": to_records(results.pred[0], results.names),
+                "queue_ms": round(queue_ms, 2),
+                "inference_ms": round(inference_ms, 2),
+                "batch_size": results.s[0],
+                "stage_ms": stage_times(results),
+            }
+        except Exception as e:
+            r.future.set_exception(e)
+            return
+        r.future.set_result(result)
+
+        # 타일 요청은 요청 1건 = forward_tiled 1회 (타일 수는 배치 크기 분포에 넣지 않음)
+        with self._lock:
+            self._total_requests += 1
+            self._total_batches += 1
+            self._tiled_requests += 1
+            self._queue_ms.append(queue_ms)
+            self._inference_ms.append(inference_ms)
+
+    def _run(self, batch):
+        started = time.perf_counter()
+        try:
+            results = self.model([r.image for r in batch], size=self.size)
+            inference_ms = (time.perf_counter() - started) * 1000
+            stage_ms = stage_times(results)
+            outputs = [to_records(results.pred[i], results.names) for i in range(len(batch))]
+        except Exception as e:
+            for r in batch:
+                r.future.set_exception(e)
+            return
+
+        queue_times = []
+        for r, detections in zip(batch, outputs):
+            queue_ms = (started - r.enqueued_at) * 1000
+            queue_times.append(queue_ms)
+            r.future.set_result({
+                "detections": detections,
+                "queue_ms": round(queue_ms, 2),
+                "inference_ms": round(inference_ms, 2),
+                "batch_size": len(batch),
+                "stage_ms": stage_ms,
+            })
+
+        with self._lock:
+            self._total_requests += len(batch)
+            self._total_batches += 1
+            self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+            self._queue_ms.extend(queue_times)
+            self._inference_ms.append(inference_ms)
+
+    def stats(self):
+        with self._lock:
+            queue_ms = np.array(self._queue_ms) if self._queue_ms else np.zeros(1)
+            inference_ms = np.array(self._inference_ms) if self._inference_ms else np.zeros(1)
+            return {
+                "max_batch_size": self.max_batch_size,
+                "fixed_batch": self.fixed_batch,
+                "max_wait_ms": self.max_wait * 1000,
+                "pending": self._queue.qsize(),
+                "total_requests": self._total_requests,
+                "total_batches": self._total_batches,
+                "tiled_requests": self._tiled_requests,
+                "avg_batch_size": round(self._total_requests / self._total_batches, 2) if self._total_batches else 0,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "queue_ms": {
+                    "avg": round(float(queue_ms.mean()), 2),
+                    "p50": round(float(np.percentile(queue_ms, 50)), 2),
+                    "p95": round(float(np.percentile(queue_ms, 95)), 2),
+                    "max": round(float(queue_ms.max()), 2),
+                },
+                "inference_ms": {
+                    "avg": round(float(inference_ms.mean()), 2),
+                    "p95": round(float(np.percentile(inference_ms, 95)), 2),
+                },
+            }
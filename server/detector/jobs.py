@@ -0,0 +1,233 @@
+import os
+import time
+import socket
+import datetime
+import importlib
+import threading
+import traceback
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections, transaction
+from django.db.models import Avg, Count, Max
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+# DB 테이블(background_jobs) 기반 작업 큐
+# 업로드/삭제 요청은 후속 작업(썸네일/타일, 성능 데이터 Parquet 변환, 미디어 참조 해제)을 같은 트랜잭션 안에서 작업 행으로만 등록
+# 업로드 저장/탐지 결과 기록 자체는 요청 안에서 처리하고, 커밋된 작업만 워커가 가져감
+# 웹 프로세스가 죽어도 작업은 테이블에 남아 있어서 다른 워커가 이어서 처리
+#   워커: python manage.py run_jobs (별도 프로세스) 또는 JOB_INPROCESS_WORKERS 만큼 웹 프로세스 안의 스레드
+#   실패하면 RETRY_BASE_SECONDS * 2^(시도 횟수-1) 뒤에 다시 시도, max_attempts 를 넘기면 FAILED
+#   RUNNING 인 채로 JOB_TIMEOUT 이 지난 작업은 워커가 죽은 것으로 보고 다시 대기열로 (또는 FAILED)
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = -10
+RETRY_BASE_SECONDS = 10
+MAINTENANCE_INTERVAL = 60
+# 처리 함수를 등록하는 모듈 (워커가 시작할 때 import 해서 register 가 실행되게 함)
+JOB_MODULES = ('detector.derivatives', 'detector.performance', 'detector.storage')
+
+_handlers = {}
+_wakeup = threading.Event()
+_inprocess_lock = threading.Lock()
+_inprocess_threads = []
+
+
+# 작업 종류별 처리 함수 등록 - 처리 함수는 payload 를 키워드 인자로 받음
+# atomic=True 면 처리 함수와 완료 기록을 한 트랜잭션으로 묶어서 같은 작업이 두 번 반영되지 않게 함 (참조 수 차감 등)
+def register(kind, atomic=False):
+    def decorator(func):
+        _handlers[kind] = (func, atomic)
+        return func
+    return decorator
+
+
+def load_handlers():
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+
+
+def worker_name(suffix=''):
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{name}:{suffix}" if suffix else name
+
+
+# 작업 등록 - 호출한 쪽 트랜잭션이 커밋될 때 함께 보이고, 롤백되면 작업도 사라짐
+def enqueue(kind, payload=None, priority=PRIORITY_NORMAL, max_attempts=3, delay=0):
+    job = BackgroundJob.objects.create(
+        kind=kind,
+        payload=payload or {},
+        priority=priority,
+        max_attempts=max_attempts,
+        run_after=timezone.now() + datetime.timedelta(seconds=delay),
+    )
+    # 같은 프로세스의 워커 스레드는 폴링 간격을 기다리지 않고 바로 가져감
+    transaction.on_commit(_wakeup.set)
+    return job
+
+
+def _elapsed_ms(start, end):
+    return max(0, int((end - start).total_seconds() * 1000))
+
+
+# 대기 중인 작업 하나를 가져와서 RUNNING 으로 표시 (다른 워커가 잠근 행은 건너뜀)
+def claim(worker, kinds=None):
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = BackgroundJob.objects.select_for_update(skip_locked=True).filter(
+            status='QUEUED', run_after__lte=now
+        )
+        if kinds:
+            queryset = queryset.filter(kind__in=kinds)
+        job = queryset.order_by('-priority', 'run_after', 'id').first()
+        if job is None:
+            return None
+        job.status = 'RUNNING'
+        job.attempts += 1
+        job.locked_by = worker
+        job.locked_at = now
+        job.started_at = now
+        job.wait_ms = _elapsed_ms(job.run_after, now)
+        job.save(update_fields=['status', 'attempts', 'locked_by', 'locked_at', 'started_at', 'wait_ms'])
+    return job
+
+
+# 가져온 작업 실행 후 결과 기록
+# 완료/실패 기록은 아직 이 워커가 잡고 있는 경우에만 (시간 초과로 다른 워커에 넘어간 작업은 건드리지 않음)
+def execute(job):
+    func, atomic = _handlers.get(job.kind, (None, False))
+    owned = BackgroundJob.objects.filter(id=job.id, status='RUNNING', locked_by=job.locked_by)
+    started = time.perf_counter()
+    try:
+        if func is None:
+            raise LookupError(f"등록되지 않은 작업 종류입니다: {job.kind}")
+        if atomic:
+            with transaction.atomic():
+                if not owned.select_for_update().exists():
+                    return False
+                func(**job.payload)
+                owned.update(**_done_fields(started))
+        else:
+            func(**job.payload)
+            owned.update(**_done_fields(started))
+        return True
+    except Exception as e:
+        retry = job.attempts < job.max_attempts
+        fields = {
+            "status": 'QUEUED' if retry else 'FAILED',
+            "last_error": traceback.format_exc()[-4000:],
+            "locked_by": '',
+            "finished_at": None if retry else timezone.now(),
+            "duration_ms": int((time.perf_counter() - started) * 1000),
+        }
+        if retry:
+            fields["run_after"] = timezone.now() + datetime.timedelta(
+                seconds=RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+            )
+        owned.update(**fields)
+        print(f"❌ 작업 실패: {job.kind} #{job.id} ({job.attempts}/{job.max_attempts}회) - {e}")
+        return False
+
+
+def _done_fields(started):
+    return {
+        "status": 'DONE',
+        "last_error": '',
+        "locked_by": '',
+        "finished_at": timezone.now(),
+        "duration_ms": int((time.perf_counter() - started) * 1000),
+    }
+
+
+# RUNNING 인 채로 JOB_TIMEOUT 이 지난 작업 (워커 프로세스가 죽은 경우) 을 다시 대기열로
+# 시도 횟수를 다 쓴 작업은 FAILED
+def requeue_stale():
+    deadline = timezone.now() - datetime.timedelta(seconds=settings.JOB_TIMEOUT)
+    with transaction.atomic():
+        stale = list(BackgroundJob.objects.select_for_update(skip_locked=True).filter(
+            status='RUNNING', locked_at__lt=deadline
+        ))
+        for job in stale:
+            retry = job.attempts < job.max_attempts
+            job.status = 'QUEUED' if retry else 'FAILED'
+            job.last_error = f"시간 초과: {job.locked_by} 에서 {settings.JOB_TIMEOUT}초 안에 끝나지 않음"
+            job.locked_by = ''
+            job.run_after = timezone.now()
+            job.finished_at = None if retry else timezone.now()
+            job.save(update_fields=['status', 'last_error', 'locked_by', 'run_after', 'finished_at'])
+    return len(stale)
+
+
+# 끝난 작업 기록 정리 (DONE 은 JOB_RETENTION_DAYS, FAILED 는 그 두 배 동안 보관)
+def purge_finished():
+    now = timezone.now()
+    retention = datetime.timedelta(days=settings.JOB_RETENTION_DAYS)
+    done, _ = BackgroundJob.objects.filter(status='DONE', finished_at__lt=now - retention).delete()
+    failed, _ = BackgroundJob.objects.filter(status='FAILED', finished_at__lt=now - retention * 2).delete()
+    return done + failed
+
+
+# 워커 루프 - 작업이 없으면 JOB_POLL_INTERVAL 동안 대기 (같은 프로세스에서 등록하면 바로 깨어남)
+# once=True 면 지금 처리할 수 있는 작업을 모두 처리하고 종료
+def work(worker, kinds=None, once=False, stop=None):
+    load_handlers()
+    last_maintenance = 0.0
+    processed = 0
+    while not (stop and stop.is_set()):
+        try:
+            if time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL:
+                last_maintenance = time.monotonic()
+                requeue_stale()
+                purge_finished()
+            job = claim(worker, kinds)
+        except DatabaseError as e:
+            print(f"⚠️ 작업 큐 조회 실패 ({worker}): {e}")
+            connections.close_all()
+            time.sleep(settings.JOB_POLL_INTERVAL)
+            continue
+
+        if job is None:
+            if once:
+                break
+            _wakeup.wait(settings.JOB_POLL_INTERVAL)
+            _wakeup.clear()
+            continue
+
+        execute(job)
+        processed += 1
+        close_old_connections()
+    connections.close_all()
+    return processed
+
+
+# 웹 프로세스 안에서 돌리는 워커 스레드 (wsgi/asgi 에서 호출, JOB_INPROCESS_WORKERS 가 0 이면 시작하지 않음)
+# 별도 run_jobs 워커를 띄우는 배포에서는 0 으로 두면 웹 프로세스는 작업 등록만 함
+def start_inprocess_workers():
+    with _inprocess_lock:
+        if _inprocess_threads:
+            return
+        for i in range(settings.JOB_INPROCESS_WORKERS):
+            thread = threading.Thread(
+                target=work, args=(worker_name(f"thread-{i}"),), name=f'job-worker-{i}', daemon=True
+            )
+            thread.start()
+            _inprocess_threads.append(thread)
+
+
+# 종류/상태별 작업 수와 처리 시간 (관리 명령 run_jobs --stats, /jobs/stats/)
+def stats():
+    rows = (BackgroundJob.objects.values('kind', 'status')
+            .annotate(count=Count('id'), avg_wait_ms=Avg('wait_ms'), avg_duration_ms=Avg('duration_ms'),
+                      max_duration_ms=Max('duration_ms'))
+            .order_by('kind', 'status'))
+    result = {}
+    for row in rows:
+        entry = result.setdefault(row['kind'], {})
+        entry[row['status']] = {
+            "count": row['count'],
+            "avg_wait_ms": round(row['avg_wait_ms'], 1) if row['avg_wait_ms'] is not None else None,
+            "avg_duration_ms": round(row['avg_duration_ms'], 1) if row['avg_duration_ms'] is not None else None,
+            "max_duration_ms": row['max_duration_ms'],
+        }
+    return result
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from detector.inference import BACKEND_ARTIFACTS, QUANTIZED_BACKENDS, QUANTIZED_PARITY, load_model, sample_image, benchmark, check_parity, parity_images
+
+
+# 추론 백엔드 비교: python manage.py detect_backends [--backends pt onnx ...] [--runs 20]
+# 없는 산출물은 export 하고, pt 기준 결과 일치 여부(2장 배치)와 샘플 1장 추론 시간을 표로 출력
+class Command(BaseCommand):
+    help = "각 추론 백엔드를 export/검증하고 샘플 보드 추론 속도를 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='+', default=list(BACKEND_ARTIFACTS), choices=list(BACKEND_ARTIFACTS))
+        parser.add_argument('--runs', type=int, default=20)
+
+    def handle(self, *args, **options):
+        img = sample_image()
+        reference = load_model('pt')
+
+        rows = []
+        for backend in options['backends']:
+            try:
+                model = reference if backend == 'pt' else load_model(backend)
+                tolerance = QUANTIZED_PARITY if backend in QUANTIZED_BACKENDS else {}
+                parity = check_parity(reference, model, parity_images(img), **tolerance) if backend != 'pt' else None
+                latency = benchmark(model, img, options['runs'])
+                rows.append((backend, latency, parity))
+            except Exception as e:
+                self.stderr.write(f"❌ {backend}: {e}")
+
+        self.stdout.write(f"{'backend':<14}{'latency(ms)':>12}  parity")
+        for backend, latency, parity in sorted(rows, key=lambda r: r[1]):
+            if parity is None:
+                parity_text = "기준"
+            else:
+                parity_text = f"{'OK' if parity['ok'] else 'MISMATCH'} (matched {parity['matched']}/{parity['reference']}, max conf diff {parity['max_conf_diff']})"
+            self.stdout.write(f"{backend:<14}{latency:>12}  {parity_text}")
+
+        if rows:
+            fastest = min((r for r in rows if r[2] is None or r[2]['ok']), key=lambda r: r[1], default=None)
+            if fastest:
+                self.stdout.write(self.style.SUCCESS(f"가장 빠른 백엔드: {fastest[0]} -> DETECT_BACKEND={fastest[0]}"))
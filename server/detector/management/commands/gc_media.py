@@ -0,0 +1,132 @@
+import os
+import re
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from detector.models import AnalysisMaterials, MediaBlob
+from detector.derivatives import remove_orphan_derivatives
+from detector.performance import remove_orphan_parquet
+from detector.storage import detected_results_store, performance_data_store, is_blob_name
+
+FIELDS = (
+    (detected_results_store, 'defect_image_url'),
+    (performance_data_store, 'performance_data_url'),
+)
+LEGACY_PREFIX_RE = re.compile(r'^\d+_')
+GRACE_SECONDS = 3600
+
+
+# 미디어 저장소 정리: python manage.py gc_media [--adopt-legacy] [--dry-run]
+# --adopt-legacy : 예전 방식(<timestamp>_<name>) 파일을 내용 해시 저장소로 옮기고 DB 경로를 바꿈 (같은 내용은 하나로 합쳐짐)
+# 참조 수를 analysis_materials 기준으로 다시 맞추고, 참조 없는 파일/오래된 임시 파일/썸네일·타일/성능 데이터 변환 파일을 삭제
+class Command(BaseCommand):
+    help = "내용 해시 미디어 저장소의 참조 수를 맞추고 참조되지 않는 파일을 삭제합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--adopt-legacy', action='store_true')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        for store, field in FIELDS:
+            if options['adopt_legacy']:
+                self.adopt_legacy(store, field, dry_run)
+            self.recount(store, field, dry_run)
+            self.remove_orphans(store, field, dry_run)
+            if not dry_run:
+                store.cleanup_tmp()
+        live_images = AnalysisMaterials.objects.exclude(defect_image_url__isnull=True).values_list('defect_image_url', flat=True)
+        removed = remove_orphan_derivatives(live_images, dry_run)
+        self.stdout.write(f"derived: 참조 없는 썸네일/타일 {removed}개 {'삭제 예정' if dry_run else '삭제'}")
+        removed = remove_orphan_parquet(dry_run)
+        self.stdout.write(f"performance_parquet: 참조 없는 변환 파일 {removed}개 {'삭제 예정' if dry_run else '삭제'}")
+
+    def adopt_legacy(self, store, field, dry_run):
+        legacy = Counter(
+            name for name in AnalysisMaterials.objects.exclude(**{f"{field}__isnull": True})
+            .exclude(**{field: ''}).values_list(field, flat=True)
+            if not is_blob_name(name)
+        )
+        adopted = 0
+        for name, refs in legacy.items():
+            path = store.path(name)
+            if path is None or not os.path.exists(path):
+                self.stderr.write(f"⚠️ {store.kind}/{name}: 파일이 없어 건너뜀")
+                continue
+            if dry_run:
+                adopted += 1
+                continue
+            staged = store.stage_file(path, LEGACY_PREFIX_RE.sub('', name))
+            try:
+                with transaction.atomic():
+                    new_name = store.commit(staged, refs=refs)
+                    AnalysisMaterials.objects.filter(**{field: name}).update(**{field: new_name})
+            except Exception:
+                # 옮겨둔 파일을 원래 자리로 되돌림
+                if os.path.exists(staged.tmp_path):
+                    os.replace(staged.tmp_path, path)
+                raise
+            adopted += 1
+        self.stdout.write(f"{store.kind}: 예전 파일 {adopted}개 {'옮길 예정' if dry_run else '옮김'}")
+
+    # analysis_materials 에서 실제 참조 수를 세서 media_blobs.ref_count 를 맞춤
+    def recount(self, store, field, dry_run):
+        actual = Counter(
+            name for name in AnalysisMaterials.objects.values_list(field, flat=True) if is_blob_name(name)
+        )
+        fixed = 0
+        with transaction.atomic():
+            for blob in MediaBlob.objects.select_for_update().filter(kind=store.kind):
+                refs = actual.pop(blob.name, 0)
+                if blob.ref_count != refs:
+                    fixed += 1
+                    if not dry_run:
+                        MediaBlob.objects.filter(pk=blob.pk).update(ref_count=refs)
+            # DB 에는 있는데 media_blobs 행이 없는 파일 (commit 후 롤백 등)
+            for name, refs in actual.items():
+                path = store.path(name)
+                if not os.path.exists(path):
+                    self.stderr.write(f"⚠️ {store.kind}/{name}: 참조되지만 파일이 없음")
+                    continue
+                fixed += 1
+                if not dry_run:
+                    sha256 = os.path.splitext(os.path.basename(name))[0]
+                    MediaBlob.objects.update_or_create(
+                        kind=store.kind, name=name,
+                        defaults={"ref_count": refs},
+                        create_defaults={"sha256": sha256, "size": os.path.getsize(path), "ref_count": refs},
+                    )
+        self.stdout.write(f"{store.kind}: 참조 수 {fixed}건 {'수정 예정' if dry_run else '수정'}")
+
+    def remove_orphans(self, store, field, dry_run):
+        removed = 0
+        # 참조 수 0 인 저장소 파일
+        if dry_run:
+            removed += MediaBlob.objects.filter(kind=store.kind, ref_count__lte=0).count()
+        else:
+            with transaction.atomic():
+                for blob in MediaBlob.objects.select_for_update().filter(kind=store.kind, ref_count__lte=0):
+                    store._unlink(blob.name)
+                    blob.delete()
+                    removed += 1
+
+        # DB 어디에서도 참조하지 않는 파일 (media_blobs 에 없는 샤드 파일, 참조 없는 예전 파일)
+        # 진행 중인 업로드가 막 옮긴 파일은 아직 커밋 전일 수 있어서 최근 파일은 건너뜀
+        now = time.time()
+        referenced = set(AnalysisMaterials.objects.values_list(field, flat=True))
+        referenced.update(MediaBlob.objects.filter(kind=store.kind).values_list('name', flat=True))
+        if os.path.isdir(store.root):
+            for dirpath, dirnames, filenames in os.walk(store.root):
+                dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+                for filename in filenames:
+                    name = os.path.relpath(os.path.join(dirpath, filename), store.root).replace(os.sep, '/')
+                    path = os.path.join(dirpath, filename)
+                    if name in referenced or store.path(name) is None or now - os.path.getmtime(path) < GRACE_SECONDS:
+                        continue
+                    removed += 1
+                    if not dry_run:
+                        os.remove(path)
+        self.stdout.write(f"{store.kind}: 참조 없는 파일 {removed}개 {'삭제 예정' if dry_run else '삭제'}")
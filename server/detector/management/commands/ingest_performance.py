@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from detector.models import AnalysisMaterials, PerformanceDataset
+from detector.performance import ingest
+
+
+# 성능 데이터 Parquet 변환: python manage.py ingest_performance [--backfill] [--retry-failed]
+# 작업 큐에서 재시도까지 실패한 건이나 작업 큐 도입 전에 PENDING 으로 남은 건을 직접 처리
+# --backfill : 변환 대상 등록 전에 올라온 분석 결과도 등록해서 변환
+class Command(BaseCommand):
+    help = "업로드된 성능 데이터(엑셀/CSV)를 Parquet 로 변환합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backfill', action='store_true')
+        parser.add_argument('--retry-failed', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            materials = (AnalysisMaterials.objects.filter(performance_dataset__isnull=True)
+                         .exclude(performance_data_url__isnull=True).exclude(performance_data_url='')
+                         .values_list('id', 'project_id', 'performance_data_url'))
+            created = PerformanceDataset.objects.bulk_create([
+                PerformanceDataset(material_id=mid, project_id=pid, source_name=name)
+                for mid, pid, name in materials
+            ], batch_size=1000)
+            self.stdout.write(f"변환 대상 {len(created)}건 등록")
+
+        statuses = ['PENDING', 'FAILED'] if options['retry_failed'] else ['PENDING']
+        ready = failed = 0
+        for dataset_id in PerformanceDataset.objects.filter(status__in=statuses).order_by('id').values_list('id', flat=True):
+            try:
+                ingest(dataset_id)
+                ready += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"⚠️ dataset {dataset_id}: {e}")
+        self.stdout.write(f"✅ 변환 완료 {ready}건, 실패 {failed}건")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from detector.analytics import rebuild_rollups
+from detector.models import DefectRollup
+
+
+# 결함 집계 테이블 재계산: python manage.py rebuild_rollups
+# 평소에는 업로드마다 누적되므로 최초 도입 시(기존 분석 결과 반영)나 집계가 어긋났을 때만 실행
+class Command(BaseCommand):
+    help = "detections / analysis_materials 기준으로 defect_rollups 를 다시 계산합니다."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_rollups()
+        self.stdout.write(f"✅ 집계 재계산 완료: {DefectRollup.objects.count()}행")
@@ -0,0 +1,61 @@
+import json
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+
+
+# 자식 프로세스 진입점 - spawn 으로 시작하므로 Django 설정부터 다시 로드
+# (이 모듈은 자식에서 다시 import 되기 때문에 models 를 쓰는 모듈은 함수 안에서 import)
+def _worker_process(index, kinds, once):
+    import django
+
+    django.setup()
+    from detector.jobs import work, worker_name
+
+    work(worker_name(f"process-{index}"), kinds, once)
+
+
+# 업로드 후처리 작업 큐 워커: python manage.py run_jobs [--workers N] [--kinds a,b] [--once] [--stats]
+# --workers : 워커 프로세스 수 (작업마다 CPU 를 많이 쓰므로 코어 수 이하 권장)
+# --kinds   : 처리할 작업 종류만 (예: thumbnails.generate,performance.ingest)
+# --once    : 지금 대기 중인 작업을 모두 처리하고 종료 (cron 등)
+# --stats   : 종류/상태별 작업 수와 평균 대기/처리 시간만 출력
+class Command(BaseCommand):
+    help = "background_jobs 테이블의 업로드 후처리 작업을 처리합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--kinds', default='')
+        parser.add_argument('--once', action='store_true')
+        parser.add_argument('--stats', action='store_true')
+
+    def handle(self, *args, **options):
+        from detector.jobs import stats, work, worker_name
+
+        if options['stats']:
+            self.stdout.write(json.dumps(stats(), ensure_ascii=False, indent=2))
+            return
+
+        kinds = [kind.strip() for kind in options['kinds'].split(',') if kind.strip()] or None
+        workers = max(1, options['workers'])
+        self.stdout.write(f"🛠️ 작업 큐 워커 {workers}개 시작 (종류: {', '.join(kinds) if kinds else '전체'})")
+        if workers == 1:
+            processed = work(worker_name(), kinds, options['once'])
+            self.stdout.write(f"✅ 작업 {processed}건 처리")
+            return
+
+        ctx = multiprocessing.get_context('spawn')
+        processes = [
+            ctx.Process(target=_worker_process, args=(i, kinds, options['once']), name=f'job-worker-{i}')
+            for i in range(workers)
+        ]
+        for p in processes:
+            p.start()
+        try:
+            for p in processes:
+                p.join()
+        except KeyboardInterrupt:
+            for p in processes:
+                p.terminate()
+            for p in processes:
+                p.join()
@@ -0,0 +1,103 @@
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess, REGISTRY
+)
+
+from .engine import detect_engine
+from .inference import WEIGHTS_PATH, weights_fingerprint
+
+# 구간별 지연시간 버킷 (초) - 디코딩/인코딩처럼 짧은 구간부터 CPU forward 까지
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGE_SECONDS = Histogram(
+    'pcb_stage_seconds',
+    'API 처리 구간별 소요 시간',
+    ['view', 'stage', 'model', 'version'],
+    buckets=STAGE_BUCKETS,
+)
+REQUESTS = Counter(
+    'pcb_requests_total',
+    'API 요청 수',
+    ['view', 'outcome', 'model', 'version'],
+)
+BATCH_SIZE = Histogram(
+    'pcb_detect_batch_size',
+    '탐지 요청이 함께 추론된 배치 크기',
+    ['model', 'version'],
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+CACHE_LOOKUPS = Counter(
+    'pcb_detect_cache_lookups_total',
+    '탐지 결과 캐시 조회 수',
+    ['result'],
+)
+
+
+# model 라벨은 엔진/워커 풀이 실제로 로드한 백엔드 (backend_report) 기준
+# 패리티 검사에서 pt 로 폴백했으면 설정값(DETECT_BACKEND)이 아니라 pt 로 기록
+def _model_labels(backend):
+    try:
+        version = weights_fingerprint()
+    except OSError:
+        version = 'unknown'
+    run_name = os.path.basename(os.path.dirname(os.path.dirname(WEIGHTS_PATH)))
+    return {"model": f"{run_name}/{backend}", "version": version}
+
+
+_labels = None
+
+
+# 로드 전(캐시 히트 등)에는 설정값으로 기록하고 캐시하지 않음 -> 로드 후 실제 백엔드로 고정
+def model_labels():
+    global _labels
+    if _labels is not None:
+        return _labels
+    backend = detect_engine.backend
+    if backend is None:
+        return _model_labels(settings.DETECT_BACKEND)
+    _labels = _model_labels(backend)
+    return _labels
+
+
+def observe(view, stage, seconds):
+    STAGE_SECONDS.labels(view=view, stage=stage, **model_labels()).observe(seconds)
+
+
+@contextmanager
+def stage(view, name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(view, name, time.perf_counter() - started)
+
+
+def count_request(view, outcome):
+    REQUESTS.labels(view=view, outcome=outcome, **model_labels()).inc()
+
+
+# 배치 스케줄러/워커 결과에 담긴 구간 시간 기록 (Detections.t 재사용)
+def observe_detection(view, result):
+    labels = model_labels()
+    for name, ms in result.get('stage_ms', {}).items():
+        STAGE_SECONDS.labels(view=view, stage=name, **labels).observe(ms / 1000)
+    if 'color_ms' in result:
+        STAGE_SECONDS.labels(view=view, stage='color_convert', **labels).observe(result['color_ms'] / 1000)
+    STAGE_SECONDS.labels(view=view, stage='queue', **labels).observe(result['queue_ms'] / 1000)
+    BATCH_SIZE.labels(**labels).observe(result['batch_size'])
+
+
+# /metrics 엔드포인트
+# gunicorn 등 멀티 프로세스 환경이면 PROMETHEUS_MULTIPROC_DIR 를 지정해서 프로세스별 값을 합산
+def metrics_view(request):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detector', '0002_analysismaterials_pcbprojects_analysiscomments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('detected_results', 'Detected results'), ('performance_data', 'Performance data')], max_length=32)),
+                ('name', models.CharField(max_length=255)),
+                ('sha256', models.CharField(max_length=64)),
+                ('size', models.BigIntegerField()),
+                ('original_name', models.CharField(blank=True, default='', max_length=255)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'media_blobs',
+                'managed': True,
+                'constraints': [models.UniqueConstraint(fields=('kind', 'name'), name='uniq_media_blob_kind_name')],
+            },
+        ),
+    ]
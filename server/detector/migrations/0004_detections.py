@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detector', '0003_mediablob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Detections',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('class_id', models.SmallIntegerField()),
+                ('class_name', models.CharField(max_length=50)),
+                ('confidence', models.FloatField()),
+                ('xmin', models.FloatField()),
+                ('ymin', models.FloatField()),
+                ('xmax', models.FloatField()),
+                ('ymax', models.FloatField()),
+                ('area', models.FloatField()),
+                ('created_at', models.DateTimeField()),
+                ('material', models.ForeignKey(db_column='material_id', on_delete=django.db.models.deletion.CASCADE, related_name='detections', to='detector.analysismaterials')),
+                ('project', models.ForeignKey(db_column='project_id', on_delete=django.db.models.deletion.CASCADE, related_name='detections', to='detector.pcbprojects')),
+            ],
+            options={
+                'db_table': 'detections',
+                'managed': True,
+                'indexes': [models.Index(fields=['project', 'class_name', 'created_at'], name='idx_detection_project_class')],
+            },
+        ),
+    ]
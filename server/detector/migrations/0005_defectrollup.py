@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detector', '0004_detections'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DefectRollup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=8)),
+                ('bucket_start', models.DateTimeField()),
+                ('class_name', models.CharField(blank=True, default='', max_length=50)),
+                ('detection_count', models.IntegerField(default=0)),
+                ('confidence_sum', models.FloatField(default=0)),
+                ('material_count', models.IntegerField(default=0)),
+                ('defective_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(db_column='company_id', on_delete=django.db.models.deletion.CASCADE, to='detector.companies')),
+                ('project', models.ForeignKey(blank=True, db_column='project_id', null=True, on_delete=django.db.models.deletion.CASCADE, to='detector.pcbprojects')),
+            ],
+            options={
+                'db_table': 'defect_rollups',
+                'managed': True,
+                'constraints': [models.UniqueConstraint(fields=('company', 'project', 'granularity', 'bucket_start', 'class_name'), name='uniq_defect_rollup_bucket', nulls_distinct=False)],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+# analysis_materials 는 Django 가 관리하지 않는 테이블이라 인덱스를 직접 생성
+# 목록 api 의 keyset 페이지네이션 (project_id = ? ORDER BY created_at DESC, id DESC) 용
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('detector', '0005_defectrollup'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_material_project_created "
+                "ON analysis_materials (project_id, created_at DESC, id DESC);"
+            ),
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_material_project_created;",
+        ),
+    ]
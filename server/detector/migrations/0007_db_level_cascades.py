@@ -0,0 +1,85 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# 프로젝트 -> 분석 결과 -> 댓글/탐지 박스/집계 삭제를 DB 의 ON DELETE CASCADE 로 처리
+# 모델의 on_delete 는 DO_NOTHING (Django 는 하위 행을 건드리지 않음) 이고, 실제 삭제는 아래 FK 가 담당
+# analysis_materials 는 Django 가 관리하지 않는 테이블이라 FK 를 직접 다시 만들고,
+# Django 가 만든 FK(댓글/탐지 박스/집계)도 ON DELETE 를 지정할 수 없어서 같은 방식으로 교체
+# (기존 FK 이름이 환경마다 다를 수 있어서 대상 테이블 기준으로 찾아서 교체)
+REPLACE_FK_SQL = """
+DO $$
+DECLARE c record;
+BEGIN
+    FOR c IN
+        SELECT con.conname, con.conrelid::regclass AS tbl
+        FROM pg_constraint con
+        WHERE con.contype = 'f'
+          AND (
+              (con.conrelid = 'analysis_materials'::regclass AND con.confrelid = 'pcb_projects'::regclass)
+              OR (con.conrelid = 'analysis_comments'::regclass
+                  AND con.confrelid IN ('analysis_materials'::regclass, 'analysis_comments'::regclass))
+              OR (con.conrelid = 'detections'::regclass
+                  AND con.confrelid IN ('analysis_materials'::regclass, 'pcb_projects'::regclass))
+              OR (con.conrelid = 'defect_rollups'::regclass AND con.confrelid = 'pcb_projects'::regclass)
+          )
+    LOOP
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', c.tbl, c.conname);
+    END LOOP;
+END $$;
+
+ALTER TABLE analysis_materials
+    ADD CONSTRAINT fk_project FOREIGN KEY (project_id) REFERENCES pcb_projects(id) ON DELETE CASCADE;
+ALTER TABLE analysis_comments
+    ADD CONSTRAINT fk_comment_material FOREIGN KEY (material_id) REFERENCES analysis_materials(id) ON DELETE CASCADE,
+    ADD CONSTRAINT fk_comment_parent FOREIGN KEY (parent_id) REFERENCES analysis_comments(id) ON DELETE CASCADE;
+ALTER TABLE detections
+    ADD CONSTRAINT fk_detection_material FOREIGN KEY (material_id) REFERENCES analysis_materials(id)
+        ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+    ADD CONSTRAINT fk_detection_project FOREIGN KEY (project_id) REFERENCES pcb_projects(id)
+        ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE defect_rollups
+    ADD CONSTRAINT fk_rollup_project FOREIGN KEY (project_id) REFERENCES pcb_projects(id)
+        ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detector', '0006_analysis_materials_project_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(REPLACE_FK_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name='analysismaterials',
+            name='project',
+            field=models.ForeignKey(db_column='project_id', on_delete=django.db.models.deletion.DO_NOTHING, to='detector.pcbprojects'),
+        ),
+        migrations.AlterField(
+            model_name='analysiscomments',
+            name='material',
+            field=models.ForeignKey(db_column='material_id', on_delete=django.db.models.deletion.DO_NOTHING, related_name='comments', to='detector.analysismaterials'),
+        ),
+        migrations.AlterField(
+            model_name='analysiscomments',
+            name='parent',
+            field=models.ForeignKey(blank=True, db_column='parent_id', null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='replies', to='detector.analysiscomments'),
+        ),
+        migrations.AlterField(
+            model_name='detections',
+            name='material',
+            field=models.ForeignKey(db_column='material_id', on_delete=django.db.models.deletion.DO_NOTHING, related_name='detections', to='detector.analysismaterials'),
+        ),
+        migrations.AlterField(
+            model_name='detections',
+            name='project',
+            field=models.ForeignKey(db_column='project_id', on_delete=django.db.models.deletion.DO_NOTHING, related_name='detections', to='detector.pcbprojects'),
+        ),
+        migrations.AlterField(
+            model_name='defectrollup',
+            name='project',
+            field=models.ForeignKey(blank=True, db_column='project_id', null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='detector.pcbprojects'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 6.0.1 on 2026-10-18 13:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# 분석 결과/프로젝트 삭제 시 변환 결과도 DB 의 ON DELETE CASCADE 로 삭제 (0007 과 같은 방식, 모델은 DO_NOTHING)
+REPLACE_FK_SQL = """
+DO $$
+DECLARE c record;
+BEGIN
+    FOR c IN
+        SELECT con.conname
+        FROM pg_constraint con
+        WHERE con.contype = 'f'
+          AND con.conrelid = 'performance_datasets'::regclass
+          AND con.confrelid IN ('analysis_materials'::regclass, 'pcb_projects'::regclass)
+    LOOP
+        EXECUTE format('ALTER TABLE performance_datasets DROP CONSTRAINT %I', c.conname);
+    END LOOP;
+END $$;
+
+ALTER TABLE performance_datasets
+    ADD CONSTRAINT fk_perf_dataset_material FOREIGN KEY (material_id) REFERENCES analysis_materials(id)
+        ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+    ADD CONSTRAINT fk_perf_dataset_project FOREIGN KEY (project_id) REFERENCES pcb_projects(id)
+        ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detector', '0007_db_level_cascades'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerformanceSchema',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('fingerprint', models.CharField(max_length=64, unique=True)),
+                ('columns', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'performance_schemas',
+                'managed': True,
+            },
+        ),
+        migrations.CreateModel(
+            name='PerformanceDataset',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('source_name', models.TextField()),
+                ('parquet_name', models.CharField(blank=True, default='', max_length=80)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('READY', 'Ready'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('row_count', models.IntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('parsed_at', models.DateTimeField(blank=True, null=True)),
+                ('material', models.OneToOneField(db_column='material_id', on_delete=django.db.models.deletion.DO_NOTHING, related_name='performance_dataset', to='detector.analysismaterials')),
+                ('project', models.ForeignKey(db_column='project_id', on_delete=django.db.models.deletion.DO_NOTHING, related_name='performance_datasets', to='detector.pcbprojects')),
+                ('schema', models.ForeignKey(blank=True, db_column='schema_id', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='datasets', to='detector.performanceschema')),
+            ],
+            options={
+                'db_table': 'performance_datasets',
+                'managed': True,
+                'indexes': [models.Index(fields=['project', 'schema'], name='idx_perf_dataset_project'), models.Index(fields=['status'], name='idx_perf_dataset_status')],
+            },
+        ),
+        migrations.RunSQL(REPLACE_FK_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
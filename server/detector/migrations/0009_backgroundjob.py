@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detector', '0008_performance_datasets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(max_length=64)),
+                ('payload', models.JSONField(default=dict)),
+                ('priority', models.SmallIntegerField(default=0)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='QUEUED', max_length=10)),
+                ('attempts', models.IntegerField(default=0)),
+                ('max_attempts', models.IntegerField(default=3)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_by', models.CharField(blank=True, default='', max_length=100)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('wait_ms', models.IntegerField(blank=True, null=True)),
+                ('duration_ms', models.IntegerField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'background_jobs',
+                'managed': True,
+                'indexes': [
+                    models.Index(condition=models.Q(('status', 'QUEUED')), fields=['-priority', 'run_after', 'id'], name='idx_job_queue'),
+                    models.Index(fields=['status', 'finished_at'], name='idx_job_status_finished'),
+                ],
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 class Companies(models.Model):
     id = models.AutoField(primary_key=True)
@@ -54,9 +55,11 @@ class PcbProjects(models.Model):
 
 class AnalysisMaterials(models.Model):
     id = models.AutoField(primary_key=True)
+    # 프로젝트 삭제 시 분석 결과/댓글/탐지 박스/집계는 DB 의 ON DELETE CASCADE 로 삭제 (마이그레이션 0007 에서 FK 설정)
+    # Django 쪽은 DO_NOTHING 이라 하위 행을 조회해서 지우지 않고 DELETE 한 번만 실행
     project = models.ForeignKey(
         'PcbProjects', 
-        on_delete=models.CASCADE, 
+        on_delete=models.DO_NOTHING, 
         db_column='project_id'
     )
     author = models.ForeignKey(
@@ -81,7 +84,7 @@ class AnalysisComments(models.Model):
     id = models.AutoField(primary_key=True)
     material = models.ForeignKey(
         AnalysisMaterials, 
-        on_delete=models.CASCADE, 
+        on_delete=models.DO_NOTHING, 
         db_column='material_id',
         related_name='comments'
     )
@@ -93,7 +96,7 @@ class AnalysisComments(models.Model):
     # parent_id가 없으면 댓글, 있으면 대댓글
     parent = models.ForeignKey(
         'self', 
-        on_delete=models.CASCADE, 
+        on_delete=models.DO_NOTHING, 
         db_column='parent_id', 
         null=True, 
         blank=True,
@@ -105,4 +108,201 @@ class AnalysisComments(models.Model):
 
     class Meta:
         db_table = 'analysis_comments'
-        managed = True
\ No newline at end of file
+        managed = True
+
+# 분석 결과별 탐지 박스 (업로드 시 한 번에 bulk insert)
+# project / created_at 은 analysis_materials 와 조인하지 않고 통계를 내기 위해 같이 저장
+class Detections(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    material = models.ForeignKey(
+        AnalysisMaterials,
+        on_delete=models.DO_NOTHING,
+        db_column='material_id',
+        related_name='detections'
+    )
+    project = models.ForeignKey(
+        'PcbProjects',
+        on_delete=models.DO_NOTHING,
+        db_column='project_id',
+        related_name='detections'
+    )
+    class_id = models.SmallIntegerField()
+    class_name = models.CharField(max_length=50)
+    confidence = models.FloatField()
+    xmin = models.FloatField()
+    ymin = models.FloatField()
+    xmax = models.FloatField()
+    ymax = models.FloatField()
+    area = models.FloatField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'detections'
+        managed = True
+        indexes = [
+            models.Index(fields=['project', 'class_name', 'created_at'], name='idx_detection_project_class'),
+        ]
+
+# 결함 집계 (대시보드용)
+# 업로드할 때마다 시간/일 단위 버킷에 누적 - 조회 시에는 탐지/분석 결과 테이블을 읽지 않음
+# project 가 NULL 인 행은 회사 전체 합계, class_name 이 '' 인 행은 전체 클래스 합계
+class DefectRollup(models.Model):
+    GRANULARITY_CHOICES = [
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    company = models.ForeignKey(Companies, on_delete=models.CASCADE, db_column='company_id')
+    project = models.ForeignKey(
+        'PcbProjects',
+        on_delete=models.DO_NOTHING,
+        db_column='project_id',
+        null=True,
+        blank=True
+    )
+    granularity = models.CharField(max_length=8, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    class_name = models.CharField(max_length=50, blank=True, default='')
+    detection_count = models.IntegerField(default=0)
+    confidence_sum = models.FloatField(default=0)
+    # 버킷에 등록된 분석 결과(보드) 수 / 그 중 결함이 하나라도 있는 수 (클래스별 행은 해당 클래스가 있는 보드 수)
+    material_count = models.IntegerField(default=0)
+    defective_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'defect_rollups'
+        managed = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=['company', 'project', 'granularity', 'bucket_start', 'class_name'],
+                name='uniq_defect_rollup_bucket',
+                nulls_distinct=False,
+            ),
+        ]
+
+# 내용 해시로 저장된 미디어 파일 (detected_results / performance_data)
+# 같은 내용은 한 번만 저장하고, 참조하는 AnalysisMaterials 수를 ref_count 로 관리
+class MediaBlob(models.Model):
+    KIND_CHOICES = [
+        ('detected_results', 'Detected results'),
+        ('performance_data', 'Performance data'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    # kind 폴더 기준 상대 경로 (ab/cd/<sha256>.xlsx)
+    name = models.CharField(max_length=255)
+    sha256 = models.CharField(max_length=64)
+    size = models.BigIntegerField()
+    original_name = models.CharField(max_length=255, blank=True, default='')
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'media_blobs'
+        managed = True
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'name'], name='uniq_media_blob_kind_name'),
+        ]
+
+
+# 성능 데이터(엑셀/CSV) 컬럼 구성 레지스트리
+# 컬럼 이름/타입 목록의 해시(fingerprint)가 같은 업로드는 같은 스키마를 가리킴 -> 같은 스키마끼리 묶어서 조회
+class PerformanceSchema(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    fingerprint = models.CharField(max_length=64, unique=True)
+    columns = models.JSONField()  # [{"name": ..., "dtype": ...}, ...]
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'performance_schemas'
+        managed = True
+
+
+# 업로드된 성능 데이터를 Parquet 로 변환한 결과 (분석 결과 1건당 1행)
+# 분석 결과/프로젝트가 삭제되면 DB 의 ON DELETE CASCADE 로 함께 삭제 (마이그레이션 0008 에서 FK 설정)
+# parquet_name 은 원본 파일 내용 해시 기준이라 같은 파일을 여러 번 올려도 변환 파일은 하나
+class PerformanceDataset(models.Model):
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('READY', 'Ready'),
+        ('FAILED', 'Failed'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    material = models.OneToOneField(
+        AnalysisMaterials,
+        on_delete=models.DO_NOTHING,
+        db_column='material_id',
+        related_name='performance_dataset'
+    )
+    project = models.ForeignKey(
+        'PcbProjects',
+        on_delete=models.DO_NOTHING,
+        db_column='project_id',
+        related_name='performance_datasets'
+    )
+    schema = models.ForeignKey(
+        PerformanceSchema,
+        on_delete=models.PROTECT,
+        db_column='schema_id',
+        null=True,
+        blank=True,
+        related_name='datasets'
+    )
+    source_name = models.TextField()
+    parquet_name = models.CharField(max_length=80, blank=True, default='')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    row_count = models.IntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    parsed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'performance_datasets'
+        managed = True
+        indexes = [
+            models.Index(fields=['project', 'schema'], name='idx_perf_dataset_project'),
+            models.Index(fields=['status'], name='idx_perf_dataset_status'),
+        ]
+
+
+# 업로드 후 무거운 후처리 작업 큐 (썸네일 생성, 성능 데이터 변환, 미디어 참조 해제 등)
+# 별도 브로커 없이 이 테이블을 큐로 사용 - 워커(manage.py run_jobs 또는 웹 프로세스 안의 스레드)가
+# FOR UPDATE SKIP LOCKED 로 priority 높은 순 -> run_after 순으로 하나씩 가져감
+class BackgroundJob(models.Model):
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    priority = models.SmallIntegerField(default=0)  # 클수록 먼저 처리
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)  # 재시도 대기 (이 시각 이후에 가져감)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    wait_ms = models.IntegerField(null=True, blank=True)  # 마지막 시도의 대기 시간 (run_after -> 시작)
+    duration_ms = models.IntegerField(null=True, blank=True)  # 마지막 시도의 처리 시간
+
+    class Meta:
+        db_table = 'background_jobs'
+        managed = True
+        indexes = [
+            models.Index(
+                fields=['-priority', 'run_after', 'id'], name='idx_job_queue', condition=models.Q(status='QUEUED')
+            ),
+            models.Index(fields=['status', 'finished_at'], name='idx_job_status_finished'),
+        ]
@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .jobs import enqueue, register
+from .models import PerformanceDataset, PerformanceSchema
+from .storage import is_blob_name, performance_data_store
+from .uploads import file_digest
+
+# 성능 데이터(엑셀/CSV) 컬럼형 변환
+# 업로드마다 한 번만 polars 로 읽어서 <MEDIA_ROOT>/performance_parquet/<원본 sha256>.parquet 로 저장하고
+# 조회 api 는 엑셀을 다시 열지 않고 Parquet 여러 개를 lazy scan 해서 필요한 컬럼만 읽음
+# polars 는 변환/조회할 때만 import (웹 프로세스 시작과 manage.py 명령에는 영향 없음)
+PARQUET_ROOT = os.path.join(settings.MEDIA_ROOT, 'performance_parquet')
+MATERIAL_COLUMN = 'material_id'
+QUERY_MAX_ROWS = 10000
+FILTER_OPS = ('eq', 'ne', 'gt', 'ge', 'lt', 'le', 'in', 'is_null', 'not_null')
+AGG_FUNCS = ('count', 'sum', 'mean', 'min', 'max', 'std', 'median', 'first', 'last')
+
+
+def parquet_path(parquet_name):
+    return os.path.join(PARQUET_ROOT, parquet_name)
+
+
+# 컬럼 이름 정리 (앞뒤 공백 제거, 빈 이름/중복 이름에 번호 붙임)
+def _normalize_columns(names):
+    seen, result = {}, []
+    for i, name in enumerate(names):
+        name = str(name).strip() or f"column_{i + 1}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}_{seen[name]}"
+        else:
+            seen[name] = 0
+        result.append(name)
+    return result
+
+
+def read_table(path, original_name=''):
+    import polars as pl
+
+    ext = os.path.splitext(original_name or path)[1].lower()
+    if ext == '.csv':
+        df = pl.read_csv(path, infer_schema_length=10000, try_parse_dates=True)
+    else:
+        # xlsx/xls - calamine(fastexcel) 엔진, 첫 번째 시트
+        df = pl.read_excel(path, engine='calamine')
+    return df.rename(dict(zip(df.columns, _normalize_columns(df.columns))))
+
+
+def schema_fingerprint(columns):
+    raw = json.dumps(columns, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def register_schema(df):
+    columns = [{"name": name, "dtype": str(dtype)} for name, dtype in df.schema.items()]
+    schema, _ = PerformanceSchema.objects.get_or_create(
+        fingerprint=schema_fingerprint(columns), defaults={"columns": columns}
+    )
+    return schema
+
+
+# 원본 파일 1건 변환 (같은 내용의 Parquet 가 이미 있으면 스키마만 읽음)
+def ingest(dataset_id):
+    import polars as pl
+
+    dataset = PerformanceDataset.objects.get(id=dataset_id)
+    source_path = performance_data_store.path(dataset.source_name)
+    try:
+        if not source_path or not os.path.exists(source_path):
+            raise FileNotFoundError(f"성능 데이터 파일이 없습니다: {dataset.source_name}")
+        if is_blob_name(dataset.source_name):
+            sha256 = os.path.splitext(os.path.basename(dataset.source_name))[0]
+        else:
+            sha256 = file_digest(source_path)
+        parquet_name = f"{sha256}.parquet"
+        path = parquet_path(parquet_name)
+
+        if os.path.exists(path):
+            df = pl.read_parquet(path)
+        else:
+            df = read_table(source_path, performance_data_store.original_name(dataset.source_name))
+            os.makedirs(PARQUET_ROOT, exist_ok=True)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            try:
+                df.write_parquet(tmp_path, compression='zstd', statistics=True)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        with transaction.atomic():
+            dataset.schema = register_schema(df)
+            dataset.parquet_name = parquet_name
+            dataset.row_count = df.height
+            dataset.status = 'READY'
+            dataset.error = ''
+            dataset.parsed_at = timezone.now()
+            dataset.save(update_fields=['schema', 'parquet_name', 'row_count', 'status', 'error', 'parsed_at'])
+        return dataset
+    except Exception as e:
+        PerformanceDataset.objects.filter(id=dataset.id).update(status='FAILED', error=str(e)[:1000])
+        raise
+
+
+@register('performance.ingest')
+def ingest_job(dataset_id):
+    dataset = ingest(dataset_id)
+    print(f"📊 성능 데이터 변환 완료: dataset {dataset_id} ({dataset.row_count}행)")
+
+
+# 업로드 트랜잭션 안에서 호출 - 변환 대상과 변환 작업을 등록하고 커밋되면 작업 큐 워커가 변환
+# 재시도까지 실패해서 FAILED 로 남은 건은 manage.py ingest_performance --retry-failed 로 처리
+def schedule_ingest(material, source_name):
+    dataset = PerformanceDataset.objects.create(
+        material_id=material.id, project_id=material.project_id, source_name=source_name
+    )
+    enqueue('performance.ingest', {"dataset_id": dataset.id})
+    return dataset
+
+
+def _filter_expr(pl, column, op, value):
+    col = pl.col(column)
+    if op == 'eq':
+        return col == value
+    if op == 'ne':
+        return col != value
+    if op == 'gt':
+        return col > value
+    if op == 'ge':
+        return col >= value
+    if op == 'lt':
+        return col < value
+    if op == 'le':
+        return col <= value
+    if op == 'in':
+        return col.is_in(list(value))
+    if op == 'is_null':
+        return col.is_null()
+    return col.is_not_null()
+
+
+def _agg_expr(pl, column, func):
+    return getattr(pl.col(column), 'len' if func == 'count' else func)().alias(f"{column}_{func}")
+
+
+def validate_query(spec):
+    columns = spec.get('columns') or []
+    filters = spec.get('filters') or []
+    group_by = spec.get('group_by') or []
+    aggregations = spec.get('aggregations') or {}
+    if not isinstance(columns, list) or not isinstance(group_by, list) or not isinstance(aggregations, dict):
+        raise ValueError("columns/group_by 는 목록, aggregations 는 {컬럼: [함수]} 형태여야 합니다.")
+    if not isinstance(filters, list) or not all(isinstance(f, dict) for f in filters):
+        raise ValueError("filters 는 {column, op, value} 형태의 목록이어야 합니다.")
+    for f in filters:
+        if f.get('op') not in FILTER_OPS or not f.get('column'):
+            raise ValueError(f"필터 형식이 올바르지 않습니다: {f} (op: {', '.join(FILTER_OPS)})")
+    for column, funcs in aggregations.items():
+        funcs = [funcs] if isinstance(funcs, str) else funcs
+        if any(func not in AGG_FUNCS for func in funcs):
+            raise ValueError(f"지원하지 않는 집계 함수입니다: {column} {funcs} ({', '.join(AGG_FUNCS)})")
+    if group_by and not aggregations:
+        raise ValueError("group_by 를 쓰려면 aggregations 가 필요합니다.")
+    limit = min(max(int(spec.get('limit') or QUERY_MAX_ROWS), 1), QUERY_MAX_ROWS)
+    return columns, filters, group_by, aggregations, limit
+
+
+# 여러 업로드의 Parquet 를 한 번에 조회
+# datasets: [(material_id, parquet_name)], 각 행에 material_id 컬럼을 붙여서 업로드별 추이 비교 가능
+# 필요한 컬럼만 읽고(projection pushdown) 필터는 Parquet 통계로 row group 단위 건너뜀(predicate pushdown)
+def run_query(datasets, spec):
+    import polars as pl
+
+    columns, filters, group_by, aggregations, limit = validate_query(spec)
+    frames = [
+        pl.scan_parquet(parquet_path(parquet_name)).with_columns(pl.lit(material_id).alias(MATERIAL_COLUMN))
+        for material_id, parquet_name in datasets
+    ]
+    if not frames:
+        return [], []
+    # 업로드마다 컬럼 구성이 조금 달라도 합칠 수 있게 (없는 컬럼은 null)
+    lf = pl.concat(frames, how='diagonal_relaxed')
+
+    for f in filters:
+        lf = lf.filter(_filter_expr(pl, f['column'], f['op'], f.get('value')))
+    if aggregations:
+        exprs = [
+            _agg_expr(pl, column, func)
+            for column, funcs in aggregations.items()
+            for func in ([funcs] if isinstance(funcs, str) else funcs)
+        ]
+        lf = lf.group_by(group_by, maintain_order=True).agg(exprs) if group_by else lf.select(exprs)
+    elif columns:
+        lf = lf.select([MATERIAL_COLUMN] + [c for c in columns if c != MATERIAL_COLUMN])
+
+    df = lf.head(limit).collect()
+    return df.columns, df.to_dicts()
+
+
+# Parquet 중 어떤 변환 결과도 가리키지 않는 파일 삭제 (gc_media 에서 호출)
+# 방금 변환돼서 아직 DB 에 기록되기 전인 파일은 grace_seconds 동안 남겨 둠
+def remove_orphan_parquet(dry_run=False, grace_seconds=3600):
+    if not os.path.isdir(PARQUET_ROOT):
+        return 0
+    used = set(PerformanceDataset.objects.exclude(parquet_name='').values_list('parquet_name', flat=True))
+    now, removed = time.time(), 0
+    for name in os.listdir(PARQUET_ROOT):
+        path = os.path.join(PARQUET_ROOT, name)
+        try:
+            if name in used or now - os.path.getmtime(path) < grace_seconds:
+                continue
+            if not dry_run:
+                os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# 회사별 프로젝트 목록 캐시
+# 목록 페이지는 projects:<company_id>:<버전>:<조회 조건> 키로 저장하고,
+# 프로젝트 생성/삭제/상태 변경 시 회사 버전만 바꿔서 그 회사의 모든 페이지를 한 번에 무효화
+# 버전은 시각(ns) 값이라 버전 키가 만료/축출돼도 예전 페이지와 겹치지 않음
+# CACHE_URL(redis) 이 있을 때만 캐시 - 없으면 프로세스별 메모리 캐시라 다른 프로세스에서 바꾼 내용이
+# 무효화되지 않아서 예전 목록이 TTL 동안 보일 수 있으므로 캐시하지 않고 매번 DB 조회
+
+
+def enabled():
+    return bool(settings.CACHE_URL)
+
+
+def _version_key(company_id):
+    return f"projects:{company_id}:version"
+
+
+def list_version(company_id):
+    key = _version_key(company_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def page_key(company_id, *params):
+    return f"projects:{company_id}:{list_version(company_id)}:" + ":".join(str(p or '') for p in params)
+
+
+def get_page(key):
+    return cache.get(key) if enabled() else None
+
+
+def put_page(key, page):
+    if enabled():
+        cache.set(key, page, settings.PROJECT_LIST_CACHE_TTL)
+
+
+def invalidate(*company_ids):
+    if enabled():
+        cache.set_many({_version_key(company_id): time.time_ns() for company_id in set(company_ids)}, None)
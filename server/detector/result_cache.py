@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+# 탐지 결과 캐시
+# 업로드 원본 바이트 해시 + 가중치 지문 + conf/iou 를 키로 탐지 결과, 이미지 크기, 렌더링된 JPEG 를 보관
+# 1단계: 메모리 LRU (max_bytes 초과 시 오래된 것부터 제거, ttl 지나면 만료)
+# 2단계: (선택) sqlite 파일 - 서버 재시작 후에도 재사용 (db_max_bytes 초과 시 오래된 것부터 제거)
+#   여러 프로세스가 같은 파일을 쓰므로 전체 크기는 DB_TRIM_INTERVAL 번 저장할 때마다 DB 에서 다시 계산
+DB_TRIM_INTERVAL = 32
+
+
+class DetectionCache:
+
+    def __init__(self, max_bytes, ttl_seconds=600, db_path=None, db_max_bytes=None):
+        self.max_bytes = int(max_bytes)
+        self.ttl = float(ttl_seconds)
+        self.db_path = db_path or None
+        self.db_max_bytes = int(db_max_bytes) if db_max_bytes else None
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self._db_puts = 0
+
+        if self.db_path:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            # 이미지 크기/행 크기 컬럼이 없는 예전 형식 테이블은 버리고 새로 만듦 (캐시라 다시 채워짐)
+            columns = {row[1] for row in self._db.execute('PRAGMA table_info(detect_cache)')}
+            if columns and 'size' not in columns:
+                self._db.execute('DROP TABLE detect_cache')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS detect_cache ('
+                'key TEXT PRIMARY KEY, created_at REAL NOT NULL, size INTEGER NOT NULL, '
+                'detections TEXT NOT NULL, width INTEGER NOT NULL, height INTEGER NOT NULL, jpeg BLOB NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS detect_cache_created_at ON detect_cache (created_at)')
+
+    @staticmethod
+    def make_key(raw_bytes, fingerprint, conf, iou, variant=''):
+        digest = hashlib.sha256(raw_bytes).hexdigest()
+        return f"{digest}:{fingerprint}:{conf}:{iou}:{variant}"
+
+    # 반환: (detections, jpeg, (width, height)) 또는 None
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, size, detections, jpeg, image_size = entry
+                if now - created_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(detections), jpeg, image_size
+                self._remove(key)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    'SELECT created_at, detections, width, height, jpeg FROM detect_cache WHERE key = ?', (key,)
+                ).fetchone()
+                if row is not None and now - row[0] <= self.ttl:
+                    self.disk_hits += 1
+                    image_size = (row[2], row[3])
+                    self._insert(key, row[0], row[1], bytes(row[4]), image_size)
+                    return json.loads(row[1]), bytes(row[4]), image_size
+
+            self.misses += 1
+            return None
+
+    # image_size 는 원본(= 렌더링 이미지) 크기 (width, height)
+    def put(self, key, detections, jpeg, image_size):
+        now = time.time()
+        detections = json.dumps(detections)
+        width, height = (int(v) for v in image_size)
+        with self._lock:
+            self._insert(key, now, detections, jpeg, (width, height))
+            if self._db is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO detect_cache (key, created_at, size, detections, width, height, jpeg) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (key, now, len(detections) + len(jpeg), detections, width, height, jpeg),
+                )
+                self._db.execute('DELETE FROM detect_cache WHERE created_at < ?', (now - self.ttl,))
+                self._db_puts += 1
+                if self.db_max_bytes and self._db_puts % DB_TRIM_INTERVAL == 1:
+                    self._trim_db()
+
+    # sqlite 전체 크기가 db_max_bytes 를 넘으면 오래된 행부터 삭제
+    def _trim_db(self):
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM detect_cache').fetchone()[0]
+        excess = total - self.db_max_bytes
+        if excess <= 0:
+            return
+        keys = []
+        for key, size in self._db.execute('SELECT key, size FROM detect_cache ORDER BY created_at'):
+            keys.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany('DELETE FROM detect_cache WHERE key = ?', [(key,) for key in keys])
+        self.disk_evictions += len(keys)
+
+    def _insert(self, key, created_at, detections, jpeg, image_size):
+        size = len(detections) + len(jpeg)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (created_at, size, detections, jpeg, image_size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[1]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "disk_max_bytes": self.db_max_bytes,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0,
+                "disk_tier": bool(self._db),
+            }
@@ -0,0 +1,76 @@
+import os
+import re
+import json
+import time
+import uuid
+
+# 렌더링된 탐지 결과 이미지를 잠깐 보관하는 저장소
+# JSON 응답에는 ID 만 주고 이미지는 별도 GET 으로 스트리밍 (여러 웹 프로세스가 공유하도록 디스크에 저장)
+# 같은 ID(job_id)로 탐지 좌표도 <id>.json 에 보관해서 /upload-result/ 가 이미지를 다시 받지 않고 그대로 등록
+RESULT_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+class RenderedResultStore:
+
+    def __init__(self, root, ttl_seconds=600):
+        self.root = root
+        self.ttl = ttl_seconds
+        self._last_cleanup = 0.0
+
+    def path(self, result_id):
+        if not RESULT_ID_RE.match(result_id or ''):
+            return None
+        return os.path.join(self.root, f"{result_id}.jpg")
+
+    def detections_path(self, result_id):
+        path = self.path(result_id)
+        return path[:-len('.jpg')] + '.json' if path else None
+
+    def _write(self, path, data):
+        tmp_path = os.path.join(self.root, f".{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def save(self, jpeg, detections=None):
+        os.makedirs(self.root, exist_ok=True)
+        result_id = uuid.uuid4().hex
+        # 좌표를 먼저 기록 (이미지가 보이면 좌표도 있음)
+        if detections is not None:
+            self._write(self.detections_path(result_id), json.dumps(detections, ensure_ascii=False).encode('utf-8'))
+        self._write(self.path(result_id), jpeg)
+        self.cleanup()
+        return result_id
+
+    # 만료 전 결과의 이미지 경로와 탐지 좌표 (없거나 만료되면 None)
+    def get(self, result_id):
+        path = self.path(result_id)
+        if path is None or not os.path.exists(path):
+            return None
+        if time.time() - os.path.getmtime(path) > self.ttl:
+            return None
+        detections = None
+        try:
+            with open(self.detections_path(result_id), encoding='utf-8') as f:
+                detections = json.load(f)
+        except FileNotFoundError:
+            pass
+        return path, detections
+
+    def open(self, result_id):
+        found = self.get(result_id)
+        return open(found[0], 'rb') if found else None
+
+    # 만료된 파일 정리 (최대 1분에 한 번)
+    def cleanup(self):
+        now = time.time()
+        if now - self._last_cleanup < 60:
+            return
+        self._last_cleanup = now
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+            except OSError:
+                pass
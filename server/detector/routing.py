@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .consumers import DetectStreamConsumer
+
+# WebSocket 경로 (pcb_backend.asgi 의 ProtocolTypeRouter 에서 사용)
+websocket_urlpatterns = [
+    path('ws/detect/stream/', DetectStreamConsumer.as_asgi(), name='pcb_detect_stream'),
+]
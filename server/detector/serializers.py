@@ -99,7 +99,12 @@ class AnalysisCommentSerializer(serializers.ModelSerializer):
 
     def get_replies(self, obj):
         # 대댓글이 있는 경우만 재귀적으로 호출 (최상위 댓글인 경우에만 자식들을 가져옴)
-        if obj.parent is None:
-            serializer = AnalysisCommentSerializer(obj.replies.all(), many=True)
-            return serializer.data
-        return []
\ No newline at end of file
+        # 뷰에서 스레드 전체를 한 번에 읽어 context['replies'] ({parent_id: [대댓글]}) 로 넘기면 추가 쿼리 없음
+        if obj.parent_id is not None:
+            return []
+        replies = self.context.get('replies')
+        if replies is not None:
+            children = replies.get(obj.id, [])
+        else:
+            children = obj.replies.select_related('author').order_by('created_at', 'id')
+        return AnalysisCommentSerializer(children, many=True, context=self.context).data
\ No newline at end of file
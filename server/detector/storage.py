@@ -0,0 +1,199 @@
+import os
+import re
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .jobs import PRIORITY_LOW, enqueue, register
+from .models import MediaBlob
+from .uploads import CHUNK_SIZE, file_digest, write_chunks
+
+# 내용 해시 기반 미디어 저장소
+# 파일은 <MEDIA_ROOT>/<kind>/ab/cd/<sha256><ext> 에 한 번만 저장하고 DB(AnalysisMaterials)에는 그 상대 경로를 기록
+# 예전 업로드(<kind>/<timestamp>_<name>)처럼 폴더 없는 파일명도 그대로 읽을 수 있음
+BLOB_NAME_RE = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.[a-z0-9]{1,8})?$')
+LEGACY_NAME_RE = re.compile(r'^[^./\\][^/\\]*$')
+EXT_RE = re.compile(r'^\.[a-z0-9]{1,8}$')
+
+
+def blob_suffix(filename, default=''):
+    ext = os.path.splitext(filename or '')[1].lower()
+    return ext if EXT_RE.match(ext) else default
+
+
+def is_blob_name(name):
+    return bool(BLOB_NAME_RE.match(name or ''))
+
+
+# 임시 파일에 기록만 끝난 상태 (commit 전에는 아무도 참조하지 않음)
+class StagedBlob:
+    __slots__ = ('tmp_path', 'sha256', 'size', 'suffix', 'original_name')
+
+    def __init__(self, tmp_path, sha256, size, suffix, original_name):
+        self.tmp_path = tmp_path
+        self.sha256 = sha256
+        self.size = size
+        self.suffix = suffix
+        self.original_name = original_name
+
+    def discard(self):
+        if self.tmp_path and os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class BlobStore:
+
+    def __init__(self, kind, root=None):
+        self.kind = kind
+        self.root = root or os.path.join(settings.MEDIA_ROOT, kind)
+        self.tmp_dir = os.path.join(self.root, '.tmp')
+
+    # DB 에 저장된 이름 -> 실제 경로 (상위 폴더로 벗어나는 이름은 거부)
+    def path(self, name):
+        if not name:
+            return None
+        if is_blob_name(name) or LEGACY_NAME_RE.match(name):
+            return os.path.join(self.root, name)
+        return None
+
+    def _tmp_path(self):
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        return os.path.join(self.tmp_dir, uuid.uuid4().hex)
+
+    # 1단계: 해시를 계산하면서 임시 파일에 기록 (체크섬이 있으면 검증)
+    def stage_chunks(self, chunks, original_name='', checksum=None, suffix=None):
+        tmp_path = self._tmp_path()
+        size, sha256 = write_chunks(chunks, tmp_path, checksum, original_name or '파일')
+        suffix = blob_suffix(original_name) if suffix is None else suffix
+        return StagedBlob(tmp_path, sha256, size, suffix, os.path.basename(original_name or ''))
+
+    def stage_uploaded_file(self, uploaded_file, checksum=None, suffix=None):
+        return self.stage_chunks(uploaded_file.chunks(CHUNK_SIZE), uploaded_file.name, checksum, suffix)
+
+    def stage_bytes(self, data, original_name='', suffix=None):
+        return self.stage_chunks([data], original_name, suffix=suffix)
+
+    # 이미 디스크에 있는 파일(이어받기 업로드 완료분 등)을 옮겨서 등록
+    def stage_file(self, path, original_name='', suffix=None):
+        tmp_path = self._tmp_path()
+        os.replace(path, tmp_path)
+        suffix = blob_suffix(original_name) if suffix is None else suffix
+        return StagedBlob(tmp_path, file_digest(tmp_path), os.path.getsize(tmp_path), suffix,
+                          os.path.basename(original_name or ''))
+
+    # 2단계: 참조 수 +refs 하고 최종 위치로 이동 (같은 내용이 이미 있으면 임시 파일만 삭제)
+    # AnalysisMaterials 생성과 같은 트랜잭션 안에서 호출해야 함
+    def commit(self, staged, refs=1):
+        name = f"{staged.sha256[:2]}/{staged.sha256[2:4]}/{staged.sha256}{staged.suffix}"
+        with transaction.atomic():
+            blob, _ = MediaBlob.objects.select_for_update().get_or_create(
+                kind=self.kind,
+                name=name,
+                defaults={"sha256": staged.sha256, "size": staged.size, "original_name": staged.original_name[:255]},
+            )
+            path = self.path(name)
+            if os.path.exists(path):
+                staged.discard()
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(staged.tmp_path, path)
+            MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + refs)
+        return name
+
+    def original_name(self, name):
+        if not is_blob_name(name):
+            return os.path.basename(name or '')
+        blob = MediaBlob.objects.filter(kind=self.kind, name=name).only('original_name').first()
+        return (blob.original_name if blob else '') or os.path.basename(name)
+
+    # 참조 해제 - 참조 수만 차감하고, 0 이 된 파일은 트랜잭션이 커밋된 뒤에 삭제
+    # (바깥 트랜잭션이 롤백되면 참조 수는 되돌아가는데 파일만 지워진 상태가 되지 않게)
+    # 삭제 직전에 행 잠금을 잡고 참조 수를 다시 확인 - 그 사이 같은 내용을 다시 올린 경우는 건너뜀
+    # 커밋 후 삭제가 실패해서 남은 파일은 gc_media 가 정리
+    def release(self, names):
+        counts = Counter(name for name in names if is_blob_name(name))
+        if not counts:
+            return 0
+        with transaction.atomic():
+            for name, count in counts.items():
+                MediaBlob.objects.filter(kind=self.kind, name=name).update(ref_count=F('ref_count') - count)
+            orphans = list(MediaBlob.objects.filter(
+                kind=self.kind, name__in=list(counts), ref_count__lte=0
+            ).values_list('name', flat=True))
+            if orphans:
+                transaction.on_commit(lambda: self.remove_orphans(orphans), robust=True)
+        return len(orphans)
+
+    # 참조 수가 0 인 파일을 행 잠금을 잡은 채로 삭제
+    # (같은 내용을 동시에 올리는 commit 은 잠금이 풀릴 때까지 기다렸다가 다시 파일을 만듦)
+    def remove_orphans(self, names):
+        removed = 0
+        with transaction.atomic():
+            for blob in MediaBlob.objects.select_for_update().filter(
+                kind=self.kind, name__in=list(names), ref_count__lte=0
+            ):
+                self._unlink(blob.name)
+                blob.delete()
+                removed += 1
+        return removed
+
+    def _unlink(self, name):
+        path = self.path(name)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        # 비어 있는 샤드 폴더 정리
+        for directory in (os.path.dirname(path), os.path.dirname(os.path.dirname(path))):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+
+    # 오래된 임시 파일 정리 (업로드 도중 끊긴 경우)
+    def cleanup_tmp(self, max_age=24 * 3600):
+        if not os.path.isdir(self.tmp_dir):
+            return 0
+        now, removed = time.time(), 0
+        for name in os.listdir(self.tmp_dir):
+            path = os.path.join(self.tmp_dir, name)
+            try:
+                if now - os.path.getmtime(path) > max_age:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+detected_results_store = BlobStore('detected_results')
+performance_data_store = BlobStore('performance_data')
+
+
+# 프로젝트/분석 결과 삭제 후 더 이상 참조되지 않는 파일 정리
+def release_materials(materials):
+    images, excels = [], []
+    for defect_image_url, performance_data_url in materials:
+        images.append(defect_image_url)
+        excels.append(performance_data_url)
+    return detected_results_store.release(images) + performance_data_store.release(excels)
+
+
+# 참조 해제/파일 삭제를 요청 밖에서 처리 (여러 프로젝트 일괄 삭제 등)
+# 삭제 트랜잭션 안에서 작업만 등록하고, 참조 수 차감과 작업 완료 기록은 한 트랜잭션이라 두 번 차감되지 않음
+# 파일은 그 트랜잭션이 커밋된 뒤에만 삭제 (BlobStore.release), 끝내 실패한 작업이 남긴 파일은 gc_media 가 정리
+def release_materials_async(materials):
+    materials = [list(item) for item in materials]
+    if not materials:
+        return None
+    return enqueue('media.release', {"materials": materials}, priority=PRIORITY_LOW)
+
+
+@register('media.release', atomic=True)
+def release_materials_job(materials):
+    orphans = release_materials(materials)
+    print(f"🧹 미디어 참조 해제 완료: 분석 결과 {len(materials)}건, 커밋 후 삭제할 파일 {orphans}개")
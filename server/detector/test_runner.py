@@ -0,0 +1,30 @@
+from django.apps import apps
+from django.db import connections
+from django.db.models.signals import pre_migrate
+from django.test.runner import DiscoverRunner
+
+# 테스트 DB 에는 Django 가 관리하지 않는 기존 테이블이 없어서 (운영 DB 에서는 별도로 만들어져 있음)
+# detector 마이그레이션이 시작되기 전에 현재 모델 정의로 만들어 둠
+# -> 이 테이블을 참조하는 마이그레이션(댓글/탐지 박스 FK, 인덱스, ON DELETE CASCADE 교체)을 그대로 실행해서 검증
+LEGACY_MODELS = ('Companies', 'Users', 'PcbProjects', 'AnalysisMaterials')
+
+
+def create_legacy_tables(sender, using, **kwargs):
+    if sender.name != 'detector':
+        return
+    connection = connections[using]
+    existing = set(connection.introspection.table_names())
+    with connection.schema_editor() as editor:
+        for name in LEGACY_MODELS:
+            model = apps.get_model('detector', name)
+            if model._meta.db_table not in existing:
+                editor.create_model(model)
+
+
+class LegacySchemaTestRunner(DiscoverRunner):
+    def setup_databases(self, **kwargs):
+        pre_migrate.connect(create_legacy_tables, dispatch_uid='detector_legacy_tables')
+        try:
+            return super().setup_databases(**kwargs)
+        finally:
+            pre_migrate.disconnect(dispatch_uid='detector_legacy_tables')
@@ -1,3 +1,404 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import threading
+from types import SimpleNamespace
 
-# Create your tests here.
+import numpy as np
+
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .analytics import save_detections, update_rollups
+from .downloads import file_download_response
+from .inference import BatchScheduler, has_dynamic_batch
+from .models import (
+    AnalysisComments, AnalysisMaterials, BackgroundJob, Companies, DefectRollup, Detections, MediaBlob, PcbProjects,
+    Users,
+)
+from .result_cache import DetectionCache
+from .storage import BlobStore
+from .uploads import ResumableUploadStore
+
+DETECTIONS = [
+    {"xmin": 10, "ymin": 10, "xmax": 50, "ymax": 40, "confidence": 0.9, "class": 0, "name": "missing_hole"},
+    {"xmin": 60, "ymin": 20, "xmax": 80, "ymax": 70, "confidence": 0.7, "class": 3, "name": "short"},
+]
+
+
+# 프로젝트 일괄 상태 변경/삭제 api
+# 삭제는 DB 의 ON DELETE CASCADE 로 하위 데이터까지 지워지는지, 다른 회사 프로젝트는 건드리지 않는지 확인
+class ProjectBulkApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Companies.objects.create(corporate_name='테스트 회사', owner_id=1)
+        cls.other_company = Companies.objects.create(corporate_name='다른 회사', owner_id=2)
+        cls.author = Users.objects.create(
+            company=cls.company, email='director@example.com', password_hash='x', role='DIRECTOR', name='관리자'
+        )
+        cls.projects = [
+            PcbProjects.objects.create(company=cls.company, model_name=f'PCB-{i}', status='PENDING')
+            for i in range(3)
+        ]
+        cls.other_project = PcbProjects.objects.create(company=cls.other_company, model_name='OTHER', status='PENDING')
+
+    def login(self, role='DIRECTOR', company=None):
+        session = self.client.session
+        session['company_id'] = (company or self.company).id
+        session['user_role'] = role
+        session.save()
+
+    def add_material(self, project):
+        material = AnalysisMaterials.objects.create(
+            project=project, author=self.author, defect_image_url='ab/cd/image.jpg', performance_data_url=''
+        )
+        save_detections(material, DETECTIONS)
+        update_rollups(material, DETECTIONS, project.company_id)
+        comment = AnalysisComments.objects.create(material=material, author=self.author, content='댓글')
+        AnalysisComments.objects.create(material=material, author=self.author, parent=comment, content='대댓글')
+        return material
+
+    def test_bulk_status(self):
+        self.login()
+        PcbProjects.objects.filter(id=self.projects[1].id).update(status='ACCEPTED')
+        ids = [p.id for p in self.projects] + [self.other_project.id]
+        response = self.client.post(reverse('project_bulk_status'), {"project_ids": ids, "status": 'ACCEPTED'},
+                                    content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated"], 2)
+        results = {r["project_id"]: r["result"] for r in response.json()["results"]}
+        self.assertEqual(results, {
+            self.projects[0].id: 'updated',
+            self.projects[1].id: 'unchanged',
+            self.projects[2].id: 'updated',
+            self.other_project.id: 'not_found',
+        })
+        self.assertEqual(set(PcbProjects.objects.filter(company=self.company).values_list('status', flat=True)),
+                         {'ACCEPTED'})
+        self.assertEqual(PcbProjects.objects.get(id=self.other_project.id).status, 'PENDING')
+
+    def test_bulk_status_requires_role(self):
+        self.login(role='STAFF')
+        response = self.client.post(reverse('project_bulk_status'),
+                                    {"project_ids": [self.projects[0].id], "status": 'ACCEPTED'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_bulk_delete(self):
+        self.login()
+        deleted, kept = self.projects[0], self.projects[1]
+        deleted_material = self.add_material(deleted)
+        kept_material = self.add_material(kept)
+        other_material = self.add_material(self.other_project)
+
+        response = self.client.post(reverse('project_bulk_delete'),
+                                    {"project_ids": [deleted.id, self.other_project.id]},
+                                    content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], 'success')
+        results = {r["project_id"]: r["result"] for r in response.json()["results"]}
+        self.assertEqual(results, {deleted.id: 'deleted', self.other_project.id: 'not_found'})
+
+        # 하위 데이터는 DB 의 ON DELETE CASCADE 로 삭제
+        self.assertFalse(PcbProjects.objects.filter(id=deleted.id).exists())
+        self.assertFalse(AnalysisMaterials.objects.filter(id=deleted_material.id).exists())
+        self.assertFalse(AnalysisComments.objects.filter(material_id=deleted_material.id).exists())
+        self.assertFalse(Detections.objects.filter(project_id=deleted.id).exists())
+        self.assertFalse(DefectRollup.objects.filter(project_id=deleted.id).exists())
+        for material in (kept_material, other_material):
+            self.assertEqual(AnalysisComments.objects.filter(material_id=material.id).count(), 2)
+            self.assertEqual(Detections.objects.filter(material_id=material.id).count(), len(DETECTIONS))
+
+        # 회사 전체 집계에서 삭제된 프로젝트 분만 빠짐
+        totals = DefectRollup.objects.get(company=self.company, project__isnull=True, granularity='day', class_name='')
+        self.assertEqual((totals.material_count, totals.detection_count), (1, len(DETECTIONS)))
+
+        # 미디어 참조 해제는 작업 큐에 등록
+        job = BackgroundJob.objects.get(kind='media.release')
+        self.assertEqual(job.payload, {"materials": [['ab/cd/image.jpg', '']]})
+
+    def test_project_foreign_keys_cascade_in_database(self):
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT con.conrelid::regclass::text, con.confdeltype
+                FROM pg_constraint con
+                WHERE con.contype = 'f' AND con.confrelid = 'pcb_projects'::regclass
+            """)
+            rules = dict(cursor.fetchall())
+        for table in ('analysis_materials', 'detections', 'defect_rollups', 'performance_datasets'):
+            self.assertEqual(rules.get(table), 'c', table)
+
+
+# 성능 데이터 조회 api - 형식이 잘못된 입력은 500 이 아니라 400
+class PerformanceQueryValidationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Companies.objects.create(corporate_name='테스트 회사', owner_id=1)
+        cls.project = PcbProjects.objects.create(company=cls.company, model_name='PCB', status='PENDING')
+
+    def setUp(self):
+        session = self.client.session
+        session['company_id'] = self.company.id
+        session.save()
+
+    def query(self, body):
+        return self.client.post(reverse('performance_query'), body, content_type='application/json')
+
+    def test_invalid_input_returns_400(self):
+        for body in (
+            {"project_id": self.project.id, "material_ids": "1,2"},
+            {"project_id": self.project.id, "material_ids": ["a"]},
+            {"project_id": "abc"},
+            {"project_id": self.project.id, "filters": "voltage > 3"},
+            {"project_id": self.project.id, "filters": ["voltage"]},
+            [self.project.id],
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(self.query(body).status_code, 400)
+
+    def test_no_datasets(self):
+        response = self.query({"project_id": self.project.id, "material_ids": [1, 2], "filters": []})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["rows"], [])
+
+
+# 참조 수가 0 이 된 파일은 트랜잭션이 커밋된 뒤에만 삭제
+class BlobStoreReleaseTests(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = BlobStore('detected_results', root=self.tmp.name)
+
+    def test_release_unlinks_after_commit(self):
+        name = self.store.commit(self.store.stage_bytes(b'pcb', 'board.jpg'), refs=2)
+        path = self.store.path(name)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.assertEqual(self.store.release([name]), 0)
+        self.assertEqual(callbacks, [])
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.assertEqual(self.store.release([name]), 1)
+        self.assertTrue(os.path.exists(path))
+
+        for callback in callbacks:
+            callback()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(MediaBlob.objects.filter(kind='detected_results', name=name).exists())
+
+
+# 썸네일/타일은 로그인한 회사의 분석 결과만
+class MaterialDerivedAccessTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        company = Companies.objects.create(corporate_name='테스트 회사', owner_id=1)
+        cls.other_company = Companies.objects.create(corporate_name='다른 회사', owner_id=2)
+        author = Users.objects.create(
+            company=company, email='staff@example.com', password_hash='x', role='STAFF', name='작업자'
+        )
+        project = PcbProjects.objects.create(company=company, model_name='PCB', status='PENDING')
+        cls.material = AnalysisMaterials.objects.create(
+            project=project, author=author, defect_image_url='ab/cd/image.jpg', performance_data_url=''
+        )
+
+    def urls(self):
+        return (
+            reverse('material_thumbnail', args=[self.material.id, 'md']),
+            reverse('material_tiles_info', args=[self.material.id]),
+            reverse('material_tile', args=[self.material.id, 0, 0, 0]),
+        )
+
+    def test_requires_session(self):
+        for url in self.urls():
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_other_company_not_found(self):
+        session = self.client.session
+        session['company_id'] = self.other_company.id
+        session.save()
+        for url in self.urls():
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+
+# X-Accel-Redirect/X-Sendfile 경로는 퍼센트 인코딩, Content-Length 는 파일 크기
+class SendfileHeaderTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.name = '1700000000_성능 데이터.xlsx'
+        self.path = os.path.join(tmp.name, self.name)
+        with open(self.path, 'wb') as f:
+            f.write(b'0123456789')
+
+    def download(self):
+        request = RequestFactory().get('/download/')
+        return file_download_response(request, 'performance_data', self.name, self.path, self.name)
+
+    @override_settings(DOWNLOAD_SENDFILE='x-accel', DOWNLOAD_ACCEL_PREFIX='/protected/')
+    def test_x_accel_redirect_is_quoted(self):
+        response = self.download()
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/protected/performance_data/1700000000_%EC%84%B1%EB%8A%A5%20%EB%8D%B0%EC%9D%B4%ED%84%B0.xlsx')
+        self.assertEqual(response['Content-Length'], '10')
+
+    @override_settings(DOWNLOAD_SENDFILE='x-sendfile')
+    def test_x_sendfile_is_quoted(self):
+        response = self.download()
+        self.assertTrue(response['X-Sendfile'].isascii())
+        self.assertTrue(response['X-Sendfile'].endswith('/1700000000_%EC%84%B1%EB%8A%A5%20%EB%8D%B0%EC%9D%B4%ED%84%B0.xlsx'))
+        self.assertEqual(response['Content-Length'], '10')
+
+
+# 배치 스케줄러 - 모델 대신 호출 기록만 남기는 가짜 모델로 확인
+class _StubResults:
+
+    def __init__(self, n, pred=None):
+        self.pred = [pred if pred is not None else np.array([[1.0, 2.0, 3.0, 4.0, 0.9, 0.0]]) for _ in range(n)]
+        self.names = {0: 'missing_hole'}
+        self.t = (0.1, 0.2, 0.3)
+        self.s = (n,)
+
+
+class _StubModel:
+
+    def __init__(self, pred=None):
+        self.calls = []
+        self.pred = pred
+        self.lock = threading.Lock()
+
+    def __call__(self, images, size=640):
+        with self.lock:
+            self.calls.append(len(images))
+        return _StubResults(len(images), self.pred)
+
+    def forward_tiled(self, image, tile=640, overlap=0.2, batch=16):
+        return _StubResults(1, self.pred)
+
+
+class BatchSchedulerTests(SimpleTestCase):
+    image = np.zeros((8, 8, 3), np.uint8)
+
+    def test_collects_requests_within_max_wait(self):
+        model = _StubModel()
+        scheduler = BatchScheduler(model, max_batch_size=4, max_wait_ms=200)
+        futures = [scheduler.submit(self.image) for _ in range(3)]
+        results = [f.result(timeout=5) for f in futures]
+        self.assertEqual(model.calls, [3])
+        self.assertEqual([r["batch_size"] for r in results], [3, 3, 3])
+        self.assertEqual(results[0]["detections"][0]["name"], 'missing_hole')
+
+    def test_full_batch_runs_without_waiting(self):
+        model = _StubModel()
+        scheduler = BatchScheduler(model, max_batch_size=2, max_wait_ms=10000)
+        futures = [scheduler.submit(self.image) for _ in range(2)]
+        self.assertEqual([f.result(timeout=2)["batch_size"] for f in futures], [2, 2])
+
+    def test_flushes_after_max_wait(self):
+        model = _StubModel()
+        scheduler = BatchScheduler(model, max_batch_size=8, max_wait_ms=20)
+        self.assertEqual(scheduler.submit(self.image).result(timeout=2)["batch_size"], 1)
+
+    def test_submit_many_chunks_by_max_batch_size(self):
+        model = _StubModel()
+        scheduler = BatchScheduler(model, max_batch_size=4, max_wait_ms=0)
+        futures = scheduler.submit_many([self.image] * 10)
+        self.assertEqual(len([f.result(timeout=5) for f in futures]), 10)
+        self.assertEqual(model.calls, [4, 4, 2])
+
+    def test_malformed_prediction_fails_request_only(self):
+        model = _StubModel(pred=np.array([[1.0, 2.0, 3.0]]))
+        scheduler = BatchScheduler(model, max_batch_size=4, max_wait_ms=0)
+        with self.assertRaises(ValueError):
+            scheduler.submit(self.image).result(timeout=2)
+        with self.assertRaises(ValueError):
+            scheduler.submit(self.image, tiled=True).result(timeout=2)
+        model.pred = None
+        self.assertEqual(scheduler.submit(self.image).result(timeout=2)["batch_size"], 1)
+
+    def test_tiled_requests_are_counted(self):
+        scheduler = BatchScheduler(_StubModel(), max_batch_size=4, max_wait_ms=0)
+        scheduler.submit(self.image, tiled=True).result(timeout=2)
+        scheduler.submit(self.image).result(timeout=2)
+        stats = scheduler.stats()
+        self.assertEqual((stats["total_requests"], stats["total_batches"], stats["tiled_requests"]), (2, 2, 1))
+
+
+# 배치 차원은 로드한 모델 입력에서 확인 (INT8 도 동적 배치로 export 했으면 마이크로 배칭)
+class DynamicBatchTests(SimpleTestCase):
+
+    def onnx(self, shape):
+        session = SimpleNamespace(get_inputs=lambda: [SimpleNamespace(shape=shape)])
+        return SimpleNamespace(session=session)
+
+    def openvino(self, dynamic):
+        dim = SimpleNamespace(is_dynamic=dynamic)
+        compiled = SimpleNamespace(inputs=[SimpleNamespace(get_partial_shape=lambda: [dim])])
+        return SimpleNamespace(session=None, ov_compiled_model=compiled)
+
+    def test_batch_dimension(self):
+        self.assertTrue(has_dynamic_batch(self.onnx(['batch', 3, 'height', 'width'])))
+        self.assertFalse(has_dynamic_batch(self.onnx([1, 3, 640, 640])))
+        self.assertTrue(has_dynamic_batch(self.openvino(True)))
+        self.assertFalse(has_dynamic_batch(self.openvino(False)))
+        self.assertFalse(has_dynamic_batch(SimpleNamespace()))
+
+
+# 이어받기 업로드 - 등록이 끝나기 전까지는 세션을 남겨서 같은 upload_id 로 다시 시도할 수 있음
+class ResumableUploadClaimTests(SimpleTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.store = ResumableUploadStore(os.path.join(self.tmp, 'uploads'))
+        meta = self.store.create('data.csv', 4, owner_id=7)
+        self.upload_id = meta['upload_id']
+        self.store.append(self.upload_id, 0, io.BytesIO(b'a,b\n'))
+
+    def test_claim_keeps_session_until_discard(self):
+        for attempt in range(2):
+            path = os.path.join(self.tmp, f'claimed-{attempt}')
+            self.store.claim(self.upload_id, path, owner_id=7)
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), b'a,b\n')
+            os.remove(path)
+        self.store.discard(self.upload_id)
+        self.assertIsNone(self.store.get(self.upload_id))
+
+    def test_claim_requires_owner(self):
+        for owner_id in (None, 8):
+            with self.subTest(owner_id=owner_id), self.assertRaises(PermissionError):
+                self.store.claim(self.upload_id, os.path.join(self.tmp, 'claimed'), owner_id=owner_id)
+
+
+# 탐지 결과 캐시 - 이미지 크기도 함께 보관, sqlite 단계도 크기 제한
+class DetectionCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, 'cache.sqlite3')
+
+    def test_disk_tier_keeps_image_size(self):
+        DetectionCache(1 << 20, db_path=self.db_path).put('k', [{"class": 0}], b'jpeg', (1920, 1080))
+        cache = DetectionCache(1 << 20, db_path=self.db_path)
+        self.assertEqual(cache.get('k'), ([{"class": 0}], b'jpeg', (1920, 1080)))
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_disk_tier_is_size_limited(self):
+        cache = DetectionCache(1 << 20, db_path=self.db_path, db_max_bytes=3100)
+        for i in range(10):
+            cache.put(f'k{i}', [], b'x' * 1000, (10, 10))
+            cache._trim_db()
+        rows = cache._db.execute('SELECT key FROM detect_cache ORDER BY created_at').fetchall()
+        self.assertEqual([key for key, in rows], ['k7', 'k8', 'k9'])
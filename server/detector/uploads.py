@@ -0,0 +1,191 @@
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import hashlib
+
+# 업로드 파일을 메모리에 통째로 올리지 않고 청크 단위로 디스크에 기록
+CHUNK_SIZE = 256 * 1024
+CHECKSUM_ALGORITHMS = ('sha256', 'md5')
+UPLOAD_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ChecksumMismatch(ValueError):
+    pass
+
+
+class OffsetMismatch(Exception):
+
+    def __init__(self, offset):
+        super().__init__(f"업로드 offset 이 맞지 않습니다. (현재 {offset})")
+        self.offset = offset
+
+
+# "sha256:<hex>" / "md5:<hex>" 형태의 체크섬 파싱 (알고리즘 없이 hex 만 오면 sha256)
+def parse_checksum(value):
+    if not value:
+        return None
+    algorithm, _, digest = value.rpartition(':')
+    algorithm = (algorithm or 'sha256').lower()
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise ValueError(f"지원하지 않는 체크섬 알고리즘입니다: {algorithm} ({', '.join(CHECKSUM_ALGORITHMS)})")
+    return algorithm, digest.lower()
+
+
+def file_digest(path, algorithm='sha256'):
+    hasher = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+# 청크를 임시 파일에 쓰면서 해시를 계산하고, 체크섬이 맞을 때만 최종 이름으로 교체
+# 저장소 키로 쓰는 sha256 은 항상 계산해서 (크기, sha256) 반환
+def write_chunks(chunks, path, checksum=None, name='파일'):
+    checksum = parse_checksum(checksum) if isinstance(checksum, str) else checksum
+    sha256 = hashlib.sha256()
+    verifier = hashlib.new(checksum[0]) if checksum and checksum[0] != 'sha256' else None
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    size = 0
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                sha256.update(chunk)
+                if verifier is not None:
+                    verifier.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        if checksum and (verifier or sha256).hexdigest() != checksum[1]:
+            raise ChecksumMismatch(f"{name} 체크섬이 일치하지 않습니다. ({checksum[0]})")
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return size, sha256.hexdigest()
+
+
+# 이어받기(resumable) 업로드 저장소
+# 큰 성능 데이터 파일을 여러 요청으로 나눠서 보내고, 끊기면 마지막 offset 부터 다시 보냄
+# <root>/<id>.part 에 이어 쓰고 <id>.json 에 파일명/전체 크기/체크섬/작성자/현재 offset 보관
+class ResumableUploadStore:
+
+    def __init__(self, root, ttl_seconds=24 * 3600, max_bytes=512 * 1024 * 1024):
+        self.root = root
+        self.ttl = ttl_seconds
+        self.max_bytes = max_bytes
+        self._last_cleanup = 0.0
+
+    def _paths(self, upload_id):
+        if not UPLOAD_ID_RE.match(upload_id or ''):
+            return None, None
+        return os.path.join(self.root, f"{upload_id}.part"), os.path.join(self.root, f"{upload_id}.json")
+
+    def _save_meta(self, meta_path, meta):
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+    def create(self, filename, size, checksum=None, owner_id=None):
+        size = int(size)
+        if size <= 0 or size > self.max_bytes:
+            raise ValueError(f"파일 크기는 1 ~ {self.max_bytes} 바이트여야 합니다.")
+        parse_checksum(checksum)
+        os.makedirs(self.root, exist_ok=True)
+        self.cleanup()
+        upload_id = uuid.uuid4().hex
+        part_path, meta_path = self._paths(upload_id)
+        open(part_path, 'wb').close()
+        meta = {
+            "upload_id": upload_id,
+            "filename": os.path.basename(filename),
+            "size": size,
+            "checksum": checksum,
+            "owner_id": owner_id,
+            "offset": 0,
+            "complete": False,
+            "created_at": time.time(),
+        }
+        self._save_meta(meta_path, meta)
+        return meta
+
+    def get(self, upload_id):
+        part_path, meta_path = self._paths(upload_id)
+        if meta_path is None or not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if time.time() - meta['created_at'] > self.ttl:
+            return None
+        # 마지막 요청이 중간에 끊겼으면 실제 파일 크기가 기준
+        meta['offset'] = os.path.getsize(part_path)
+        return meta
+
+    # offset 위치부터 스트림을 이어 씀 (offset 이 현재 크기와 다르면 409 로 다시 조회하게 함)
+    def append(self, upload_id, offset, stream):
+        meta = self.get(upload_id)
+        if meta is None:
+            raise FileNotFoundError(upload_id)
+        if meta['complete']:
+            return meta
+        if int(offset) != meta['offset']:
+            raise OffsetMismatch(meta['offset'])
+
+        part_path, meta_path = self._paths(upload_id)
+        remaining = meta['size'] - meta['offset']
+        with open(part_path, 'ab') as f:
+            while remaining > 0:
+                chunk = stream.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+        meta['offset'] = meta['size'] - remaining
+
+        if remaining == 0:
+            checksum = parse_checksum(meta['checksum'])
+            if checksum and file_digest(part_path, checksum[0]) != checksum[1]:
+                self.discard(upload_id)
+                raise ChecksumMismatch(f"{meta['filename']} 체크섬이 일치하지 않습니다. ({checksum[0]})")
+            meta['complete'] = True
+        self._save_meta(meta_path, meta)
+        return meta
+
+    # 완료된 업로드 파일을 path 에 하드 링크 (다른 파일 시스템이면 복사)
+    # 업로드 세션은 남겨둠 - 분석 결과 등록이 실패해도 같은 upload_id 로 다시 시도할 수 있게
+    # 호출한 쪽이 등록 트랜잭션이 커밋된 뒤에 discard 로 정리
+    def claim(self, upload_id, path, owner_id):
+        meta = self.get(upload_id)
+        if meta is None or not meta['complete']:
+            raise FileNotFoundError(f"완료되지 않았거나 만료된 업로드입니다: {upload_id}")
+        if owner_id is None or meta['owner_id'] != owner_id:
+            raise PermissionError("다른 사용자의 업로드입니다.")
+        part_path, _ = self._paths(upload_id)
+        try:
+            os.link(part_path, path)
+        except OSError:
+            shutil.copyfile(part_path, path)
+        return meta
+
+    def discard(self, upload_id):
+        for path in self._paths(upload_id):
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    # 만료된 업로드 정리 (최대 1분에 한 번)
+    def cleanup(self):
+        now = time.time()
+        if now - self._last_cleanup < 60:
+            return
+        self._last_cleanup = now
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+            except OSError:
+                pass
@@ -2,22 +2,41 @@ from django.urls import path
 from django.conf import settings
 from django.conf.urls.static import static
 from .views import ( 
-    DetectView, CompanySignUpView, CompanyMemberManagementView, 
+    DetectView, DetectBatchView, DetectResultView, DetectStatsView, DetectReadyView, JobStatsView, CompanySignUpView, CompanyMemberManagementView, 
     LoginView, LogoutView, UserUpdateView, ProjectView, 
     ProjectUploadView, AnalysisMaterialListView, DownloadPerformanceDataView, 
-    ProjectStatusUpdateView, AnalysisCommentView
+    ProjectStatusUpdateView, AnalysisCommentView, ResumableUploadView, ResumableUploadDetailView,
+    DefectRollupView, ProjectBulkStatusView, ProjectBulkDeleteView, PerformanceSchemaView, PerformanceQueryView,
+    MaterialThumbnailView, MaterialTileInfoView, MaterialTileView
 )
+from .async_views import AsyncDetectView
 
 urlpatterns = [
     path('detect/', DetectView.as_view(), name='pcb_detect'),
+    path('detect/batch/', DetectBatchView.as_view(), name='pcb_detect_batch'),
+    path('detect/result/<str:result_id>/', DetectResultView.as_view(), name='pcb_detect_result'),
+    path('detect/stats/', DetectStatsView.as_view(), name='pcb_detect_stats'),
+    path('detect/async/', AsyncDetectView.as_view(), name='pcb_detect_async'),
+    path('detect/ready/', DetectReadyView.as_view(), name='pcb_detect_ready'),
+    path('jobs/stats/', JobStatsView.as_view(), name='job_stats'),
     path('upload-result/', ProjectUploadView.as_view(), name='pcb_upload'),
+    path('uploads/', ResumableUploadView.as_view(), name='resumable_upload'),
+    path('uploads/<str:upload_id>/', ResumableUploadDetailView.as_view(), name='resumable_upload_detail'),
     path('signup/', CompanySignUpView.as_view(), name='signup'),
     path('login/', LoginView.as_view(), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
     path('update-profile/', UserUpdateView.as_view(), name='update_profile'),
     path('projects/', ProjectView.as_view(), name='projects'),
     path('projects/status/', ProjectStatusUpdateView.as_view(), name='project_status_update'),
+    path('projects/bulk-status/', ProjectBulkStatusView.as_view(), name='project_bulk_status'),
+    path('projects/bulk-delete/', ProjectBulkDeleteView.as_view(), name='project_bulk_delete'),
     path('analysis-materials/', AnalysisMaterialListView.as_view(), name='analysis_materials_list'),
+    path('rollups/', DefectRollupView.as_view(), name='defect_rollups'),
+    path('performance/schemas/', PerformanceSchemaView.as_view(), name='performance_schemas'),
+    path('performance/query/', PerformanceQueryView.as_view(), name='performance_query'),
+    path('analysis-materials/<int:material_id>/thumbnail/<str:size>/', MaterialThumbnailView.as_view(), name='material_thumbnail'),
+    path('analysis-materials/<int:material_id>/tiles/', MaterialTileInfoView.as_view(), name='material_tiles_info'),
+    path('analysis-materials/<int:material_id>/tiles/<int:level>/<int:x>_<int:y>.jpg', MaterialTileView.as_view(), name='material_tile'),
     path('download-performance/', DownloadPerformanceDataView.as_view(), name='download_performance'),
     path('company/members/', CompanyMemberManagementView.as_view(), name='company_members'),
     path('comments/', AnalysisCommentView.as_view(), name='analysis_comments'),
@@ -1,4 +1,3 @@
-import torch
 import os
 import io
 import base64
@@ -6,9 +5,16 @@ import numpy as np
 import cv2
 import traceback
 import time
-import pytz
+import datetime
+import json
+import uuid
+import hashlib
+import mimetypes
+import zoneinfo
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -17,26 +23,141 @@ from rest_framework import status
 from .serializers import CompanyUserRegistrationSerializer, UserListSerializer, UserRoleUpdateSerializer, AnalysisCommentSerializer
 from django.contrib.auth import logout
 from django.contrib.auth.hashers import check_password
-from django.http import FileResponse, Http404
-from django.utils.encoding import smart_str
-from .models import Users, PcbProjects, Companies, AnalysisMaterials, AnalysisComments
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from .models import (
+    Users, PcbProjects, Companies, AnalysisMaterials, AnalysisComments, DefectRollup, PerformanceDataset,
+    PerformanceSchema,
+)
 from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
 
-# 상대 경로 기준점 설정
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from .inference import CONF_THRES, IOU_THRES, weights_fingerprint
+from .engine import detect_engine
+from .result_cache import DetectionCache
+from .result_store import RenderedResultStore
+from .uploads import CHUNK_SIZE, ChecksumMismatch, OffsetMismatch, ResumableUploadStore
+from .storage import detected_results_store, performance_data_store, release_materials, release_materials_async
+from .analytics import ROLLUP_GRANULARITIES, parse_detections, remove_project_rollups, save_detections, update_rollups
+from . import derivatives
+from .derivatives import THUMBNAIL_SIZES, schedule_thumbnails
+from .downloads import file_download_response
+from .performance import run_query, schedule_ingest, validate_query
+from . import jobs, metrics, project_cache
 
-# YOLOv5 설정 경로
-YOLOV5_PATH = os.path.join(BASE_DIR, "yolov5")
-WEIGHTS_PATH = os.path.join(YOLOV5_PATH, "runs", "train", "pcb_final_run", "weights", "best.pt")
+# 같은 사진 재전송 시 모델을 다시 돌리지 않도록 결과 캐시 (DETECT_CACHE_MAX_MB = 0 이면 사용 안 함)
+detect_cache = None
+if settings.DETECT_CACHE_MAX_MB > 0:
+    detect_cache = DetectionCache(
+        settings.DETECT_CACHE_MAX_MB * 1024 * 1024,
+        ttl_seconds=settings.DETECT_CACHE_TTL,
+        db_path=settings.DETECT_CACHE_DB,
+        db_max_bytes=settings.DETECT_CACHE_DB_MAX_MB * 1024 * 1024,
+    )
 
-# 모델 로드 (서버 시작 시 1회)
-model = None
-try:
-    model = torch.hub.load(YOLOV5_PATH, 'custom', path=WEIGHTS_PATH, source='local')
-    model.conf = 0.25
-    print(f"✅ AI 모델 로드 완료: {WEIGHTS_PATH}")
-except Exception as e:
-    print(f"❌ 모델 로드 실패: {e}")
+# 탐지 결과(렌더링 이미지 + 좌표)를 job_id 로 잠깐 보관 (result_url 다운로드, /upload-result/ 의 detect_job_id)
+detect_result_store = RenderedResultStore(
+    os.path.join(settings.MEDIA_ROOT, "detect_results"),
+    ttl_seconds=settings.DETECT_RESULT_TTL,
+)
+
+# 성능 데이터 이어받기 업로드 임시 저장소
+resumable_uploads = ResumableUploadStore(
+    os.path.join(settings.MEDIA_ROOT, "uploads"),
+    ttl_seconds=settings.RESUMABLE_UPLOAD_TTL,
+    max_bytes=settings.RESUMABLE_UPLOAD_MAX_MB * 1024 * 1024,
+)
+
+
+def detection_cache_key(raw_bytes, tiled=False):
+    try:
+        fingerprint = weights_fingerprint()
+    except OSError:
+        return None
+    variant = f"{settings.DETECT_BACKEND}:tiled{settings.DETECT_TILE_SIZE}" if tiled else settings.DETECT_BACKEND
+    return DetectionCache.make_key(raw_bytes, fingerprint, CONF_THRES, IOU_THRES, variant)
+
+
+# 요청 파라미터 tiled=1 이면 타일 추론, 없으면 DETECT_TILED 설정값 사용
+def use_tiled(request):
+    value = request.data.get('tiled')
+    if value is None:
+        return settings.DETECT_TILED
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def run_detection(img_cv, tiled=False):
+    return detect_engine.detect(img_cv, tiled)
+
+
+def run_detection_many(images_cv, tiled=False):
+    return detect_engine.detect_many(images_cv, tiled)
+
+
+def detection_stats():
+    stats = detect_engine.stats()
+    if stats is None:
+        return None
+    stats["cache"] = detect_cache.stats() if detect_cache is not None else None
+    return stats
+
+# 탐지 결과 응답 형식
+# base64    : 기존 방식 (JSON 안에 data URI 로 이미지 포함)
+# json      : 탐지 좌표만 JSON 으로, 렌더링 이미지는 result_url 로 따로 받음
+# multipart : multipart/mixed 응답 (JSON 파트 + image/jpeg 파트)
+# none      : 서버 렌더링 생략, 앱에서 좌표로 직접 박스 그림
+RESPONSE_FORMATS = ('base64', 'json', 'multipart', 'none')
+# 렌더링 결과를 job_id 로 디스크에 보관하는 형식 (json 은 result_url, multipart 는 나중에 detect_job_id 로 등록)
+# 그 외(base64 기본 등)는 keep=1 을 보낸 요청만 보관 - 같은 사진 재요청은 결과 캐시(detect_cache)의 JPEG 를 씀
+KEEP_RESULT_FORMATS = ('json', 'multipart')
+
+
+def keep_result(response_format, keep_param):
+    return response_format in KEEP_RESULT_FORMATS or str(keep_param or '').lower() in ('1', 'true', 'yes')
+
+
+def draw_detections(img_cv, detections):
+    for i, det in enumerate(detections):
+        idx = i + 1
+        x1, y1, x2, y2 = int(det['xmin']), int(det['ymin']), int(det['xmax']), int(det['ymax'])
+        cv2.rectangle(img_cv, (x1, y1), (x2, y2), (0, 0, 255), 3)
+        cv2.putText(img_cv, str(idx), (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 255), 2)
+
+
+def multipart_response(payload, jpeg):
+    boundary = uuid.uuid4().hex
+    body = b''.join([
+        f"--{boundary}\r\nContent-Type: application/json\r\n\r\n".encode(),
+        json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+        f"\r\n--{boundary}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode(),
+        jpeg,
+        f"\r\n--{boundary}--\r\n".encode(),
+    ])
+    return HttpResponse(body, content_type=f'multipart/mixed; boundary={boundary}')
+
+
+def detect_response(request, response_format, payload, jpeg):
+    # 렌더링 이미지 + 좌표를 job_id 로 보관 -> /upload-result/ 에 detect_job_id 만 보내면 이미지 재전송 없이 등록
+    # 보관이 필요한 요청(keep_result)만 디스크에 씀
+    keep_param = request.query_params.get('keep') or request.data.get('keep')
+    result_id = None
+    if keep_result(response_format, keep_param):
+        with metrics.stage('detect', 'result_store'):
+            result_id = detect_result_store.save(jpeg, payload["detections"])
+        payload["job_id"] = result_id
+    if response_format == 'base64':
+        with metrics.stage('detect', 'base64'):
+            img_base64 = base64.b64encode(jpeg).decode('utf-8')
+        payload["result_image"] = f"data:image/jpeg;base64,{img_base64}"
+    elif response_format == 'json':
+        payload["result_id"] = result_id
+        payload["result_url"] = request.build_absolute_uri(reverse('pcb_detect_result', args=[result_id]))
+    elif response_format == 'multipart':
+        return multipart_response(payload, jpeg)
+    return Response(payload)
 
 # AI 결함 탐지 api
 class DetectView(APIView):
@@ -46,44 +167,306 @@ class DetectView(APIView):
         if 'image' not in request.FILES:
             return Response({"status": "fail", "message": "이미지가 없습니다."}, status=400)
 
+        response_format = request.query_params.get('response_format') or request.data.get('response_format') or 'base64'
+        if response_format not in RESPONSE_FORMATS:
+            return Response({"status": "fail", "message": f"지원하지 않는 응답 형식입니다. ({', '.join(RESPONSE_FORMATS)})"}, status=400)
+
         try:
-            image_file = request.FILES['image']
-            img_np = np.frombuffer(image_file.read(), np.uint8)
-            img_cv = cv2.imdecode(img_np, cv2.IMREAD_COLOR)
+            with metrics.stage('detect', 'upload_read'):
+                image_file = request.FILES['image']
+                raw_bytes = image_file.read()
+            tiled = use_tiled(request)
 
-            img_rgb = cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB)
-            results = model(img_rgb)
-            detections = results.pandas().xyxy[0].to_dict(orient="records")
+            # 캐시 히트면 디코딩/추론/렌더링 모두 생략
+            cache_key = detection_cache_key(raw_bytes, tiled) if detect_cache is not None else None
+            cached = detect_cache.get(cache_key) if cache_key else None
+            if cache_key:
+                metrics.CACHE_LOOKUPS.labels(result='hit' if cached is not None else 'miss').inc()
+            # 히트/미스 모두 같은 응답 형태 (이미지 크기 포함, none 이면 렌더링 이미지/job_id 없음)
+            if cached is not None:
+                detections, jpeg, (width, height) = cached
+                payload = {"status": "success", "detections": detections, "cached": True,
+                           "image_width": width, "image_height": height}
+                metrics.count_request('detect', 'cache_hit')
+                if response_format == 'none':
+                    return Response(payload)
+                return detect_response(request, response_format, payload, jpeg)
 
-            for i, det in enumerate(detections):
-                idx = i + 1
-                x1, y1, x2, y2 = int(det['xmin']), int(det['ymin']), int(det['xmax']), int(det['ymax'])
-                cv2.rectangle(img_cv, (x1, y1), (x2, y2), (0, 0, 255), 3)
-                cv2.putText(img_cv, str(idx), (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 255), 2)
-                det['display_id'] = idx
+            with metrics.stage('detect', 'imdecode'):
+                img_np = np.frombuffer(raw_bytes, np.uint8)
+                img_cv = cv2.imdecode(img_np, cv2.IMREAD_COLOR)
 
-            _, buffer = cv2.imencode('.jpg', img_cv)
-            img_base64 = base64.b64encode(buffer).decode('utf-8')
+            # 동시에 들어온 요청들과 묶여서 한 번의 forward 로 처리됨
+            # 타일 모드는 고해상도 패널을 640 타일로 잘라서 타일들을 한 배치로 추론
+            result = run_detection(img_cv, tiled)
+            metrics.observe_detection('detect', result)
+            detections = result['detections']
+            for i, det in enumerate(detections):
+                det['display_id'] = i + 1
 
-            return Response({
+            payload = {
                 "status": "success",
-                "result_image": f"data:image/jpeg;base64,{img_base64}",
-                "detections": detections
-            })
+                "detections": detections,
+                "cached": False,
+                "image_width": img_cv.shape[1],
+                "image_height": img_cv.shape[0],
+                "batch": {
+                    "queue_ms": result['queue_ms'],
+                    "inference_ms": result['inference_ms'],
+                    "batch_size": result['batch_size']
+                }
+            }
+            if response_format == 'none':
+                metrics.count_request('detect', 'success')
+                return Response(payload)
+
+            with metrics.stage('detect', 'draw'):
+                draw_detections(img_cv, detections)
+            with metrics.stage('detect', 'jpeg_encode'):
+                _, buffer = cv2.imencode('.jpg', img_cv)
+                jpeg = buffer.tobytes()
+            if cache_key:
+                detect_cache.put(cache_key, detections, jpeg, (img_cv.shape[1], img_cv.shape[0]))
+
+            metrics.count_request('detect', 'success')
+            return detect_response(request, response_format, payload, jpeg)
+        except TimeoutError:
+            metrics.count_request('detect', 'timeout')
+            return Response({"status": "error", "message": "추론 시간이 초과되었습니다. 잠시 후 다시 시도하세요."}, status=503)
+        except Exception as e:
+            traceback.print_exc()
+            metrics.count_request('detect', 'error')
+            return Response({"status": "error", "message": str(e)}, status=500)
+
+# 여러 장 AI 결함 탐지 api (검사 라인에서 보드 한 장당 윗면/아랫면/측면 등 여러 장 촬영)
+# multipart 의 images 필드 여러 개를 병렬로 디코딩 -> max_batch_size 장씩 배치 forward -> 이미지별 결과 목록 (보낸 순서대로)
+# 응답 형식은 json(기본, 이미지별 result_url) / base64 / none (multipart 는 지원하지 않음)
+# 캐시에 있는 이미지는 추론에서 빼고, 읽을 수 없는 이미지는 해당 항목만 fail
+BATCH_RESPONSE_FORMATS = ('base64', 'json', 'none')
+# 디코딩/렌더링 스레드 풀 (cv2 는 GIL 을 풀고 동작해서 코어 수만큼 병렬 처리)
+batch_executor = ThreadPoolExecutor(max_workers=settings.DETECT_BATCH_THREADS, thread_name_prefix='detect-batch')
+
+
+def _decode_image(raw_bytes):
+    with metrics.stage('detect_batch', 'imdecode'):
+        return cv2.imdecode(np.frombuffer(raw_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+
+def _render_jpeg(img_cv, detections):
+    with metrics.stage('detect_batch', 'draw'):
+        draw_detections(img_cv, detections)
+    with metrics.stage('detect_batch', 'jpeg_encode'):
+        _, buffer = cv2.imencode('.jpg', img_cv)
+    return buffer.tobytes()
+
+
+class DetectBatchView(APIView):
+    parser_classes = (MultiPartParser, FormParser)
+
+    def post(self, request):
+        files = request.FILES.getlist('images') or request.FILES.getlist('image')
+        if not files:
+            return Response({"status": "fail", "message": "이미지가 없습니다."}, status=400)
+        if len(files) > settings.DETECT_BATCH_MAX_IMAGES:
+            return Response({"status": "fail", "message": f"한 번에 최대 {settings.DETECT_BATCH_MAX_IMAGES}장까지 탐지할 수 있습니다."}, status=400)
+
+        response_format = request.query_params.get('response_format') or request.data.get('response_format') or 'json'
+        if response_format not in BATCH_RESPONSE_FORMATS:
+            return Response({"status": "fail", "message": f"지원하지 않는 응답 형식입니다. ({', '.join(BATCH_RESPONSE_FORMATS)})"}, status=400)
+
+        try:
+            with metrics.stage('detect_batch', 'upload_read'):
+                raw_images = [f.read() for f in files]
+            tiled = use_tiled(request)
+
+            items = [{"index": i, "filename": f.name} for i, f in enumerate(files)]
+            jpegs = [None] * len(files)
+            cache_keys = [None] * len(files)
+            pending = []
+            for i, raw_bytes in enumerate(raw_images):
+                cache_key = detection_cache_key(raw_bytes, tiled) if detect_cache is not None else None
+                cached = detect_cache.get(cache_key) if cache_key else None
+                if cache_key:
+                    metrics.CACHE_LOOKUPS.labels(result='hit' if cached is not None else 'miss').inc()
+                if cached is not None:
+                    detections, jpegs[i], (width, height) = cached
+                    items[i].update(status="success", detections=detections, cached=True,
+                                    image_width=width, image_height=height)
+                else:
+                    cache_keys[i] = cache_key
+                    pending.append(i)
+
+            decoded = []
+            for i, img_cv in zip(pending, batch_executor.map(_decode_image, [raw_images[i] for i in pending])):
+                if img_cv is None:
+                    items[i].update(status="fail", message="이미지를 읽을 수 없습니다.")
+                else:
+                    decoded.append((i, img_cv))
+
+            batch = None
+            if decoded:
+                # 캐시에 없는 이미지를 max_batch_size 장씩 묶어서 추론
+                results = run_detection_many([img_cv for _, img_cv in decoded], tiled)
+                for (i, img_cv), result in zip(decoded, results):
+                    metrics.observe_detection('detect_batch', result)
+                    detections = result['detections']
+                    for k, det in enumerate(detections):
+                        det['display_id'] = k + 1
+                    items[i].update(status="success", detections=detections, cached=False,
+                                    image_width=img_cv.shape[1], image_height=img_cv.shape[0])
+                batch = {
+                    "queue_ms": max(r['queue_ms'] for r in results),
+                    "inference_ms": max(r['inference_ms'] for r in results),
+                    "batch_size": max(r['batch_size'] for r in results),
+                }
+                if response_format != 'none':
+                    rendered = batch_executor.map(lambda pair: _render_jpeg(pair[1], items[pair[0]]["detections"]), decoded)
+                    for (i, _), jpeg in zip(decoded, rendered):
+                        jpegs[i] = jpeg
+                        if cache_keys[i]:
+                            detect_cache.put(cache_keys[i], items[i]["detections"], jpeg,
+                                             (items[i]["image_width"], items[i]["image_height"]))
+
+            # 렌더링 이미지 + 좌표를 이미지별 job_id 로 보관 (/upload-result/ 의 detect_job_id)
+            # json 이거나 keep=1 일 때만 디스크에 씀
+            keep = keep_result(response_format, request.query_params.get('keep') or request.data.get('keep'))
+            if response_format != 'none':
+                for item, jpeg in zip(items, jpegs):
+                    if jpeg is None:
+                        continue
+                    if keep:
+                        with metrics.stage('detect_batch', 'result_store'):
+                            item["job_id"] = detect_result_store.save(jpeg, item["detections"])
+                    if response_format == 'base64':
+                        item["result_image"] = f"data:image/jpeg;base64,{base64.b64encode(jpeg).decode('utf-8')}"
+                    else:
+                        item["result_id"] = item["job_id"]
+                        item["result_url"] = request.build_absolute_uri(reverse('pcb_detect_result', args=[item["job_id"]]))
+
+            failed = sum(1 for item in items if item["status"] == 'fail')
+            outcome = 'success' if not failed else ('fail' if failed == len(items) else 'partial')
+            metrics.count_request('detect_batch', outcome)
+            return Response({"status": outcome, "count": len(items), "results": items, "batch": batch},
+                            status=400 if outcome == 'fail' else 200)
+        except TimeoutError:
+            metrics.count_request('detect_batch', 'timeout')
+            return Response({"status": "error", "message": "추론 시간이 초과되었습니다. 잠시 후 다시 시도하세요."}, status=503)
         except Exception as e:
             traceback.print_exc()
+            metrics.count_request('detect_batch', 'error')
             return Response({"status": "error", "message": str(e)}, status=500)
 
+# 렌더링된 탐지 결과 이미지 다운로드 (response_format=json 일 때 result_url)
+class DetectResultView(APIView):
+    def get(self, request, result_id):
+        file_handle = detect_result_store.open(result_id)
+        if file_handle is None:
+            raise Http404("결과 이미지가 없거나 만료되었습니다.")
+        return FileResponse(file_handle, content_type='image/jpeg')
+
+# 배치 스케줄러 통계 조회 (max batch size / max wait 튜닝용)
+class DetectStatsView(APIView):
+    def get(self, request):
+        stats = detection_stats()
+        if stats is None:
+            return Response({"status": "error", "message": "AI 모델이 로드되지 않았습니다."}, status=503)
+        return Response({"status": "success", "data": stats})
+
+
+# 준비 상태 확인 (로드 밸런서/배포 readiness probe 용)
+# 아직 로드 전이면 백그라운드 로드를 시작하고 503, 로드가 끝나면 200 과 콜드 스타트 시간
+class DetectReadyView(APIView):
+    def get(self, request):
+        detect_engine.warm_up()
+        data = detect_engine.status()
+        return Response({"status": "success" if detect_engine.ready else "loading", "data": data},
+                        status=200 if detect_engine.ready else 503)
+
+# 업로드 후처리 작업 큐 현황 (종류/상태별 작업 수, 평균 대기/처리 시간)
+class JobStatsView(APIView):
+    def get(self, request):
+        return Response({"status": "success", "data": jobs.stats()})
+
+# 댓글 조회 api
+# 기본은 자료의 댓글 스레드 전체 (최상위 댓글 목록, 각 항목의 replies 에 대댓글)
+# limit/cursor : 최상위 댓글 단위 페이지네이션 (다음 cursor 는 X-Next-Cursor 헤더)
+# since : 해당 시각 이후 새 댓글만 평탄한 목록으로 (다음 폴링에는 X-Server-Time 헤더 값을 사용)
+COMMENT_PAGE_MAX = 100
+# 폴링 사이에 커밋된 댓글을 놓치지 않도록 X-Server-Time 을 조금 앞당겨서 줌 (앱은 id 로 중복 제거)
+COMMENT_POLL_OVERLAP = datetime.timedelta(seconds=5)
+
+
+# 목록 api 공통 keyset cursor: (created_at, id) 를 URL 에 넣을 수 있는 문자열로
+def encode_keyset_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_keyset_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created_at, row_id = raw.rsplit('|', 1)
+        dt = datetime.datetime.fromisoformat(created_at)
+        return (dt if timezone.is_aware(dt) else timezone.make_aware(dt)), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("cursor 가 올바르지 않습니다.")
+
+
 class AnalysisCommentView(APIView):
     def get(self, request):
         material_id = request.query_params.get('material_id')
         if not material_id:
             return Response({"error": "material_id가 필요합니다."}, status=400)
         
-        # 부모 댓글만 조회하면 시리얼라이저가 대댓글을 트리구조로 가져옴
-        comments = AnalysisComments.objects.filter(material_id=material_id, parent__isnull=True).order_by('created_at')
-        serializer = AnalysisCommentSerializer(comments, many=True)
-        return Response(serializer.data)
+        try:
+            limit = request.query_params.get('limit')
+            limit = min(max(int(limit), 1), COMMENT_PAGE_MAX) if limit else None
+            cursor = request.query_params.get('cursor')
+            after = decode_keyset_cursor(cursor) if cursor else None
+            since = request.query_params.get('since')
+            since = parse_query_datetime(since) if since else None
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        server_time = timezone.now() - COMMENT_POLL_OVERLAP
+        comments = AnalysisComments.objects.filter(material_id=material_id).select_related('author')
+
+        # 폴링: since 이후 새로 달린 댓글/대댓글만 작성 순서대로 (parent 로 앱에서 트리에 끼워 넣음)
+        if since is not None:
+            new_comments = comments.filter(created_at__gt=since).order_by('created_at', 'id')
+            serializer = AnalysisCommentSerializer(new_comments, many=True, context={"replies": {}})
+            response = Response(serializer.data)
+            response['X-Server-Time'] = server_time.isoformat()
+            return response
+
+        # 최상위 댓글(limit 이 있으면 한 페이지 + 1건)과 그 대댓글을 한 번의 쿼리로 읽고 메모리에서 트리 구성
+        threads = comments.filter(parent__isnull=True)
+        if after is not None:
+            created_at, comment_id = after
+            threads = threads.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=comment_id))
+        thread_ids = threads.order_by('created_at', 'id').values('id')
+        if limit is not None:
+            thread_ids = thread_ids[:limit + 1]
+        rows = comments.filter(Q(id__in=thread_ids) | Q(parent_id__in=thread_ids)).order_by('created_at', 'id')
+
+        top_level, replies = [], {}
+        for comment in rows:
+            if comment.parent_id is None:
+                top_level.append(comment)
+            else:
+                replies.setdefault(comment.parent_id, []).append(comment)
+
+        next_cursor = None
+        if limit is not None and len(top_level) > limit:
+            top_level = top_level[:limit]
+            next_cursor = encode_keyset_cursor(top_level[-1].created_at, top_level[-1].id)
+
+        serializer = AnalysisCommentSerializer(top_level, many=True, context={"replies": replies})
+        response = Response(serializer.data)
+        response['X-Server-Time'] = server_time.isoformat()
+        if next_cursor:
+            response['X-Next-Cursor'] = next_cursor
+        return response
 
     def post(self, request):
         author_id = request.data.get('author_id') or request.session.get('user_id')
@@ -180,87 +563,340 @@ class CompanyMemberManagementView(APIView):
 
 # 프로젝트 업로드 및 물리 저장, 데이터베이스에는 파일 이름만 저장함ㅁ
 class ProjectUploadView(APIView):
+    parser_classes = (JSONParser, MultiPartParser, FormParser)
+
     def post(self, request):
         try:
             author_id = request.session.get('user_id')
             project_id = request.data.get('project_id')
-            image_data = request.data.get('image_data') 
-            excel_data = request.data.get('excel_data') 
-            excel_name = request.data.get('excel_name')
             description = request.data.get('description', '')
 
-            # 이미지 파일 저장
-            if image_data and ',' in image_data:
-                imgstr = image_data.split(',')[1]
-            else:
-                imgstr = image_data
-            img_bytes = base64.b64decode(imgstr)
-            
-            # 데이터베이스에 저장될 파일명 생성하고
-            img_filename = f"pcb_{project_id}_{int(time.time())}.jpg"
-            save_dir_img = os.path.join(settings.MEDIA_ROOT, "detected_results")
-            if not os.path.exists(save_dir_img): 
-                os.makedirs(save_dir_img)
-            
-            # 실제 파일을 저장_volume\detected_results
-            with open(os.path.join(save_dir_img, img_filename), 'wb') as f:
-                f.write(img_bytes)
-
-            # 엑셀/CSV 파일 저장_volume\performance_data
-            excel_filename = ""
-            if excel_data:
-                save_dir_excel = os.path.join(settings.MEDIA_ROOT, "performance_data")
-                if not os.path.exists(save_dir_excel): 
-                    os.makedirs(save_dir_excel)
-                
-                excel_filename = f"{int(time.time())}_{excel_name}"
-                excel_bytes = base64.b64decode(excel_data)
-                with open(os.path.join(save_dir_excel, excel_filename), 'wb') as f:
-                    f.write(excel_bytes)
+            # 1) 파일을 임시 위치에 기록 (해시 계산 + 체크섬 검증)
+            # multipart(image 파일)면 청크 단위로 바로 디스크에 기록, 기존 JSON(base64 image_data)도 계속 지원
+            # detect_job_id 가 있으면 /detect/ 때 서버에 보관한 렌더링 이미지를 그대로 사용 (이미지 재전송 없음)
+            # 탐지 박스는 job 에 보관된 좌표를 우선 사용하고, 없으면 앱이 보낸 detections(JSON) 사용
+            staged = []
+            image_file = request.FILES.get('image')
+            detect_job_id = request.data.get('detect_job_id')
+            detections = parse_detections(request.data.get('detections'))
+            with metrics.stage('upload', 'image_write'):
+                if detect_job_id:
+                    job = detect_result_store.get(detect_job_id)
+                    if job is None:
+                        raise FileNotFoundError(f"탐지 결과가 없거나 만료되었습니다: {detect_job_id}")
+                    detections = job[1] or detections
+                    with open(job[0], 'rb') as f:
+                        staged_img = detected_results_store.stage_chunks(
+                            iter(lambda: f.read(CHUNK_SIZE), b''), suffix='.jpg'
+                        )
+                elif image_file is not None:
+                    staged_img = detected_results_store.stage_uploaded_file(
+                        image_file, request.data.get('image_checksum'), suffix='.jpg'
+                    )
+                else:
+                    image_data = request.data.get('image_data')
+                    if image_data and ',' in image_data:
+                        imgstr = image_data.split(',')[1]
+                    else:
+                        imgstr = image_data
+                    with metrics.stage('upload', 'image_base64_decode'):
+                        img_bytes = base64.b64decode(imgstr)
+                    staged_img = detected_results_store.stage_bytes(img_bytes, suffix='.jpg')
+            staged.append(staged_img)
 
-            project = PcbProjects.objects.get(id=project_id)
-            AnalysisMaterials.objects.create(
-                project=project,
-                author_id=author_id,
-                defect_image_url=img_filename,
-                performance_data_url=excel_filename,
-                description=description
-            )
+            # 엑셀/CSV 파일
+            # excel 파일(multipart) / excel_upload_id(이어받기 업로드 완료분) / excel_data(base64) 순서로 확인
+            staged_excel = None
+            claimed_upload_id = None
+            excel_file = request.FILES.get('excel')
+            excel_upload_id = request.data.get('excel_upload_id')
+            excel_data = request.data.get('excel_data')
+            with metrics.stage('upload', 'excel_write'):
+                if excel_file is not None:
+                    staged_excel = performance_data_store.stage_uploaded_file(
+                        excel_file, request.data.get('excel_checksum')
+                    )
+                elif excel_upload_id:
+                    meta = resumable_uploads.get(excel_upload_id)
+                    if meta is None:
+                        raise FileNotFoundError(f"완료되지 않았거나 만료된 업로드입니다: {excel_upload_id}")
+                    # 업로드 세션은 등록 트랜잭션이 커밋된 뒤에 삭제 (실패하면 같은 upload_id 로 다시 시도 가능)
+                    claimed_path = os.path.join(performance_data_store.tmp_dir, f"{excel_upload_id}.{uuid.uuid4().hex}")
+                    os.makedirs(performance_data_store.tmp_dir, exist_ok=True)
+                    resumable_uploads.claim(excel_upload_id, claimed_path, owner_id=author_id)
+                    staged_excel = performance_data_store.stage_file(claimed_path, meta['filename'])
+                    claimed_upload_id = excel_upload_id
+                elif excel_data:
+                    with metrics.stage('upload', 'excel_base64_decode'):
+                        excel_bytes = base64.b64decode(excel_data)
+                    staged_excel = performance_data_store.stage_bytes(excel_bytes, request.data.get('excel_name') or '')
+            if staged_excel is not None:
+                staged.append(staged_excel)
+
+            # 2) 같은 트랜잭션에서 저장소 참조 수 증가 + 분석 결과 등록
+            # 파일은 내용 해시(detected_results/ab/cd/<sha256>.jpg)로 저장되어 같은 파일은 한 번만 보관
+            try:
+                with transaction.atomic():
+                    with metrics.stage('upload', 'db_insert'):
+                        project = PcbProjects.objects.get(id=project_id)
+                        img_filename = detected_results_store.commit(staged_img)
+                        excel_filename = performance_data_store.commit(staged_excel) if staged_excel else ""
+                        material = AnalysisMaterials.objects.create(
+                            project=project,
+                            author_id=author_id,
+                            defect_image_url=img_filename,
+                            performance_data_url=excel_filename,
+                            description=description
+                        )
+                    # 탐지 박스는 행마다 INSERT 하지 않고 bulk insert
+                    with metrics.stage('upload', 'detections_insert'):
+                        save_detections(material, detections)
+                    # 대시보드용 집계(프로젝트/회사, 시간/일, 클래스별)도 같은 트랜잭션에서 누적
+                    with metrics.stage('upload', 'rollup_update'):
+                        update_rollups(material, detections, project.company_id)
+                    # 목록용 썸네일은 커밋 후 백그라운드에서 미리 생성
+                    schedule_thumbnails(img_filename)
+                    # 성능 데이터는 커밋 후 백그라운드에서 Parquet 로 변환
+                    if excel_filename:
+                        schedule_ingest(material, excel_filename)
+                    if claimed_upload_id:
+                        transaction.on_commit(lambda: resumable_uploads.discard(claimed_upload_id))
+            finally:
+                for blob in staged:
+                    blob.discard()
             
+            metrics.count_request('upload', 'success')
             return Response({"status": "success"})
+        except (ChecksumMismatch, FileNotFoundError, PermissionError, ValueError, KeyError) as e:
+            metrics.count_request('upload', 'fail')
+            return Response({"status": "fail", "message": str(e)}, status=400)
         except Exception as e:
             traceback.print_exc()
+            metrics.count_request('upload', 'error')
             return Response({"status": "error", "message": str(e)}, status=500)
 
+# 큰 성능 데이터 파일 이어받기 업로드
+# 1) POST /uploads/ {filename, size, checksum} -> upload_id
+# 2) PATCH /uploads/<id>/ (Upload-Offset 헤더 + 본문에 파일 바이트) 를 반복, 끊기면 GET 으로 offset 확인 후 이어서 전송
+# 3) 완료되면 /upload-result/ 에 excel_upload_id 로 전달
+class ResumableUploadView(APIView):
+    def post(self, request):
+        user_id = request.session.get('user_id')
+        if not user_id:
+            return Response({"status": "fail", "message": "로그인이 필요합니다."}, status=401)
+        try:
+            meta = resumable_uploads.create(
+                request.data.get('filename', ''),
+                request.data.get('size', 0),
+                checksum=request.data.get('checksum'),
+                owner_id=user_id,
+            )
+        except (TypeError, ValueError) as e:
+            return Response({"status": "fail", "message": str(e)}, status=400)
+        return Response({"status": "success", "data": meta}, status=201)
+
+
+class ResumableUploadDetailView(APIView):
+    def _get_meta(self, request, upload_id):
+        meta = resumable_uploads.get(upload_id)
+        if meta is None or meta['owner_id'] != request.session.get('user_id'):
+            raise Http404("업로드가 없거나 만료되었습니다.")
+        return meta
+
+    def get(self, request, upload_id):
+        meta = self._get_meta(request, upload_id)
+        return Response({"status": "success", "data": meta}, headers={"Upload-Offset": str(meta['offset'])})
+
+    # 본문은 파싱하지 않고 요청 스트림에서 바로 읽어서 .part 파일 뒤에 이어 씀
+    def patch(self, request, upload_id):
+        self._get_meta(request, upload_id)
+        offset = request.headers.get('Upload-Offset')
+        if offset is None or not offset.isdigit():
+            return Response({"status": "fail", "message": "Upload-Offset 헤더가 필요합니다."}, status=400)
+        try:
+            with metrics.stage('resumable_upload', 'chunk_write'):
+                meta = resumable_uploads.append(upload_id, int(offset), request.stream or io.BytesIO())
+        except OffsetMismatch as e:
+            return Response({"status": "fail", "message": str(e), "offset": e.offset}, status=409,
+                            headers={"Upload-Offset": str(e.offset)})
+        except ChecksumMismatch as e:
+            return Response({"status": "fail", "message": str(e)}, status=400)
+        return Response({"status": "success", "data": meta}, headers={"Upload-Offset": str(meta['offset'])})
+
+    def delete(self, request, upload_id):
+        self._get_meta(request, upload_id)
+        resumable_uploads.discard(upload_id)
+        return Response({"status": "success"})
+
 # 분석 결과 목록 조회 
-# 일단 파일명을 URL로 변환하게 구현은 해놨는데 문제생기면 나중에 손 볼 예정
+# (created_at, id) 기준 keyset 페이지네이션 - 몇 번째 페이지든 인덱스(idx_material_project_created)에서 limit 건만 읽음
+# 다음 페이지는 응답의 next_cursor 를 cursor 로 전달, 페이지 내용이 같으면 ETag/Last-Modified 로 304 응답
+MATERIAL_PAGE_SIZE = 20
+MATERIAL_PAGE_MAX = 100
+MATERIAL_FIELDS = ('id', 'defect_image_url', 'performance_data_url', 'description', 'created_at')
+
+
 class AnalysisMaterialListView(APIView):
     def get(self, request):
         try:
             project_id = request.query_params.get('project_id')
-            materials = AnalysisMaterials.objects.filter(project_id=project_id).order_by('-created_at')
-            base_url = request.build_absolute_uri('/')[:-1] 
-            
+            if not project_id:
+                return Response({"status": "fail", "message": "project_id가 없습니다."}, status=400)
+            try:
+                limit = min(max(int(request.query_params.get('limit') or MATERIAL_PAGE_SIZE), 1), MATERIAL_PAGE_MAX)
+                cursor = request.query_params.get('cursor')
+                after = decode_keyset_cursor(cursor) if cursor else None
+            except ValueError as e:
+                return Response({"status": "fail", "message": str(e)}, status=400)
+
+            materials = AnalysisMaterials.objects.filter(project_id=project_id)
+            if after is not None:
+                created_at, material_id = after
+                materials = materials.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=material_id)
+                )
+            # 한 건 더 읽어서 다음 페이지 유무 확인
+            rows = list(materials.order_by('-created_at', '-id').values(*MATERIAL_FIELDS)[:limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            next_cursor = encode_keyset_cursor(rows[-1]['created_at'], rows[-1]['id']) if has_more else None
+
+            # 페이지 내용(행 + 다음 cursor)으로 ETag, 가장 최근 created_at 으로 Last-Modified
+            etag_source = json.dumps([[r[f] for f in MATERIAL_FIELDS] for r in rows] + [next_cursor], default=str)
+            etag = quote_etag(hashlib.md5(etag_source.encode('utf-8')).hexdigest())
+            last_modified = int(rows[0]['created_at'].timestamp()) if rows else None
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if not_modified is not None:
+                not_modified['ETag'] = etag
+                return not_modified
+
+            # 미디어 URL 접두사는 요청마다 한 번만 만듦
+            # 내용 해시 저장소 이름(ab/cd/<sha256>.jpg)과 예전 파일명 모두 그대로 URL 로 사용
+            base_url = request.build_absolute_uri('/')[:-1]
+            image_prefix = f"{base_url}{settings.MEDIA_URL}detected_results/"
+            excel_prefix = f"{base_url}{settings.MEDIA_URL}performance_data/"
+            # 썸네일/타일 URL 접두사 (.../analysis-materials/) 도 한 번만 만듦
+            material_prefix = request.build_absolute_uri(reverse('analysis_materials_list'))
             result_data = []
-            for m in materials:
-                img_name = os.path.basename(m.defect_image_url) if m.defect_image_url else ""
-                defect_full_url = f"{base_url}{settings.MEDIA_URL}detected_results/{img_name}" if img_name else ""
-                excel_name = os.path.basename(m.performance_data_url) if m.performance_data_url else ""
-                performance_full_url = f"{base_url}{settings.MEDIA_URL}performance_data/{excel_name}" if excel_name else ""
-                
+            for m in rows:
+                img_name = m['defect_image_url'] if detected_results_store.path(m['defect_image_url']) else ""
+                excel_name = m['performance_data_url'] if performance_data_store.path(m['performance_data_url']) else ""
                 result_data.append({
-                    "id": m.id,
-                    "defect_image_url": defect_full_url,
-                    "performance_data_url": performance_full_url,
-                    "description": m.description,
-                    "created_at": m.created_at.isoformat()
+                    "id": m['id'],
+                    "defect_image_url": f"{image_prefix}{img_name}" if img_name else "",
+                    "thumbnail_urls": {
+                        size: f"{material_prefix}{m['id']}/thumbnail/{size}/" for size in THUMBNAIL_SIZES
+                    } if img_name else {},
+                    "tiles_url": f"{material_prefix}{m['id']}/tiles/" if img_name else "",
+                    "performance_data_url": f"{excel_prefix}{excel_name}" if excel_name else "",
+                    "description": m['description'],
+                    "created_at": m['created_at'].isoformat()
                 })
-            return Response({"status": "success", "data": result_data})
+            response = Response({"status": "success", "data": result_data, "next_cursor": next_cursor})
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            response['Cache-Control'] = 'private, no-cache'
+            return response
         except Exception as e:
             traceback.print_exc()
             return Response({"status": "error", "message": str(e)}, status=500)
 
+# 조회 파라미터의 날짜/시각 (2026-01-31 또는 ISO 8601, 시간대가 없으면 서버 시간대)
+def parse_query_datetime(value):
+    dt = parse_datetime(value)
+    if dt is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f"날짜 형식이 올바르지 않습니다: {value}")
+        dt = datetime.datetime.combine(date, datetime.time.min)
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+# 결함 통계 대시보드 api
+# 업로드 때마다 누적해 둔 defect_rollups 만 읽으므로 분석 결과가 많아져도 조회 시간이 일정함
+# project_id 가 없으면 회사 전체, class_name 이 없으면 클래스 구분 없는 합계 + 클래스별 합계
+class DefectRollupView(APIView):
+    def get(self, request):
+        company_id = request.session.get('company_id')
+        if not company_id:
+            return Response({"status": "fail", "message": "세션 만료"}, status=401)
+
+        granularity = request.query_params.get('granularity') or 'day'
+        if granularity not in ROLLUP_GRANULARITIES:
+            return Response(
+                {"status": "fail", "message": f"지원하지 않는 단위입니다. ({', '.join(ROLLUP_GRANULARITIES)})"},
+                status=400,
+            )
+        try:
+            since = request.query_params.get('since')
+            until = request.query_params.get('until')
+            since = parse_query_datetime(since) if since else None
+            until = parse_query_datetime(until) if until else None
+        except ValueError as e:
+            return Response({"status": "fail", "message": str(e)}, status=400)
+
+        project_id = request.query_params.get('project_id')
+        rollups = DefectRollup.objects.filter(company_id=company_id, granularity=granularity)
+        if project_id:
+            rollups = rollups.filter(project_id=project_id)
+        else:
+            rollups = rollups.filter(project__isnull=True)
+        class_name = request.query_params.get('class_name')
+        if class_name:
+            rollups = rollups.filter(class_name__in=['', class_name])
+        if since:
+            rollups = rollups.filter(bucket_start__gte=since)
+        if until:
+            rollups = rollups.filter(bucket_start__lt=until)
+
+        series, classes = {}, {}
+        totals = {"material_count": 0, "defective_count": 0, "detection_count": 0, "confidence_sum": 0.0}
+        for r in rollups.order_by('bucket_start', 'class_name').values(
+            'bucket_start', 'class_name', 'detection_count', 'confidence_sum', 'material_count', 'defective_count'
+        ):
+            key = timezone.localtime(r['bucket_start']).isoformat()
+            bucket = series.setdefault(key, {"bucket_start": key, "classes": {}})
+            mean_conf = round(r['confidence_sum'] / r['detection_count'], 4) if r['detection_count'] else None
+            if r['class_name'] == '':
+                bucket.update({
+                    "material_count": r['material_count'],
+                    "defective_count": r['defective_count'],
+                    "defect_rate": round(r['defective_count'] / r['material_count'], 4) if r['material_count'] else 0.0,
+                    "detection_count": r['detection_count'],
+                    "mean_confidence": mean_conf,
+                })
+                for k in totals:
+                    totals[k] += r[k]
+            else:
+                bucket["classes"][r['class_name']] = {
+                    "detection_count": r['detection_count'],
+                    "mean_confidence": mean_conf,
+                    "material_count": r['material_count'],
+                }
+                count, conf_sum = classes.get(r['class_name'], (0, 0.0))
+                classes[r['class_name']] = (count + r['detection_count'], conf_sum + r['confidence_sum'])
+
+        confidence_sum = totals.pop('confidence_sum')
+        totals["defect_rate"] = round(totals['defective_count'] / totals['material_count'], 4) if totals['material_count'] else 0.0
+        totals["mean_confidence"] = round(confidence_sum / totals['detection_count'], 4) if totals['detection_count'] else None
+        totals["classes"] = {
+            name: {"detection_count": count, "mean_confidence": round(conf_sum / count, 4) if count else None}
+            for name, (count, conf_sum) in classes.items()
+        }
+        return Response({
+            "status": "success",
+            "granularity": granularity,
+            "series": list(series.values()),
+            "totals": totals,
+        })
+
 # 엑셀 다운로드 api
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
 class DownloadPerformanceDataView(APIView):
     def get(self, request):
         material_id = request.query_params.get('material_id')
@@ -269,16 +905,16 @@ class DownloadPerformanceDataView(APIView):
             
         try:
             material = AnalysisMaterials.objects.get(id=material_id)
-            file_name = os.path.basename(material.performance_data_url) 
-            file_path = os.path.join(settings.MEDIA_ROOT, 'performance_data', file_name)
+            file_path = performance_data_store.path(material.performance_data_url)
+            # 다운로드 파일명은 업로드 당시 원래 이름
+            file_name = performance_data_store.original_name(material.performance_data_url)
             
-            if os.path.exists(file_path):
-                file_handle = open(file_path, 'rb')
-                response = FileResponse(file_handle, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-                
-                encoded_filename = smart_str(file_name)
-                response['Content-Disposition'] = f'attachment; filename="{encoded_filename}"'
-                return response
+            if file_path and os.path.exists(file_path):
+                # Range 이어받기 / ETag 조건부 요청 / DOWNLOAD_SENDFILE 설정 시 앞단 웹 서버 전송
+                return file_download_response(
+                    request, performance_data_store.kind, material.performance_data_url, file_path, file_name,
+                    content_type=mimetypes.guess_type(file_name)[0] or XLSX_CONTENT_TYPE,
+                )
             else:
                 return Response({"status": "error", "message": "서버에 파일이 존재하지 않습니다."}, status=404)
         except AnalysisMaterials.DoesNotExist:
@@ -340,6 +976,10 @@ class UserUpdateView(APIView):
         except Users.DoesNotExist:
             return Response({"error": "사용자 없음"}, status=404)
 
+PROJECT_PAGE_SIZE = 30
+PROJECT_PAGE_MAX = 100
+
+
 class ProjectView(APIView):
     def post(self, request):
         company_id = request.session.get('company_id')
@@ -353,33 +993,64 @@ class ProjectView(APIView):
             status='PENDING', 
             created_at=timezone.now()
         )
+        project_cache.invalidate(company_id)
         return Response({"status": "success"}, status=201)
 
+    # 프로젝트 목록 (최신순, limit 건씩 keyset 페이지네이션 + status 필터)
+    # 같은 조건의 페이지는 회사별 캐시에서 바로 응답 (생성/삭제/상태 변경 시 무효화)
     def get(self, request):
         company_id = request.session.get('company_id')
         if not company_id:
             return Response({"status": "fail", "message": "세션 만료"}, status=401)
-        
-        projects = PcbProjects.objects.filter(company_id=company_id).order_by('-created_at')
-        project_list = []
-        current_tz = pytz.timezone(settings.TIME_ZONE)
 
-        for p in projects:
-            dt = p.created_at
+        statuses = [v for v in (request.query_params.get('status') or '').upper().split(',') if v]
+        valid_statuses = {code for code, _ in PcbProjects.STATUS_CHOICES}
+        if any(v not in valid_statuses for v in statuses):
+            return Response(
+                {"status": "fail", "message": f"지원하지 않는 상태입니다. ({', '.join(sorted(valid_statuses))})"},
+                status=400,
+            )
+        cursor = request.query_params.get('cursor')
+        try:
+            limit = min(max(int(request.query_params.get('limit') or PROJECT_PAGE_SIZE), 1), PROJECT_PAGE_MAX)
+            after = decode_keyset_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return Response({"status": "fail", "message": str(e)}, status=400)
 
-            if timezone.is_naive(dt):
-                dt = timezone.make_aware(dt, current_tz)
-            
-            local_time = timezone.localtime(dt)
-            
-            project_list.append({
-                "id": p.id,
-                "model_name": p.model_name,
-                "status": p.status,
-                "created_at": local_time.isoformat()
-            })
-            
-        return Response({"status": "success", "data": project_list}, status=200)
+        cache_key = project_cache.page_key(company_id, ','.join(sorted(statuses)), cursor, limit)
+        page = project_cache.get_page(cache_key)
+        if page is None:
+            projects = PcbProjects.objects.filter(company_id=company_id)
+            if statuses:
+                projects = projects.filter(status__in=statuses)
+            if after is not None:
+                created_at, project_id = after
+                projects = projects.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=project_id))
+            rows = list(projects.order_by('-created_at', '-id')
+                        .values('id', 'model_name', 'status', 'created_at')[:limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+            # 시간대 객체는 한 번만 만들고, DB 값(시간대 없는 서버 현지 시각)에 붙이기만 함
+            local_tz = zoneinfo.ZoneInfo(settings.TIME_ZONE)
+            page = {
+                "data": [{
+                    "id": p['id'],
+                    "model_name": p['model_name'],
+                    "status": p['status'],
+                    "created_at": (p['created_at'].replace(tzinfo=local_tz) if timezone.is_naive(p['created_at'])
+                                   else p['created_at'].astimezone(local_tz)).isoformat()
+                } for p in rows],
+                # pcb_projects.created_at 은 시간대 없는 컬럼이라 cursor 에는 DB 값 그대로(UTC 표기)를 넣어 비교
+                "next_cursor": encode_keyset_cursor(
+                    rows[-1]['created_at'] if timezone.is_aware(rows[-1]['created_at'])
+                    else rows[-1]['created_at'].replace(tzinfo=datetime.timezone.utc),
+                    rows[-1]['id'],
+                ) if has_more else None,
+            }
+            project_cache.put_page(cache_key, page)
+
+        return Response({"status": "success", **page}, status=200)
 
     # 프로젝트 삭제 api
     def delete(self, request):
@@ -410,7 +1081,14 @@ class ProjectView(APIView):
 
         try:
             project = PcbProjects.objects.get(id=project_id)
-            project.delete()
+            # 분석 결과는 CASCADE 로 같이 삭제되므로 참조하던 파일 목록을 먼저 확보하고 삭제 후 참조 해제
+            with transaction.atomic():
+                materials = list(AnalysisMaterials.objects.filter(project_id=project.id)
+                                 .values_list('defect_image_url', 'performance_data_url'))
+                remove_project_rollups([project.id])
+                project.delete()
+                release_materials(materials)
+                project_cache.invalidate(project.company_id)
             return Response({"status": "success", "message": "프로젝트가 삭제되었습니다."})
         except PcbProjects.DoesNotExist:
             return Response({"error": f"ID {project_id} 프로젝트를 찾을 수 없습니다."}, status=404)
@@ -434,6 +1112,270 @@ class ProjectStatusUpdateView(APIView):
             project = PcbProjects.objects.get(id=project_id)
             project.status = new_status
             project.save()
+            project_cache.invalidate(project.company_id)
             return Response({"status": "success", "new_status": project.status})
         except PcbProjects.DoesNotExist:
-            return Response({"error": "프로젝트를 찾을 수 없습니다."}, status=404)
\ No newline at end of file
+            return Response({"error": "프로젝트를 찾을 수 없습니다."}, status=404)
+
+
+# 여러 프로젝트 일괄 처리 공통
+# 권한은 요청마다 한 번만 확인하고, 세션 회사의 프로젝트만 대상으로 함
+BULK_PROJECT_MAX = 500
+BULK_DELETE_BATCH = 100
+
+
+def bulk_project_request(request):
+    session_role = request.session.get('user_role') or request.session.get('role')
+    final_role = session_role or request.data.get('user_role')
+    if final_role not in ['DIRECTOR', 'MANAGER']:
+        return None, None, Response({"error": f"권한이 없습니다. (확인된 권한: {final_role})"}, status=403)
+    company_id = request.session.get('company_id')
+    if not company_id:
+        return None, None, Response({"status": "fail", "message": "세션 만료"}, status=401)
+    try:
+        project_ids = list(dict.fromkeys(int(v) for v in request.data.get('project_ids') or []))
+    except (TypeError, ValueError):
+        return None, None, Response({"status": "fail", "message": "project_ids 는 숫자 목록이어야 합니다."}, status=400)
+    if not project_ids or len(project_ids) > BULK_PROJECT_MAX:
+        return None, None, Response(
+            {"status": "fail", "message": f"project_ids 는 1 ~ {BULK_PROJECT_MAX}개여야 합니다."}, status=400
+        )
+    return company_id, project_ids, None
+
+
+# 프로젝트 상태 일괄 변경 api
+# {"project_ids": [...], "status": "ACCEPTED"} -> 바뀌는 프로젝트만 한 번의 UPDATE
+class ProjectBulkStatusView(APIView):
+    def post(self, request):
+        company_id, project_ids, error = bulk_project_request(request)
+        if error is not None:
+            return error
+        new_status = request.data.get('status')
+        if new_status not in {code for code, _ in PcbProjects.STATUS_CHOICES}:
+            return Response({"status": "fail", "message": f"지원하지 않는 상태입니다: {new_status}"}, status=400)
+
+        with transaction.atomic():
+            current = dict(PcbProjects.objects.select_for_update()
+                           .filter(company_id=company_id, id__in=project_ids).values_list('id', 'status'))
+            changed = [pid for pid, old in current.items() if old != new_status]
+            if changed:
+                PcbProjects.objects.filter(id__in=changed).update(status=new_status)
+        if changed:
+            project_cache.invalidate(company_id)
+
+        results = []
+        for pid in project_ids:
+            if pid not in current:
+                results.append({"project_id": pid, "result": "not_found"})
+            else:
+                results.append({"project_id": pid, "result": "updated" if pid in changed else "unchanged",
+                                "old_status": current[pid]})
+        return Response({
+            "status": "success",
+            "new_status": new_status,
+            "updated": len(changed),
+            "results": results,
+        })
+
+
+# 프로젝트 일괄 삭제 api
+# {"project_ids": [...]} -> BULK_DELETE_BATCH 개씩 한 트랜잭션에서 DELETE 한 번 (하위 데이터는 DB 의 ON DELETE CASCADE)
+# 참조하던 미디어 파일 정리는 커밋 후 백그라운드에서 처리
+class ProjectBulkDeleteView(APIView):
+    def post(self, request):
+        company_id, project_ids, error = bulk_project_request(request)
+        if error is not None:
+            return error
+
+        results = {}
+        for i in range(0, len(project_ids), BULK_DELETE_BATCH):
+            batch = project_ids[i:i + BULK_DELETE_BATCH]
+            try:
+                with transaction.atomic():
+                    found = list(PcbProjects.objects.select_for_update()
+                                 .filter(company_id=company_id, id__in=batch).values_list('id', flat=True))
+                    materials = list(AnalysisMaterials.objects.filter(project_id__in=found)
+                                     .values_list('defect_image_url', 'performance_data_url'))
+                    remove_project_rollups(found)
+                    # 하위 데이터는 FK 의 ON DELETE CASCADE 로 함께 삭제 (Django collector 를 거치지 않음)
+                    with connection.cursor() as cursor:
+                        cursor.execute("DELETE FROM pcb_projects WHERE company_id = %s AND id = ANY(%s)",
+                                       [company_id, found])
+                    release_materials_async(materials)
+                for pid in batch:
+                    results[pid] = "deleted" if pid in found else "not_found"
+            except Exception as e:
+                traceback.print_exc()
+                for pid in batch:
+                    results[pid] = f"error: {e}"
+        project_cache.invalidate(company_id)
+
+        deleted = sum(1 for r in results.values() if r == "deleted")
+        failed = any(r.startswith("error") for r in results.values())
+        return Response({
+            "status": "partial" if failed else "success",
+            "deleted": deleted,
+            "results": [{"project_id": pid, "result": results[pid]} for pid in project_ids],
+        })
+
+
+# 성능 데이터 스키마 목록 api
+# 프로젝트의 변환된 업로드들을 컬럼 구성(스키마)별로 묶어서 반환 -> 앱은 같은 스키마끼리 조회
+class PerformanceSchemaView(APIView):
+    def get(self, request):
+        company_id = request.session.get('company_id')
+        if not company_id:
+            return Response({"status": "fail", "message": "세션 만료"}, status=401)
+        project_id = request.query_params.get('project_id')
+        if not project_id:
+            return Response({"status": "fail", "message": "project_id가 없습니다."}, status=400)
+
+        datasets = PerformanceDataset.objects.filter(project_id=project_id, project__company_id=company_id)
+        counts = {}
+        for row in datasets.values('schema_id', 'status'):
+            key = row['schema_id']
+            counts.setdefault(key, {"READY": 0, "PENDING": 0, "FAILED": 0})[row['status']] += 1
+        schemas = PerformanceSchema.objects.filter(id__in=[k for k in counts if k is not None]).order_by('id')
+        return Response({
+            "status": "success",
+            "schemas": [{
+                "schema_id": schema.id,
+                "columns": schema.columns,
+                "dataset_count": counts[schema.id]["READY"],
+            } for schema in schemas],
+            "pending": sum(c["PENDING"] for c in counts.values()),
+            "failed": sum(c["FAILED"] for c in counts.values()),
+        })
+
+
+# 성능 데이터 조회 api (엑셀을 다시 열지 않고 변환된 Parquet 만 읽음)
+# {"project_id": 1, "schema_id": 3, "material_ids": [...], "columns": [...],
+#  "filters": [{"column": "voltage", "op": "gt", "value": 3.3}],
+#  "group_by": ["material_id"], "aggregations": {"voltage": ["mean", "max"]}, "limit": 1000}
+class PerformanceQueryView(APIView):
+    def post(self, request):
+        company_id = request.session.get('company_id')
+        if not company_id:
+            return Response({"status": "fail", "message": "세션 만료"}, status=401)
+        if not isinstance(request.data, dict):
+            return Response({"status": "fail", "message": "요청 본문은 JSON 객체여야 합니다."}, status=400)
+        if not request.data.get('project_id'):
+            return Response({"status": "fail", "message": "project_id가 없습니다."}, status=400)
+        try:
+            project_id = int(request.data.get('project_id'))
+            schema_id = int(request.data['schema_id']) if request.data.get('schema_id') else None
+            material_ids = request.data.get('material_ids') or []
+            if not isinstance(material_ids, list):
+                raise ValueError
+            material_ids = [int(v) for v in material_ids]
+        except (TypeError, ValueError):
+            return Response({"status": "fail", "message": "project_id/schema_id 는 숫자, material_ids 는 숫자 목록이어야 합니다."}, status=400)
+        # 조회 조건 형식은 Parquet 를 열기 전에 확인 (filters/aggregations 형식 오류는 400)
+        try:
+            validate_query(request.data)
+        except (TypeError, ValueError) as e:
+            return Response({"status": "fail", "message": f"조회 조건이 올바르지 않습니다: {e}"}, status=400)
+
+        datasets = PerformanceDataset.objects.filter(
+            project_id=project_id, project__company_id=company_id, status='READY'
+        )
+        if schema_id is not None:
+            datasets = datasets.filter(schema_id=schema_id)
+        if material_ids:
+            datasets = datasets.filter(material_id__in=material_ids)
+        datasets = list(datasets.order_by('material_id').values_list('material_id', 'parquet_name'))
+
+        try:
+            started = time.perf_counter()
+            columns, rows = run_query(datasets, request.data)
+            query_ms = round((time.perf_counter() - started) * 1000, 2)
+        except ImportError as e:
+            return Response({"status": "error", "message": f"polars 가 설치되지 않았습니다: {e}"}, status=503)
+        except ValueError as e:
+            return Response({"status": "fail", "message": str(e)}, status=400)
+        except Exception as e:
+            # 없는 컬럼 이름 등 polars 쿼리 오류
+            traceback.print_exc()
+            return Response({"status": "fail", "message": str(e)}, status=400)
+        return Response({
+            "status": "success",
+            "dataset_count": len(datasets),
+            "columns": columns,
+            "rows": rows,
+            "query_ms": query_ms,
+        })
+
+
+# 탐지 결과 이미지 파생 파일 api (썸네일 / 타일 피라미드)
+# 처음 요청될 때 만들어서 디스크에 두고, 이후에는 파일 그대로 응답
+# 로그인한 회사의 분석 결과만 조회 가능 - URL 이 분석 결과 id 라서 공유 캐시(프록시/CDN)에는 남기지 않고
+# 브라우저/앱 캐시에만 오래 둠 (원본 내용이 바뀌지 않음)
+DERIVED_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+
+def material_image_name(material_id, company_id):
+    name = (AnalysisMaterials.objects.filter(id=material_id, project__company_id=company_id)
+            .values_list('defect_image_url', flat=True).first())
+    return name if name and detected_results_store.path(name) else None
+
+
+def derived_response(request, path, filename):
+    rel = os.path.relpath(path, os.path.join(settings.MEDIA_ROOT, 'derived'))
+    response = file_download_response(request, 'derived', rel, path, filename, content_type='image/jpeg')
+    response['Content-Disposition'] = 'inline'
+    response['Cache-Control'] = DERIVED_CACHE_CONTROL
+    return response
+
+
+class MaterialThumbnailView(APIView):
+    def get(self, request, material_id, size):
+        company_id = request.session.get('company_id')
+        if not company_id:
+            return Response({"status": "fail", "message": "세션 만료"}, status=401)
+        name = material_image_name(material_id, company_id)
+        if name is None:
+            return Response({"status": "error", "message": "이미지를 찾을 수 없습니다."}, status=404)
+        try:
+            path = derivatives.thumbnail(name, size)
+        except ValueError as e:
+            return Response({"status": "fail", "message": str(e)}, status=400)
+        except FileNotFoundError as e:
+            return Response({"status": "error", "message": str(e)}, status=404)
+        return derived_response(request, path, f"{material_id}_{size}.jpg")
+
+
+# 타일 정보 - 앱은 확대 배율에 맞는 level 을 고르고 화면에 보이는 (x, y) 타일만 요청
+class MaterialTileInfoView(APIView):
+    def get(self, request, material_id):
+        company_id = request.session.get('company_id')
+        if not company_id:
+            return Response({"status": "fail", "message": "세션 만료"}, status=401)
+        name = material_image_name(material_id, company_id)
+        if name is None:
+            return Response({"status": "error", "message": "이미지를 찾을 수 없습니다."}, status=404)
+        try:
+            info = derivatives.pyramid(name)
+        except (FileNotFoundError, ValueError) as e:
+            return Response({"status": "error", "message": str(e)}, status=404)
+        tiles_url = request.build_absolute_uri(reverse('material_tiles_info', args=[material_id]))
+        info["tile_url"] = tiles_url + '{level}/{x}_{y}.jpg'
+        response = Response({"status": "success", **info})
+        response['Cache-Control'] = DERIVED_CACHE_CONTROL
+        return response
+
+
+class MaterialTileView(APIView):
+    def get(self, request, material_id, level, x, y):
+        company_id = request.session.get('company_id')
+        if not company_id:
+            return Response({"status": "fail", "message": "세션 만료"}, status=401)
+        name = material_image_name(material_id, company_id)
+        if name is None:
+            return Response({"status": "error", "message": "이미지를 찾을 수 없습니다."}, status=404)
+        try:
+            path = derivatives.tile(name, level, x, y)
+        except (FileNotFoundError, ValueError) as e:
+            return Response({"status": "error", "message": str(e)}, status=404)
+        if path is None:
+            return Response({"status": "fail", "message": "타일 범위를 벗어났습니다."}, status=404)
+        return derived_response(request, path, f"{material_id}_{level}_{x}_{y}.jpg")
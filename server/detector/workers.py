@@ -0,0 +1,326 @@
+import os
+import time
+import queue
+import itertools
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from .inference import prepare_model, resolve_backend, BatchScheduler
+
+
+def _split_cores(num_workers):
+    if hasattr(os, 'sched_getaffinity'):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    # 코어를 연속된 구간으로 나눠서 워커마다 배정 (코어 수보다 워커가 많으면 겹쳐서 배정)
+    if len(cores) < num_workers:
+        return [[cores[i % len(cores)]] for i in range(num_workers)]
+    return [chunk.tolist() for chunk in np.array_split(np.array(cores), num_workers)]
+
+
+def _attach_shared_memory(name):
+    # 워커 쪽에서는 붙기만 하고 해제(unlink)는 메인 프로세스가 담당
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python 3.12 이하
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def _try_close(shm):
+    try:
+        shm.close()
+        return True
+    except BufferError:  # 아직 추론 중인 배열이 버퍼를 참조하고 있음
+        return False
+
+
+def _send_result(result_queue, worker_id, job_id, future):
+    try:
+        result_queue.put(('done', job_id, worker_id, future.result()))
+    except Exception as e:
+        result_queue.put(('error', job_id, worker_id, str(e)))
+
+
+# 추론 워커 프로세스 진입점
+# 할당된 코어에 고정하고 자체 모델 + BatchScheduler 를 가짐
+def _worker_main(worker_id, cores, num_threads, task_queue, result_queue, backend, scheduler_options):
+    import torch
+
+    if cores and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    torch.set_num_threads(num_threads or max(1, len(cores)))
+
+    # 백엔드는 풀이 워커를 띄우기 전에 이미 결정해서 넘겨줌 (export/pt 비교 없이 로드만)
+    try:
+        model, report = prepare_model(backend, validate=False)
+    except Exception as e:
+        result_queue.put(('failed', worker_id, str(e)))
+        return
+    result_queue.put(('ready', worker_id, report))
+
+    scheduler = BatchScheduler(model, **scheduler_options)
+    attached = []
+    while True:
+        try:
+            task = task_queue.get(timeout=1.0)
+        except queue.Empty:
+            task = False
+        attached = [shm for shm in attached if not _try_close(shm)]
+
+        if task is None:  # 종료 신호
+            break
+        if task is False:
+            continue
+
+        job_id, shm_name, shape, tiled = task
+        # 어느 워커가 가져갔는지 알림 (워커가 죽으면 그 워커가 맡은 요청만 실패 처리)
+        result_queue.put(('taken', job_id, worker_id))
+        shm = _attach_shared_memory(shm_name)
+        attached.append(shm)
+        image = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        future = scheduler.submit(image, tiled)
+        future.add_done_callback(partial(_send_result, result_queue, worker_id, job_id))
+        del image
+
+
+# 멀티 프로세스 추론 워커 풀
+# 디코딩된 이미지를 공유 메모리에 바로 RGB 로 기록하고 이름만 큐로 넘김 (픽셀 데이터는 pickle 하지 않음)
+class InferenceWorkerPool:
+    STATS_WINDOW = 1000
+
+    def __init__(self, num_workers, threads_per_worker=0, backend='pt', validate=True, timeout=None,
+                 **scheduler_options):
+        self.num_workers = max(1, int(num_workers))
+        self.threads_per_worker = int(threads_per_worker)
+        self.backend = backend
+        self.validate = validate
+        self.backend_report = None
+        # 이 시간(초)이 지나도 결과가 없는 요청은 실패 처리하고 공유 메모리 해제 (None 이면 무제한)
+        self.timeout = timeout
+        # 워커 안의 BatchScheduler 에 그대로 전달 (max_batch_size, max_wait_ms, tile_size ...)
+        self.scheduler_options = scheduler_options
+
+        self._ctx = multiprocessing.get_context('spawn')
+        self._task_queue = None
+        self._result_queue = None
+        self._processes = []
+        self._cores = []
+        self._closing = False
+        self._collector = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._taken = {}  # job_id -> 가져간 worker_id
+
+        self._ready = {}
+        self._failed = {}
+        self._total_done = 0
+        self._total_errors = 0
+        self._restarts = 0
+        self._latency_ms = deque(maxlen=self.STATS_WINDOW)
+        self._batch_sizes = {}
+
+    # 워커 프로세스를 미리 띄움 (호출하지 않으면 첫 submit 때 시작)
+    def start(self):
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self._processes:
+            return
+        with self._lock:
+            if self._processes:
+                return
+            # 설정된 백엔드 export/검증은 별도 프로세스에서 한 번만 (웹 프로세스에는 torch 를 올리지 않음)
+            # pt 와 결과가 다르면 모든 워커가 pt 로 서비스
+            with ProcessPoolExecutor(max_workers=1, mp_context=self._ctx) as executor:
+                self.backend_report = executor.submit(resolve_backend, self.backend, self.validate).result()
+            self.backend = self.backend_report["backend"]
+            self._task_queue = self._ctx.Queue()
+            self._result_queue = self._ctx.Queue()
+            self._cores = _split_cores(self.num_workers)
+            self._processes = [self._spawn(worker_id) for worker_id in range(self.num_workers)]
+            self._collector = threading.Thread(target=self._collect_results, name='detect-pool-collector', daemon=True)
+            self._collector.start()
+
+    def _spawn(self, worker_id):
+        p = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self._cores[worker_id], self.threads_per_worker, self._task_queue, self._result_queue,
+                  self.backend, self.scheduler_options),
+            name=f'detect-worker-{worker_id}',
+            daemon=True,
+        )
+        p.start()
+        return p
+
+    def submit(self, img_bgr, tiled=False):
+        self._ensure_started()
+        if len(self._failed) == self.num_workers:
+            raise RuntimeError("모든 추론 워커가 모델 로드에 실패했습니다.")
+
+        started = time.perf_counter()
+        shm = shared_memory.SharedMemory(create=True, size=img_bgr.nbytes)
+        view = np.ndarray(img_bgr.shape, dtype=np.uint8, buffer=shm.buf)
+        cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB, dst=view)
+        del view
+        color_ms = (time.perf_counter() - started) * 1000
+
+        job_id = next(self._ids)
+        future = Future()
+        with self._lock:
+            self._pending[job_id] = (future, shm, started, color_ms)
+        self._task_queue.put((job_id, shm.name, img_bgr.shape, tiled))
+        return future
+
+    def detect(self, img_bgr, tiled=False, timeout=None):
+        return self.submit(img_bgr, tiled).result(timeout=timeout)
+
+    def _release(self, shm):
+        shm.close()
+        shm.unlink()
+
+    # 결과 수집 스레드 - 1초마다 워커 생존 확인과 시간 초과 요청 정리도 함께
+    def _collect_results(self):
+        last_check = time.monotonic()
+        while True:
+            try:
+                msg = self._result_queue.get(timeout=1.0)
+            except queue.Empty:
+                msg = None
+            if time.monotonic() - last_check >= 1.0:
+                last_check = time.monotonic()
+                self._check_workers()
+                self._expire_pending()
+            if msg is None:
+                continue
+            kind = msg[0]
+
+            if kind == 'taken':
+                with self._lock:
+                    if msg[1] in self._pending:
+                        self._taken[msg[1]] = msg[2]
+                continue
+            if kind == 'ready':
+                self._ready[msg[1]] = msg[2]
+                print(f"✅ 추론 워커 {msg[1]} 준비 완료 ({msg[2]['backend']}, 로드 {msg[2]['load_ms']}ms)")
+                continue
+            if kind == 'failed':
+                self._failed[msg[1]] = msg[2]
+                print(f"❌ 추론 워커 {msg[1]} 모델 로드 실패: {msg[2]}")
+                if len(self._failed) == self.num_workers:
+                    self._fail_pending(RuntimeError(msg[2]))
+                continue
+
+            _, job_id, worker_id, payload = msg
+            with self._lock:
+                entry = self._pending.pop(job_id, None)
+                self._taken.pop(job_id, None)
+            if entry is None:
+                continue
+            future, shm, submitted_at, color_ms = entry
+            self._release(shm)
+
+            if kind == 'done':
+                payload['worker_id'] = worker_id
+                payload['color_ms'] = round(color_ms, 3)
+                payload['total_ms'] = round((time.perf_counter() - submitted_at) * 1000, 2)
+                with self._lock:
+                    self._total_done += 1
+                    self._latency_ms.append(payload['total_ms'])
+                    size = payload['batch_size']
+                    self._batch_sizes[size] = self._batch_sizes.get(size, 0) + 1
+                future.set_result(payload)
+            else:
+                with self._lock:
+                    self._total_errors += 1
+                future.set_exception(RuntimeError(payload))
+
+    def _fail_jobs(self, job_ids, error):
+        with self._lock:
+            entries = [self._pending.pop(job_id) for job_id in job_ids if job_id in self._pending]
+            for job_id in job_ids:
+                self._taken.pop(job_id, None)
+            self._total_errors += len(entries)
+        for future, shm, *_ in entries:
+            self._release(shm)
+            future.set_exception(error)
+
+    def _fail_pending(self, error):
+        with self._lock:
+            job_ids = list(self._pending)
+        self._fail_jobs(job_ids, error)
+
+    # 준비 완료 후 죽은 워커 (OOM, 런타임 segfault 등) - 그 워커가 가져간 요청은 실패 처리하고 다시 띄움
+    # 모델을 올리다가 죽은 워커는 로드 실패로 기록
+    def _check_workers(self):
+        if self._closing:
+            return
+        for worker_id, p in enumerate(self._processes):
+            if p.is_alive() or worker_id in self._failed:
+                continue
+            with self._lock:
+                lost = [job_id for job_id, owner in self._taken.items() if owner == worker_id]
+            self._fail_jobs(lost, RuntimeError(f"추론 워커 {worker_id} 가 종료되었습니다 (exitcode {p.exitcode})"))
+            if self._ready.pop(worker_id, None) is None:
+                self._failed[worker_id] = f"모델 로드 중 종료 (exitcode {p.exitcode})"
+                print(f"❌ 추론 워커 {worker_id} 모델 로드 중 종료 (exitcode {p.exitcode})")
+                if len(self._failed) == self.num_workers:
+                    self._fail_pending(RuntimeError("모든 추론 워커가 모델 로드에 실패했습니다."))
+                continue
+            print(f"⚠️ 추론 워커 {worker_id} 종료 (exitcode {p.exitcode}, 처리 중 요청 {len(lost)}건 실패) -> 다시 시작")
+            self._restarts += 1
+            self._processes[worker_id] = self._spawn(worker_id)
+
+    # 워커가 가져가기 전에 죽는 등 결과가 끝내 오지 않는 요청 정리 (기다리던 쪽은 이미 시간 초과로 응답함)
+    def _expire_pending(self):
+        if not self.timeout:
+            return
+        deadline = time.perf_counter() - self.timeout
+        with self._lock:
+            expired = [job_id for job_id, entry in self._pending.items() if entry[2] < deadline]
+        self._fail_jobs(expired, TimeoutError(f"추론 결과가 {self.timeout}초 안에 오지 않았습니다."))
+
+    def stats(self):
+        with self._lock:
+            latency = np.array(self._latency_ms) if self._latency_ms else np.zeros(1)
+            return {
+                "workers": self.num_workers,
+                "ready_workers": len(self._ready),
+                "backend": self.backend,
+                "backend_report": self.backend_report,
+                "worker_reports": self._ready,
+                "failed_workers": self._failed,
+                "pending": len(self._pending),
+                "restarts": self._restarts,
+                "total_done": self._total_done,
+                "total_errors": self._total_errors,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "latency_ms": {
+                    "avg": round(float(latency.mean()), 2),
+                    "p50": round(float(np.percentile(latency, 50)), 2),
+                    "p95": round(float(np.percentile(latency, 95)), 2),
+                    "max": round(float(latency.max()), 2),
+                },
+            }
+
+    def close(self):
+        if not self._processes:
+            return
+        self._closing = True
+        for _ in self._processes:
+            self._task_queue.put(None)
+        for p in self._processes:
+            p.join(timeout=5)
+        self._processes = []
+        self._fail_pending(RuntimeError("추론 워커 풀이 종료되었습니다."))
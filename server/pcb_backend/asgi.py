@@ -13,4 +13,30 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pcb_backend.settings')
 
-application = get_asgi_application()
+django_asgi_app = get_asgi_application()
+
+# HTTP 는 Django, WebSocket(실시간 카메라 탐지 ws/detect/stream/)은 Channels 로 라우팅
+# WebSocket 은 CSRF 검사를 받지 않으므로 Origin 이 ALLOWED_HOSTS 에 있는 연결만 허용 (다른 사이트에서 여는 연결 차단)
+# (앱 설정을 먼저 로드해야 하므로 get_asgi_application() 뒤에 import)
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+
+from detector.routing import websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter({
+    "http": django_asgi_app,
+    "websocket": AllowedHostsOriginValidator(URLRouter(websocket_urlpatterns)),
+})
+
+# 서버 프로세스에서만 AI 모델을 미리 로드 (manage.py 명령에서는 로드하지 않음)
+from django.conf import settings  # noqa: E402
+
+if settings.DETECT_PRELOAD:
+    from detector.engine import detect_engine  # noqa: E402
+
+    detect_engine.warm_up()
+
+# 업로드 후처리 작업 큐 워커 스레드 (JOB_INPROCESS_WORKERS 가 0 이면 시작하지 않음)
+from detector.jobs import start_inprocess_workers  # noqa: E402
+
+start_inprocess_workers()
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'corsheaders',
+    'channels',
     'detector',
 ]
 
@@ -73,6 +74,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'pcb_backend.wsgi.application'
+ASGI_APPLICATION = 'pcb_backend.asgi.application'
 
 
 # Database
@@ -113,6 +115,85 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'volume')
 # 웹/앱에서 접근할 때 사용하는 주소 앞부분
 MEDIA_URL = '/volume/'
 
+# AI 추론 백엔드 (pt / torchscript / onnx / openvino / onnx_int8 / openvino_int8)
+# pt 가 아니면 best.pt 에서 자동 export 후 재사용하고, DETECT_VALIDATE_BACKEND 면 샘플 보드로 pt 와 결과 비교
+# *_int8 은 yolov5/quantize.py 로 미리 양자화해 둔 모델만 사용 (자동 export 하지 않음)
+DETECT_BACKEND = os.getenv('DETECT_BACKEND', 'pt')
+DETECT_VALIDATE_BACKEND = os.getenv('DETECT_VALIDATE_BACKEND', 'True') == 'True'
+
+# AI 모델은 첫 탐지 요청 때 로드 (manage.py 명령은 모델을 올리지 않음)
+# DETECT_PRELOAD 면 wsgi/asgi 서버 시작 직후 백그라운드에서 미리 로드
+# 콜드 스타트를 줄이려면 DETECT_BACKEND=torchscript (fuse 된 상태로 직렬화된 모델) 권장
+DETECT_PRELOAD = os.getenv('DETECT_PRELOAD', 'True') == 'True'
+
+# AI 탐지 마이크로 배칭 설정
+# 요청을 최대 DETECT_MAX_WAIT_MS 동안 모아서 최대 DETECT_MAX_BATCH_SIZE 장씩 한 번에 추론
+DETECT_MAX_BATCH_SIZE = int(os.getenv('DETECT_MAX_BATCH_SIZE', '8'))
+DETECT_MAX_WAIT_MS = float(os.getenv('DETECT_MAX_WAIT_MS', '10'))
+
+# 여러 장 탐지 (/detect/batch/) - 요청당 최대 이미지 수와 디코딩/렌더링 스레드 수
+DETECT_BATCH_MAX_IMAGES = int(os.getenv('DETECT_BATCH_MAX_IMAGES', '16'))
+DETECT_BATCH_THREADS = int(os.getenv('DETECT_BATCH_THREADS', '4'))
+
+# 실시간 카메라 스트림 탐지 (WebSocket ws/detect/stream/) - 프레임 1장 최대 크기 (KB)
+DETECT_STREAM_MAX_FRAME_KB = int(os.getenv('DETECT_STREAM_MAX_FRAME_KB', '1024'))
+
+# 추론 워커 프로세스 수 (0 이면 웹 프로세스 안에서 추론)
+# 워커마다 CPU 코어를 나눠서 고정하고, DETECT_WORKER_THREADS 가 0 이면 배정된 코어 수만큼 torch 스레드 사용
+DETECT_WORKERS = int(os.getenv('DETECT_WORKERS', '0'))
+DETECT_WORKER_THREADS = int(os.getenv('DETECT_WORKER_THREADS', '0'))
+# 추론 결과를 기다리는 최대 시간 (초) - 넘으면 503 (워커가 죽거나 멈춰도 요청 스레드가 계속 붙잡히지 않게)
+DETECT_TIMEOUT_S = float(os.getenv('DETECT_TIMEOUT_S', '30'))
+
+# 타일(슬라이스) 추론 - 고해상도 패널 사진의 작은 결함(missing_hole, spur, mouse_bite 등)용
+# DETECT_TILED 가 True 면 기본으로 사용, 아니면 요청에 tiled=1 을 보낼 때만 사용
+DETECT_TILED = os.getenv('DETECT_TILED', 'False') == 'True'
+DETECT_TILE_SIZE = int(os.getenv('DETECT_TILE_SIZE', '640'))
+DETECT_TILE_OVERLAP = float(os.getenv('DETECT_TILE_OVERLAP', '0.2'))
+
+# 탐지 결과 캐시 (업로드 이미지 해시 기준, 0 이면 사용 안 함)
+# DETECT_CACHE_DB 를 지정하면 sqlite 파일에도 저장해서 재시작 후에도 재사용 (최대 DETECT_CACHE_DB_MAX_MB)
+DETECT_CACHE_MAX_MB = int(os.getenv('DETECT_CACHE_MAX_MB', '64'))
+DETECT_CACHE_TTL = int(os.getenv('DETECT_CACHE_TTL', '600'))
+DETECT_CACHE_DB = os.getenv('DETECT_CACHE_DB', '')
+DETECT_CACHE_DB_MAX_MB = int(os.getenv('DETECT_CACHE_DB_MAX_MB', '512'))
+
+# 탐지 결과(렌더링 이미지 + 좌표) 보관 시간 (초)
+# result_url 다운로드와 /upload-result/ 의 detect_job_id 에 사용 - 탐지 후 등록 화면 작성 시간까지 고려
+DETECT_RESULT_TTL = int(os.getenv('DETECT_RESULT_TTL', '3600'))
+
+# 성능 데이터 이어받기 업로드 (/uploads/) - 미완료 업로드 보관 시간(초)과 파일 최대 크기
+RESUMABLE_UPLOAD_TTL = int(os.getenv('RESUMABLE_UPLOAD_TTL', '86400'))
+RESUMABLE_UPLOAD_MAX_MB = int(os.getenv('RESUMABLE_UPLOAD_MAX_MB', '512'))
+
+# 업로드 후처리 작업 큐 (썸네일, 성능 데이터 Parquet 변환, 미디어 참조 해제) - background_jobs 테이블 사용
+# JOB_INPROCESS_WORKERS : 웹 프로세스 안에서 작업을 처리할 스레드 수
+#   python manage.py run_jobs 워커를 따로 띄우면 0 으로 두고 웹 프로세스는 작업 등록만 하게 함
+# JOB_TIMEOUT : RUNNING 인 채로 이 시간(초)이 지나면 워커가 죽은 것으로 보고 다시 대기열로
+JOB_INPROCESS_WORKERS = int(os.getenv('JOB_INPROCESS_WORKERS', '1'))
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '1.0'))
+JOB_TIMEOUT = int(os.getenv('JOB_TIMEOUT', '1800'))
+JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', '7'))
+
+# 파일 다운로드 전송 방식 ('' = Django 가 직접 전송, 'x-accel' = nginx X-Accel-Redirect, 'x-sendfile' = X-Sendfile)
+# x-accel 은 nginx 에 DOWNLOAD_ACCEL_PREFIX 로 MEDIA_ROOT 를 가리키는 internal location 이 있어야 함
+# 경로는 퍼센트 인코딩해서 보냄 (x-sendfile 은 mod_xsendfile 의 XSendFileUnescape On(기본값) 필요)
+DOWNLOAD_SENDFILE = os.getenv('DOWNLOAD_SENDFILE', '').lower()
+DOWNLOAD_ACCEL_PREFIX = os.getenv('DOWNLOAD_ACCEL_PREFIX', '/protected/')
+
+# 캐시 (프로젝트 목록 등)
+# CACHE_URL(redis://...) 을 지정하면 프로세스끼리 공유, 없으면 프로세스별 메모리 캐시
+# 프로젝트 목록 페이지 캐시는 CACHE_URL 이 있을 때만 사용 (프로세스별 캐시로는 다른 프로세스의 변경을 무효화할 수 없음)
+CACHE_URL = os.getenv('CACHE_URL', '')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL,
+    } if CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+PROJECT_LIST_CACHE_TTL = int(os.getenv('PROJECT_LIST_CACHE_TTL', '300'))
+
 # CORS & CSRF settings [수정 및 보완]
 # Credentials(세션/쿠키)를 사용할 때는 허용할 도메인을 명시해야 합니다.
 CORS_ALLOW_CREDENTIALS = True
@@ -120,6 +201,8 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:8081", # React Native (Expo) 기본 포트
     "http://127.0.0.1:8081",
 ]
+# 웹(Expo web)에서 읽어야 하는 응답 헤더 (댓글 페이지/폴링, 목록 ETag)
+CORS_EXPOSE_HEADERS = ['ETag', 'X-Next-Cursor', 'X-Server-Time']
 
 # 세션 쿠키 설정 (에뮬레이터 통신을 위해 필요할 수 있음)
 SESSION_COOKIE_SAMESITE = 'Lax' # 또는 None (HTTPS인 경우만 None 가능)
@@ -143,6 +226,9 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# 테스트 DB 에 Django 가 관리하지 않는 기존 테이블을 먼저 만들고 마이그레이션 실행
+TEST_RUNNER = 'detector.test_runner.LegacySchemaTestRunner'
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
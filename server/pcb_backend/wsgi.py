@@ -14,3 +14,16 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pcb_backend.settings')
 
 application = get_wsgi_application()
+
+# 서버 프로세스에서만 AI 모델을 미리 로드 (manage.py 명령에서는 로드하지 않음)
+from django.conf import settings  # noqa: E402
+
+if settings.DETECT_PRELOAD:
+    from detector.engine import detect_engine  # noqa: E402
+
+    detect_engine.warm_up()
+
+# 업로드 후처리 작업 큐 워커 스레드 (JOB_INPROCESS_WORKERS 가 0 이면 시작하지 않음)
+from detector.jobs import start_inprocess_workers  # noqa: E402
+
+start_inprocess_workers()
@@ -45,7 +45,7 @@ ROOT = Path(os.path.relpath(ROOT, Path.cwd()))  # relative
 
 from ultralytics.utils.plotting import Annotator, colors, save_one_box
 
-from models.common import DetectMultiBackend
+from models.common import DetectMultiBackend, tiled_inference
 from utils.dataloaders import IMG_FORMATS, VID_FORMATS, LoadImages, LoadScreenshots, LoadStreams
 from utils.general import (
     LOGGER,
@@ -97,6 +97,8 @@ def run(
     half=False,  # use FP16 half-precision inference
     dnn=False,  # use OpenCV DNN for ONNX inference
     vid_stride=1,  # video frame-rate stride
+    tile=0,  # sliced inference tile size in pixels (0 to disable)
+    tile_overlap=0.2,  # overlap ratio between neighbouring tiles
 ):
     """Runs YOLOv5 detection inference on various sources like images, videos, directories, streams, etc.
 
@@ -132,6 +134,9 @@ def run(
         half (bool): If True, use FP16 half-precision inference. Default is False.
         dnn (bool): If True, use OpenCV DNN backend for ONNX inference. Default is False.
         vid_stride (int): Stride for processing video frames, to skip frames between processing. Default is 1.
+        tile (int): If > 0, run sliced inference on the original-resolution frame with overlapping square tiles of this
+            size instead of downscaling to `imgsz`. Useful for small defects on high-resolution panels. Default is 0.
+        tile_overlap (float): Overlap ratio between neighbouring tiles in sliced inference. Default is 0.2.
 
     Returns:
         None
@@ -194,7 +199,23 @@ def run(
         # Inference
         with dt[1]:
             visualize = increment_path(save_dir / Path(path).stem, mkdir=True) if visualize else False
-            if model.xml and im.shape[0] > 1:
+            if tile:
+                pred = [
+                    tiled_inference(
+                        model,
+                        cv2.cvtColor(x, cv2.COLOR_BGR2RGB),
+                        tile=tile,
+                        overlap=tile_overlap,
+                        conf_thres=conf_thres,
+                        iou_thres=iou_thres,
+                        classes=classes,
+                        agnostic=agnostic_nms,
+                        max_det=max_det,
+                        half=model.fp16,
+                    )[0]
+                    for x in (im0s if webcam else [im0s])
+                ]
+            elif model.xml and im.shape[0] > 1:
                 pred = None
                 for image in ims:
                     if pred is None:
@@ -206,7 +227,8 @@ def run(
                 pred = model(im, augment=augment, visualize=visualize)
         # NMS
         with dt[2]:
-            pred = non_max_suppression(pred, conf_thres, iou_thres, classes, agnostic_nms, max_det=max_det)
+            if not tile:  # sliced inference already merged its detections
+                pred = non_max_suppression(pred, conf_thres, iou_thres, classes, agnostic_nms, max_det=max_det)
 
         # Second-stage classifier (optional)
         # pred = utils.general.apply_classifier(pred, classifier_model, im, im0s)
@@ -243,7 +265,10 @@ def run(
             annotator = Annotator(im0, line_width=line_thickness, example=str(names))
             if len(det):
                 # Rescale boxes from img_size to im0 size
-                det[:, :4] = scale_boxes(im.shape[2:], det[:, :4], im0.shape).round()
+                if tile:
+                    det[:, :4] = det[:, :4].round()
+                else:
+                    det[:, :4] = scale_boxes(im.shape[2:], det[:, :4], im0.shape).round()
 
                 # Print results
                 for c in det[:, 5].unique():
@@ -354,6 +379,9 @@ def parse_opt():
         --dnn (bool, optional): Flag to use OpenCV DNN for ONNX inference. Defaults to False.
         --vid-stride (int, optional): Video frame-rate stride, determining the number of frames to skip in between
             consecutive frames. Defaults to 1.
+        --tile (int, optional): Tile size for sliced inference on the original-resolution image, 0 disables.
+            Defaults to 0.
+        --tile-overlap (float, optional): Overlap ratio between neighbouring tiles. Defaults to 0.2.
 
     Returns:
         argparse.Namespace: Parsed command-line arguments as an argparse.Namespace object.
@@ -399,6 +427,8 @@ def parse_opt():
     parser.add_argument("--half", action="store_true", help="use FP16 half-precision inference")
     parser.add_argument("--dnn", action="store_true", help="use OpenCV DNN for ONNX inference")
     parser.add_argument("--vid-stride", type=int, default=1, help="video frame-rate stride")
+    parser.add_argument("--tile", type=int, default=0, help="sliced inference tile size in pixels (0 to disable)")
+    parser.add_argument("--tile-overlap", type=float, default=0.2, help="sliced inference tile overlap ratio")
     opt = parser.parse_args()
     opt.imgsz *= 2 if len(opt.imgsz) == 1 else 1  # expand
     print_args(vars(opt))
@@ -19,6 +19,7 @@ import pandas as pd
 import requests
 import torch
 import torch.nn as nn
+import torchvision
 from PIL import Image
 from torch.cuda import amp
 
@@ -808,6 +809,82 @@ class DetectMultiBackend(nn.Module):
         return None, None
 
 
+def tile_origins(h, w, tile=640, overlap=0.2):
+    """Returns (x0, y0) top-left corners of overlapping square tiles covering an (h, w) image, edge tiles flush."""
+    step = max(1, int(tile * (1 - overlap)))
+
+    def starts(n):
+        if n <= tile:
+            return [0]
+        s = list(range(0, n - tile, step))
+        return s + [n - tile]  # last tile aligned to the image edge
+
+    return [(x0, y0) for y0 in starts(h) for x0 in starts(w)]
+
+
+def tiled_inference(
+    model,
+    im,
+    tile=640,
+    overlap=0.2,
+    conf_thres=0.25,
+    iou_thres=0.45,
+    classes=None,
+    agnostic=False,
+    max_det=1000,
+    batch=16,
+    bg_std=2.0,
+    device=None,
+    half=False,
+    dt=None,
+):
+    """Runs sliced inference on a large HWC uint8 RGB image and returns merged (n, 6) xyxy, conf, cls detections.
+
+    Overlapping tiles are cut at native resolution (no downscaling), flat background tiles whose per-channel std is
+    below `bg_std` are skipped, the remaining tiles are stacked and run in batches of `batch`, boxes are shifted back to
+    image coordinates and duplicates across tile seams are merged with a class-aware batched NMS. Optional `dt` is a
+    (pre-process, inference, NMS) tuple of Profile() instances that the tiling, forward and NMS/merge steps add to.
+    """
+    dt = dt or (Profile(), Profile(), Profile())
+    device = device or getattr(model, "device", None) or next(model.parameters()).device
+    h, w = im.shape[:2]
+    with dt[0]:
+        crops, offsets = [], []
+        for x0, y0 in tile_origins(h, w, tile, overlap):
+            crop = im[y0 : y0 + tile, x0 : x0 + tile]
+            if bg_std and max(cv2.meanStdDev(crop)[1].flatten()) < bg_std:
+                continue  # fully background tile
+            if crop.shape[:2] != (tile, tile):  # image smaller than a tile, pad bottom/right
+                crop = cv2.copyMakeBorder(
+                    crop, 0, tile - crop.shape[0], 0, tile - crop.shape[1], cv2.BORDER_CONSTANT, value=(114, 114, 114)
+                )
+            crops.append(crop)
+            offsets.append((x0, y0))
+        if not crops:
+            return torch.zeros((0, 6), device=device), 0
+
+        x = torch.from_numpy(np.ascontiguousarray(np.stack(crops).transpose((0, 3, 1, 2)))).to(device)
+        x = (x.half() if half else x.float()) / 255
+    preds = []
+    for i in range(0, len(x), batch):
+        with dt[1]:
+            y = model(x[i : i + batch])
+        with dt[2]:
+            preds += non_max_suppression(y, conf_thres, iou_thres, classes, agnostic, max_det=max_det)
+
+    with dt[2]:
+        for p, (x0, y0) in zip(preds, offsets):
+            p[:, [0, 2]] += x0
+            p[:, [1, 3]] += y0
+        det = torch.cat(preds, 0)
+        det[:, [0, 2]] = det[:, [0, 2]].clamp(0, w)
+        det[:, [1, 3]] = det[:, [1, 3]].clamp(0, h)
+        if len(det):  # merge duplicates across tile seams
+            i = torchvision.ops.batched_nms(det[:, :4], det[:, 4], det[:, 5] * (0 if agnostic else 1), iou_thres)
+            det = det[i[:max_det]]
+    return det, len(crops)
+
+
 class AutoShape(nn.Module):
     """AutoShape class for robust YOLOv5 inference with preprocessing, NMS, and support for various input formats."""
 
@@ -818,6 +895,7 @@ class AutoShape(nn.Module):
     classes = None  # (optional list) filter by class, i.e. = [0, 15, 16] for COCO persons, cats and dogs
     max_det = 1000  # maximum number of detections per image
     amp = False  # Automatic Mixed Precision (AMP) inference
+    square = False  # letterbox to a fixed (size, size) input, for fixed-shape exports i.e. TorchScript
 
     def __init__(self, model, verbose=True):
         """Initializes YOLOv5 model for inference, setting up attributes and preparing model for evaluation."""
@@ -891,7 +969,9 @@ class AutoShape(nn.Module):
                 g = max(size) / max(s)  # gain
                 shape1.append([int(y * g) for y in s])
                 ims[i] = im if im.data.contiguous else np.ascontiguousarray(im)  # update
-            shape1 = [make_divisible(x, self.stride) for x in np.array(shape1).max(0)]  # inf shape
+            shape1 = (
+                list(size) if self.square else [make_divisible(x, self.stride) for x in np.array(shape1).max(0)]
+            )  # inf shape
             x = [letterbox(im, shape1, auto=False)[0] for im in ims]  # pad
             x = np.ascontiguousarray(np.array(x).transpose((0, 3, 1, 2)))  # stack and BHWC to BCHW
             x = torch.from_numpy(x).to(p.device).type_as(p) / 255  # uint8 to fp16/32
@@ -917,6 +997,48 @@ class AutoShape(nn.Module):
 
             return Detections(ims, y, files, dt, self.names, x.shape)
 
+    @smart_inference_mode()
+    def forward_tiled(self, ims, tile=640, overlap=0.2, batch=16, bg_std=2.0):
+        """Performs sliced inference for high-resolution inputs, see `tiled_inference()`.
+
+        Unlike forward(), images are not downscaled to `size`; each image is cut into overlapping `tile` crops that are
+        run as batches and merged back into full-image coordinates. Accepts the same single/list input types.
+        """
+        dt = (Profile(), Profile(), Profile())
+        p = next(self.model.parameters()) if self.pt else torch.empty(1, device=self.model.device)  # param
+        ims = list(ims) if isinstance(ims, (list, tuple)) else [ims]
+        files, preds, n_tiles = [], [], 0
+        for i, im in enumerate(ims):
+            f = f"image{i}"
+            with dt[0]:
+                if isinstance(im, (str, Path)):  # filename or uri
+                    im, f = Image.open(requests.get(im, stream=True).raw if str(im).startswith("http") else im), im
+                    im = np.asarray(exif_transpose(im))
+                elif isinstance(im, Image.Image):  # PIL Image
+                    im, f = np.asarray(exif_transpose(im)), getattr(im, "filename", f) or f
+                im = im[..., :3] if im.ndim == 3 else cv2.cvtColor(im, cv2.COLOR_GRAY2BGR)  # enforce 3ch input
+                ims[i] = np.ascontiguousarray(im)
+                files.append(Path(f).with_suffix(".jpg").name)
+            det, n = tiled_inference(
+                lambda x: self.model(x) if self.dmb else self.model(x)[0],
+                ims[i],
+                tile=tile,
+                overlap=overlap,
+                conf_thres=self.conf,
+                iou_thres=self.iou,
+                classes=self.classes,
+                agnostic=self.agnostic,
+                max_det=self.max_det,
+                batch=batch,
+                bg_std=bg_std,
+                device=p.device,
+                half=p.dtype == torch.float16,
+                dt=dt,  # tiling, forward and NMS/merge times go to dt[0], dt[1] and dt[2]
+            )
+            preds.append(det)
+            n_tiles += n
+        return Detections(ims, preds, files, dt, self.names, (n_tiles, 3, tile, tile))
+
 
 class Detections:
     """Manages YOLOv5 detection results with methods for visualization, saving, cropping, and exporting detections."""
@@ -0,0 +1,270 @@
+# Ultralytics 🚀 AGPL-3.0 License - https://ultralytics.com/license
+"""
+Post-training INT8 quantization of a YOLOv5 detection model, calibrated on a sample of its own training set.
+
+The FP32 model is exported to ONNX with a dynamic batch axis, calibrated on `--calib-images` training images loaded with
+`create_dataloader`, quantized to INT8 ONNX (ONNX Runtime, QDQ) or INT8 OpenVINO (NNCF), and both FP32 and INT8 models
+are evaluated with val.py. The INT8 model is only published when the accuracy gate passes.
+
+Intermediate exports are written to a `<weights>_int8_work/` directory, so existing `best.onnx` / `best_openvino_model/`
+exports next to the weights are never overwritten.
+
+Format      | `--format`  | Published model
+---         | ---         | ---
+ONNX        | `onnx`      | best_int8.onnx
+OpenVINO    | `openvino`  | best_int8_openvino_model/
+
+Requirements:
+    $ pip install -r requirements.txt onnx onnxruntime  # ONNX
+    $ pip install -r requirements.txt onnx openvino-dev nncf  # OpenVINO
+
+Usage:
+    $ python quantize.py --weights runs/train/pcb_final_run/weights/best.pt --data data/pcb.yaml --format onnx
+"""
+
+import argparse
+import itertools
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+
+FILE = Path(__file__).resolve()
+ROOT = FILE.parents[0]  # YOLOv5 root directory
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))  # add ROOT to PATH
+
+import export
+from utils.dataloaders import create_dataloader
+from utils.general import (
+    LOGGER,
+    check_dataset,
+    check_requirements,
+    check_yaml,
+    colorstr,
+    file_size,
+    print_args,
+    yaml_save,
+)
+from val import run as val_det
+
+PREFIX = colorstr("INT8:")
+
+
+def calibration_images(data, imgsz=640, n=300, workers=4, seed=0):
+    """Yields up to `n` letterboxed training images as float32 (1, 3, imgsz, imgsz) arrays scaled to 0-1.
+
+    Images come from the dataset 'train' split via `create_dataloader` without augmentation and in shuffled order, so
+    the calibration sample matches the board photos the model was trained on rather than a generic dataset.
+    """
+    dataloader = create_dataloader(
+        data["train"],
+        imgsz,
+        batch_size=1,
+        stride=32,
+        pad=0.5,
+        rect=False,
+        workers=workers,
+        shuffle=True,
+        seed=seed,
+        prefix=colorstr("calibration: "),
+    )[0]
+    for im, *_ in itertools.islice(dataloader, n):
+        yield im.numpy().astype(np.float32) / 255
+
+
+def quantize_onnx(f32, f8, images):
+    """Statically quantizes an FP32 ONNX model to INT8 (QDQ) with ONNX Runtime using the given calibration images.
+
+    Only Conv layers are quantized; the Detect head decoding (sigmoid, grid/anchor math, concat) stays in FP32, which
+    keeps box and confidence outputs close to the FP32 model.
+    """
+    check_requirements("onnxruntime")
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    class Reader(CalibrationDataReader):
+        def __init__(self):
+            self.it = ({"images": x} for x in images)
+
+        def get_next(self):
+            return next(self.it, None)
+
+    quantize_static(
+        str(f32),
+        str(f8),
+        Reader(),
+        quant_format=QuantFormat.QDQ,
+        op_types_to_quantize=["Conv"],
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+    return f8
+
+
+def quantize_openvino(f32, f8, images, metadata):
+    """Quantizes an FP32 ONNX model to an INT8 OpenVINO model directory with NNCF using the given calibration images."""
+    check_requirements(("openvino-dev>=2023.0", "nncf>=2.5.0"))
+    import nncf
+    import openvino.runtime as ov
+    from openvino.tools import mo
+
+    calibration = list(images)
+    ov_model = mo.convert_model(f32, model_name=f32.stem, framework="onnx")
+    ov_model = nncf.quantize(
+        ov_model,
+        nncf.Dataset(calibration),
+        preset=nncf.QuantizationPreset.MIXED,
+        subset_size=len(calibration),
+    )
+    f8.mkdir(parents=True, exist_ok=True)
+    ov.serialize(ov_model, str(f8 / f32.with_suffix(".xml").name))
+    yaml_save(f8 / f32.with_suffix(".yaml").name, metadata)  # add metadata.yaml
+    return f8
+
+
+def run(
+    weights=ROOT / "yolov5s.pt",  # FP32 weights path
+    data=ROOT / "data/coco128.yaml",  # dataset.yaml path, 'train' is used for calibration and 'val' for evaluation
+    format="onnx",  # onnx or openvino
+    imgsz=640,  # inference size (pixels)
+    calib_images=300,  # number of training images used for calibration
+    max_map_drop=0.01,  # maximum allowed absolute mAP50-95 drop over all classes
+    max_class_drop=0.03,  # maximum allowed absolute mAP50-95 drop for any single class
+    workers=4,  # max dataloader workers
+    publish=True,  # copy the INT8 model next to the weights if the accuracy gate passes
+):
+    """Quantizes a YOLOv5 model to INT8, compares it against FP32 with val.py and publishes it only if accuracy holds.
+
+    Args:
+        weights (str | Path): Path to the FP32 PyTorch weights. Default is 'yolov5s.pt'.
+        data (str | Path): Dataset YAML; the 'train' split is sampled for calibration, 'val' is used for mAP.
+        format (str): Quantized model format, 'onnx' (ONNX Runtime) or 'openvino' (NNCF). Default is 'onnx'.
+        imgsz (int): Square inference size in pixels used for export, calibration and validation. Default is 640.
+        calib_images (int): Number of training images used for calibration. Default is 300.
+        max_map_drop (float): Maximum allowed absolute mAP50-95 drop over all classes. Default is 0.01.
+        max_class_drop (float): Maximum allowed absolute mAP50-95 drop for any single class. Default is 0.03.
+        workers (int): Maximum number of dataloader workers. Default is 4.
+        publish (bool): If True, publish the INT8 model as '<weights>_int8.onnx' or '<weights>_int8_openvino_model/'
+            when the accuracy gate passes. Default is True.
+
+    Returns:
+        (dict): Report with overall and per-class mAP50-95 for FP32 and INT8, inference speed-up, gate result and the
+            published path (None if refused). The report is also saved as JSON next to the weights.
+
+    Examples:
+        ```python
+        $ python quantize.py --weights runs/train/pcb_final_run/weights/best.pt --data data/pcb.yaml --format openvino
+        ```
+    """
+    assert format in ("onnx", "openvino"), f"invalid --format {format}, valid are 'onnx' and 'openvino'"
+    weights = Path(weights)
+    data = check_dataset(check_yaml(data))
+    names = data["names"]
+
+    # FP32 reference export with a dynamic batch axis, so the INT8 model accepts batched inputs, into a separate work
+    # directory so the FP32 exports next to the weights (i.e. best.onnx used for ONNX inference) stay untouched
+    work = weights.parent / f"{weights.stem}_int8_work"
+    work.mkdir(parents=True, exist_ok=True)
+    src = work / weights.name
+    shutil.copy2(weights, src)
+    f32 = Path(export.run(weights=src, imgsz=[imgsz], include=["onnx"], device="cpu", dynamic=True)[-1])
+    fp32_model = (
+        f32
+        if format == "onnx"
+        else Path(export.run(weights=src, imgsz=[imgsz], include=["openvino"], dynamic=True)[-1])
+    )
+
+    # Calibrate and quantize
+    LOGGER.info(f"\n{PREFIX} calibrating on {calib_images} images from {data['train']}...")
+    images = calibration_images(data, imgsz, calib_images, workers)
+    if format == "onnx":
+        f8 = quantize_onnx(f32, f32.with_name(f"{f32.stem}_int8_calib.onnx"), images)
+    else:
+        metadata = {"stride": 32, "names": names}
+        f8 = quantize_openvino(f32, f32.with_name(f"{f32.stem}_int8_calib_openvino_model"), images, metadata)
+    LOGGER.info(f"{PREFIX} quantized model saved to {f8} ({file_size(f8):.1f} MB)")
+
+    # Validate both models on the same split and settings
+    results = {}
+    for precision, w in (("fp32", fp32_model), ("int8", f8)):
+        (mp, mr, map50, map, *_), maps, t = val_det(
+            data, weights=w, batch_size=1, imgsz=imgsz, device="cpu", task="val", half=False, plots=False, workers=workers
+        )
+        results[precision] = {"mAP50": map50, "mAP50-95": map, "maps": maps.tolist(), "inference_ms": t[1]}
+
+    fp32, int8 = results["fp32"], results["int8"]
+    drop = fp32["mAP50-95"] - int8["mAP50-95"]
+    class_drops = {names[i]: a - b for i, (a, b) in enumerate(zip(fp32["maps"], int8["maps"]))}
+    worst = max(class_drops, key=class_drops.get)
+    speedup = fp32["inference_ms"] / max(int8["inference_ms"], 1e-6)
+    passed = drop <= max_map_drop and class_drops[worst] <= max_class_drop
+
+    LOGGER.info(f"\n{PREFIX} {'class':<20}{'FP32':>10}{'INT8':>10}{'delta':>10}")
+    LOGGER.info(f"{PREFIX} {'all':<20}{fp32['mAP50-95']:>10.4f}{int8['mAP50-95']:>10.4f}{-drop:>+10.4f}")
+    for i, name in enumerate(names if isinstance(names, list) else names.values()):
+        LOGGER.info(f"{PREFIX} {name:<20}{fp32['maps'][i]:>10.4f}{int8['maps'][i]:>10.4f}{-class_drops[name]:>+10.4f}")
+    LOGGER.info(
+        f"{PREFIX} inference {fp32['inference_ms']:.1f}ms -> {int8['inference_ms']:.1f}ms per image ({speedup:.2f}x)"
+    )
+
+    # Accuracy gate
+    published = None
+    if not passed:
+        LOGGER.warning(
+            f"{PREFIX} WARNING ⚠️ refusing to publish INT8 model: mAP50-95 drop {drop:.4f} (max {max_map_drop}), "
+            f"worst class '{worst}' drop {class_drops[worst]:.4f} (max {max_class_drop})"
+        )
+    elif publish:
+        suffix = ".onnx" if format == "onnx" else "_openvino_model"
+        published = weights.with_name(f"{weights.stem}_int8{suffix}")
+        if published.is_dir():
+            shutil.rmtree(published)
+        shutil.move(str(f8), str(published))
+        LOGGER.info(f"{PREFIX} published {published}")
+
+    report = {
+        "format": format,
+        "calib_images": calib_images,
+        "fp32": fp32,
+        "int8": int8,
+        "map_drop": drop,
+        "class_drops": class_drops,
+        "speedup": speedup,
+        "passed": passed,
+        "published": str(published) if published else None,
+    }
+    with open(weights.with_name(f"{weights.stem}_int8_{format}_report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def parse_opt():
+    """Parses command-line arguments for INT8 post-training quantization."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weights", type=str, default=ROOT / "yolov5s.pt", help="FP32 weights path")
+    parser.add_argument("--data", type=str, default=ROOT / "data/coco128.yaml", help="dataset.yaml path")
+    parser.add_argument("--format", type=str, default="onnx", choices=["onnx", "openvino"], help="INT8 model format")
+    parser.add_argument("--imgsz", "--img", "--img-size", type=int, default=640, help="inference size (pixels)")
+    parser.add_argument("--calib-images", type=int, default=300, help="number of training images for calibration")
+    parser.add_argument("--max-map-drop", type=float, default=0.01, help="max allowed mAP50-95 drop over all classes")
+    parser.add_argument("--max-class-drop", type=float, default=0.03, help="max allowed mAP50-95 drop for any class")
+    parser.add_argument("--workers", type=int, default=4, help="max dataloader workers")
+    parser.add_argument("--no-publish", dest="publish", action="store_false", help="do not publish the INT8 model")
+    opt = parser.parse_args()
+    print_args(vars(opt))
+    return opt
+
+
+def main(opt):
+    """Runs INT8 quantization and exits with a non-zero status if the accuracy gate refused the model."""
+    report = run(**vars(opt))
+    if not report["passed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    opt = parse_opt()
+    main(opt)